@@ -29,6 +29,7 @@ from coastseg.shoreline import Shoreline
 from coastseg.transects import Transects
 from coastseg.roi import ROI
 from coastseg.downloads import count_images_in_ee_collection
+from coastseg import downloads
 from coastseg import file_utilities
 from coastseg import geodata_processing
 from coastseg import tide_correction
@@ -42,8 +43,6 @@ from coastseg import (
     extracted_shoreline,
     exception_handler,
 )
-from coastsat import SDS_download
-from coastsat.SDS_download import get_metadata
 
 logger = logging.getLogger(__name__)
 
@@ -127,7 +126,7 @@ def find_shorelines_directory(path:str, roi_id:str):
     extracted_shorelines_file = [
         file
         for file in contents
-        if "extracted_shorelines" in file and file.endswith(".geojson")
+        if "extracted_shorelines" in file and file.endswith(file_utilities.GEODATA_EXTENSIONS)
     ]
     if extracted_shorelines_file:
         return path
@@ -144,7 +143,7 @@ def find_shorelines_directory(path:str, roi_id:str):
         extracted_shorelines_file = [
             file
             for file in roi_contents
-            if "extracted_shorelines" in file and file.endswith(".geojson")
+            if "extracted_shorelines" in file and file.endswith(file_utilities.GEODATA_EXTENSIONS)
         ]
         if extracted_shorelines_file:
             return roi_path
@@ -164,7 +163,7 @@ def delete_extracted_shorelines_files(session_path: str, selected_items: List):
     Removes the extracted shorelines from the following files:
     - extracted_shorelines_lines.geojson
     - extracted_shorelines_points.geojson
-    - extracted_shorelines_dict.json
+    - extracted_shorelines_dict.json (and extracted_shorelines_dict.npz)
     - transect_time_series.csv (generated by older versions of CoastSeg  new name is 'raw_transect_time_series.csv')
     - raw_transect_time_series.csv
     - transect_time_series_tidally_corrected.csv (generated by older versions of CoastSeg new name is 'tidally_corrected_transect_time_series_merged.csv' )
@@ -185,11 +184,12 @@ def delete_extracted_shorelines_files(session_path: str, selected_items: List):
         "raw_transect_time_series_points.geojson",
         "tidally_corrected_transect_time_series_points.geojson",
     ]
+    # the files may have been saved in any of the output formats
     filepaths = [
-        os.path.join(session_path, filename)
+        file_utilities.find_geodata_file(os.path.join(session_path, filename))
         for filename in filenames
-        if os.path.isfile(os.path.join(session_path, filename))
     ]
+    filepaths = [filepath for filepath in filepaths if filepath is not None]
 
     # the date column must be a dateime formatted in "%Y-%m-%d %H:%M:%S" without a timezone
     formatted_dates = [date.replace(tzinfo=None) for date in dates_list]
@@ -503,7 +503,7 @@ class CoastSeg_Map:
         )
 
     def compute_tidal_corrections(
-        self, roi_ids: Collection, beach_slope: float=0.02, reference_elevation: float=0
+        self, roi_ids: Collection, beach_slope: float=0.02, reference_elevation: float=0, max_workers: int = 1
     ):
         """
         Computes tidal corrections for the specified region of interest (ROI) IDs.
@@ -512,6 +512,7 @@ class CoastSeg_Map:
             roi_ids (Collection): A collection of ROI IDs for which tidal corrections need to be computed.
             beach_slope (float, optional): The slope of the beach in meters. Defaults to 0.02.
             reference_elevation (float, optional): The reference elevation in meters relative to MSL (Mean Sea Level). Defaults to 0.
+            max_workers (int, optional): The number of ROIs to tidally correct at the same time in separate processes. Defaults to 1.
 
         Returns:
             None
@@ -524,12 +525,13 @@ class CoastSeg_Map:
         # if True then only the intersection point ON the transect are kept. If False all intersection points are kept.
         only_keep_points_on_transects = self.get_settings().get('drop_intersection_pts',False)
         try:
-            tide_correction.correct_all_tides(
+            failed_rois = tide_correction.correct_all_tides(
                 roi_ids,
                 session_name,
                 reference_elevation,
                 beach_slope,
-                only_keep_points_on_transects=only_keep_points_on_transects
+                only_keep_points_on_transects=only_keep_points_on_transects,
+                max_workers=max_workers,
             )
         except Exception as e:
             if self.map is not None:
@@ -542,6 +544,8 @@ class CoastSeg_Map:
             else:
                 raise Exception(f"""Tide Model Error:\n {e}""")
         else:
+            if failed_rois:
+                print(f"\nTidal corrections failed for ROIs: {list(failed_rois.keys())}")
             print("\ntidal corrections completed")
 
     def load_metadata(self, settings: dict = {}, ids: Collection = set([])):
@@ -553,7 +557,7 @@ class CoastSeg_Map:
         for a particular site, or iterates over a collection of ROI IDs to load their respective
         metadata using the settings associated with those ROI IDs.
 
-        Note that coastsat's `get_metadata` is used to actually perform the metadata loading.
+        The metadata is loaded with common.get_cached_metadata which only reads the metadata files that changed since the last load.
 
         Parameters:
         -----------
@@ -584,7 +588,7 @@ class CoastSeg_Map:
 
         """
         if settings and isinstance(settings, dict):
-            return get_metadata(settings)
+            return common.get_cached_metadata(settings)
         elif ids:
             for roi_id in ids:
                 # if the ROI directory did not exist then print a warning and proceed
@@ -592,7 +596,7 @@ class CoastSeg_Map:
                     logger.info(
                         f"Loading metadata using {self.rois.roi_settings[str(roi_id)]}"
                     )
-                    metadata = get_metadata(self.rois.roi_settings[str(roi_id)])
+                    metadata = common.get_cached_metadata(self.rois.roi_settings[str(roi_id)])
                     logger.info(f"Metadata for ROI ID {str(roi_id)}:{metadata}")
                     return metadata
                 except FileNotFoundError as e:
@@ -624,11 +628,14 @@ class CoastSeg_Map:
             if not data_path:
                 base_path = os.path.abspath(core_utilities.get_base_dir())
                 data_path = file_utilities.create_directory(base_path, "data")
-            config_geojson_path = os.path.join(dir_path, "config_gdf.geojson")
+            # config_gdf may have been saved in any of the output formats
+            config_geojson_path = file_utilities.find_geodata_file(
+                os.path.join(dir_path, "config_gdf.geojson")
+            ) or os.path.join(dir_path, "config_gdf.geojson")
             config_json_path = os.path.join(dir_path, "config.json")
             # load the config files if they exist
             config_loaded = self.load_config_files(data_path, config_geojson_path, config_json_path)
-            # create metadata files for each ROI loaded in using coastsat's get_metadata()
+            # create metadata files for each ROI loaded in using common.get_cached_metadata()
             if self.rois and getattr(self.rois, "roi_settings"):
                 self.load_metadata(ids=list(self.rois.roi_settings.keys()))
             else:
@@ -1015,7 +1022,7 @@ class CoastSeg_Map:
        
 
 
-    def download_imagery(self,rois:gpd.GeoDataFrame=None, settings:dict={},selected_ids:set=None,file_path:str=None) -> None:
+    def download_imagery(self,rois:gpd.GeoDataFrame=None, settings:dict={},selected_ids:set=None,file_path:str=None, use_download_manifest: bool = True, max_concurrent_downloads: int = 4) -> None:
         """
         Downloads all images for the selected ROIs  from Landsat 5, Landsat 7, Landsat 8 and Sentinel-2  covering the area of interest and acquired between the specified dates.
         The downloaded imagery for each ROI is stored in a directory that follows the convention
@@ -1023,6 +1030,17 @@ class CoastSeg_Map:
         'jpg_files' in a subdirectory 'preprocessed' which contains subdirectories for RGB, NIR, and SWIR jpg imagery. The downloaded .TIF images are organised in subfolders, divided
         by satellite mission. The bands are also subdivided by pixel resolution.
 
+        Each ROI directory contains a download manifest that records the imagery that was retrieved, so only the satellites
+        and dates that were not retrieved with the same download settings are requested from Earth Engine.
+
+        Args:
+            rois (gpd.GeoDataFrame, optional): The ROIs to download. Defaults to the ROIs on the map.
+            settings (dict, optional): The download settings. Defaults to the current settings.
+            selected_ids (set, optional): The ids of the ROIs to download. Defaults to the selected ROIs.
+            file_path (str, optional): The directory to save the downloaded imagery to. Defaults to None.
+            use_download_manifest (bool, optional): If False all the imagery in the date range is retrieved again. Defaults to True.
+            max_concurrent_downloads (int, optional): The maximum number of ROIs downloaded at once. Defaults to 4.
+
         Raises:
             Exception: raised if settings is missing
             Exception: raised if 'dates','sat_list', and 'landsat_collection' are not in settings
@@ -1073,17 +1091,20 @@ class CoastSeg_Map:
 
         # 2. For each ROI use download settings to download imagery and save to jpg
         print("Download in progress")
-        # for each ROI use the ROI settings to download imagery and save to jpg
-        for inputs_for_roi in tqdm(inputs_list, desc="Downloading ROIs"):
-            SDS_download.retrieve_images(
-                inputs_for_roi,
-                cloud_threshold=settings.get("cloud_thresh",0.80), # no more than 80% of valid portion the image can be cloud
-                cloud_mask_issue=settings.get("cloud_mask_issue",False),
-                save_jpg=True,
-                apply_cloud_mask=settings.get("apply_cloud_mask", True),
-                months_list = settings.get("months_list",[1,2,3,4,5,6,7,8,9,10,11,12]),
-                max_cloud_no_data_cover=settings.get('percent_no_data',0.80), # no more than 80% of the image cloud or no data
-            )
+        # use the ROI settings to download the imagery of several ROIs at once and save to jpg
+        failed_downloads = downloads.retrieve_images_for_rois(
+            inputs_list,
+            max_concurrent=max_concurrent_downloads,
+            use_manifest=use_download_manifest,
+            cloud_threshold=settings.get("cloud_thresh",0.80), # no more than 80% of valid portion the image can be cloud
+            cloud_mask_issue=settings.get("cloud_mask_issue",False),
+            save_jpg=True,
+            apply_cloud_mask=settings.get("apply_cloud_mask", True),
+            months_list = settings.get("months_list",[1,2,3,4,5,6,7,8,9,10,11,12]),
+            max_cloud_no_data_cover=settings.get('percent_no_data',0.80), # no more than 80% of the image cloud or no data
+        )
+        if failed_downloads:
+            logger.error(f"Downloads failed for {list(failed_downloads.keys())}")
         if settings.get("image_size_filter", True):
             common.filter_images_by_roi(roi_settings)
 
@@ -1241,10 +1262,12 @@ class CoastSeg_Map:
         )
         logger.info(f"config_gdf: {config_gdf} ")
 
+        output_format = file_utilities.get_output_format(settings)
+
         def save_config_files(config_json, config_gdf, path):
             """Helper function to save config files."""
             file_utilities.config_to_file(config_json, path)
-            file_utilities.config_to_file(config_gdf, path)
+            file_utilities.config_to_file(config_gdf, path, output_format)
 
         if filepath:
             # save the config.json and config_gdf.geojson immediately to the filepath directory
@@ -1297,6 +1320,8 @@ class CoastSeg_Map:
             "check_detection": False,
             "adjust_detection": False,
             "save_figure": True,
+            "figure_mode": "inline",
+            "output_format": "geojson",
             "min_beach_area": 4500,
             "min_length_sl": 100,
             "cloud_mask_issue": False,
@@ -1598,6 +1623,7 @@ class CoastSeg_Map:
         settings: dict,
         session_path: str=None,
         shoreline_extraction_area: gpd.GeoDataFrame = None,
+        incremental: bool = False,
     ) -> Optional[extracted_shoreline.Extracted_Shoreline]:
         """
         Extracts the shoreline for a given ROI and returns the extracted shoreline object.
@@ -1607,6 +1633,9 @@ class CoastSeg_Map:
         - rois_gdf (geopandas.GeoDataFrame): the GeoDataFrame containing all the ROIs
         - shoreline_gdf (geopandas.GeoDataFrame): the GeoDataFrame containing the shoreline
         - settings (dict): the settings to use for the shoreline extraction
+        - session_path (str): the session directory the extracted shorelines are saved to
+        - shoreline_extraction_area (geopandas.GeoDataFrame): the area to extract shorelines from
+        - incremental (bool): if True only the images that were not already processed with the same settings in the session are processed
 
 
         Returns:
@@ -1629,7 +1658,8 @@ class CoastSeg_Map:
                 roi_settings,
                 settings,
                 output_directory=session_path,
-                shoreline_extraction_area = shoreline_extraction_area
+                shoreline_extraction_area = shoreline_extraction_area,
+                incremental=incremental,
             )
             logger.info(f"extracted_shoreline_dict[{roi_id}]: {extracted_shorelines}")
             return extracted_shorelines
@@ -1819,7 +1849,7 @@ class CoastSeg_Map:
         return roi_ids
         
 
-    def extract_all_shorelines(self,roi_ids:list=None) -> None:
+    def extract_all_shorelines(self,roi_ids:list=None, incremental: bool = False) -> None:
         """
         Extracts shorelines for all selected regions of interest (ROIs).
 
@@ -1837,6 +1867,12 @@ class CoastSeg_Map:
 
         Note: This method assumes that the necessary data structures and attributes are already initialized.
 
+        Args:
+            roi_ids (list, optional): The ROI IDs to extract shorelines from. Defaults to the selected ROIs.
+            incremental (bool, optional): If True, the images that were already processed with the same settings in the
+                session are skipped and only the shorelines and transect intersections of the new images are computed.
+                Defaults to False.
+
         Returns:
             None
         """
@@ -1884,7 +1920,7 @@ class CoastSeg_Map:
             session_path = self.create_session(self.get_session_name(), roi_id, save_config=True)
             print(f"Extracting shorelines from ROI with the id:{roi_id}")
             extracted_shorelines = self.extract_shoreline_for_roi(
-                roi_id, self.rois.gdf, self.shoreline.gdf, self.get_settings(),session_path, shoreline_extraction_area_gdf
+                roi_id, self.rois.gdf, self.shoreline.gdf, self.get_settings(),session_path, shoreline_extraction_area_gdf, incremental
             )
             self.rois.add_extracted_shoreline(extracted_shorelines, roi_id)
             
@@ -1927,6 +1963,7 @@ class CoastSeg_Map:
         transects_in_roi_gdf: gpd.GeoDataFrame,
         settings: dict,
         output_epsg: int,
+        session_path: str = "",
     ) -> Tuple[float, Optional[str]]:
         """
         Compute the cross shore distance of transects and extracted shorelines for a given ROI.
@@ -1941,6 +1978,9 @@ class CoastSeg_Map:
             A dictionary of settings to be used in the computation.
         output_epsg : int
             The EPSG code of the output projection.
+        session_path : str, optional
+            The session directory containing the transect intersections computed before the extracted shorelines
+            were extracted incrementally. These intersections are reused for the shorelines that were extracted before.
 
         Returns:
         --------
@@ -1967,17 +2007,27 @@ class CoastSeg_Map:
             transects_in_roi_gdf = transects_in_roi_gdf.to_crs(output_epsg)
             # Compute cross shore distance of transects and extracted shorelines
             extracted_shorelines_dict = roi_extracted_shoreline.dictionary
-            cross_distance = extracted_shoreline.compute_transects_from_roi(
-                extracted_shorelines_dict,
-                transects_in_roi_gdf,
-                settings,
-            )
+            previous_dates = getattr(roi_extracted_shoreline, "previous_dates", [])
+            if session_path and previous_dates:
+                cross_distance = extracted_shoreline.compute_transects_incrementally(
+                    extracted_shorelines_dict,
+                    transects_in_roi_gdf,
+                    settings,
+                    previous_dates,
+                    session_path,
+                )
+            else:
+                cross_distance = extracted_shoreline.compute_transects_from_roi(
+                    extracted_shorelines_dict,
+                    transects_in_roi_gdf,
+                    settings,
+                )
             if cross_distance == 0:
                 failure_reason = "Cross distance computation failed"
 
         return cross_distance, failure_reason
 
-    def compute_transects_per_roi(self, roi_gdf: gpd.GeoDataFrame, transects_gdf: gpd.GeoDataFrame, settings: dict, roi_id: str, output_epsg: int) -> None:
+    def compute_transects_per_roi(self, roi_gdf: gpd.GeoDataFrame, transects_gdf: gpd.GeoDataFrame, settings: dict, roi_id: str, output_epsg: int, session_path: str = "") -> None:
         """
         Computes the cross distance for transects within a specific region of interest (ROI).
 
@@ -1987,6 +2037,7 @@ class CoastSeg_Map:
             settings (dict): Dictionary of settings.
             roi_id (str): ID of the ROI.
             output_epsg (int): EPSG code for the output coordinate reference system.
+            session_path (str, optional): The session directory containing the previously computed transect intersections. Defaults to "".
 
         Returns:
             None: The cross distance is computed and logged. If the cross distance is 0, a warning message is logged.
@@ -1998,7 +2049,7 @@ class CoastSeg_Map:
             transects_gdf.intersects(single_roi.unary_union)
         ]
         cross_distance, failure_reason = self.get_cross_distance(
-            str(roi_id), transects_in_roi_gdf, settings, output_epsg
+            str(roi_id), transects_in_roi_gdf, settings, output_epsg, session_path
         )
         if cross_distance == 0:
             logger.warning(f"{failure_reason} for ROI {roi_id}")
@@ -2043,10 +2094,10 @@ class CoastSeg_Map:
         output_epsg = "epsg:" + str(settings["output_epsg"])
         # for each ROI save cross distances for each transect that intersects each extracted shoreline
         for roi_id in tqdm(roi_ids, desc="Computing Cross Distance Transects"):
-            cross_distance = self.compute_transects_per_roi(self.rois.gdf,transects_gdf, settings, roi_id, output_epsg)
+            session_path = self.create_session(self.get_session_name(), roi_id, save_config=False)
+            cross_distance = self.compute_transects_per_roi(self.rois.gdf,transects_gdf, settings, roi_id, output_epsg, session_path)
             self.rois.add_cross_shore_distances(cross_distance, roi_id)
             # save all the files that use the cross distance (aka the timeseries of shoreline intersections along transects)
-            session_path = self.create_session(self.get_session_name(), roi_id, save_config=False)
             self.save_transect_timeseries(session_path,self.rois.get_extracted_shoreline(roi_id),roi_id)
 
 
@@ -2116,7 +2167,11 @@ class CoastSeg_Map:
                     logger.info(f"No extracted shorelines for ROI: {roi_id}")
                     continue
                 # save the geojson and json files for extracted shorelines
-                common.save_extracted_shorelines(extracted_shoreline, session_path)
+                common.save_extracted_shorelines(
+                    extracted_shoreline,
+                    session_path,
+                    file_utilities.get_output_format(self.get_settings()),
+                )
 
                 # save transects to session folder
                 if save_transects:
@@ -2161,6 +2216,7 @@ class CoastSeg_Map:
             self.get_settings(),
             self.transects.gdf,
             drop_intersection_pts,
+            file_utilities.get_output_format(self.get_settings()),
         )
             
             
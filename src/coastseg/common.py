@@ -18,8 +18,10 @@ import ee
 import geopandas as gpd
 import numpy as np
 import pandas as pd
+import pyproj
 import requests
 import shapely
+from scipy.spatial import cKDTree
 from area import area
 from ipyfilechooser import FileChooser
 from ipywidgets import HTML, HBox, Layout, ToggleButton, VBox
@@ -28,6 +30,11 @@ from requests.exceptions import SSLError
 from shapely import geometry
 from shapely.geometry import LineString, MultiPoint, Point, Polygon
 from tqdm.auto import tqdm
+from coastsat.SDS_download import (
+    format_date,
+    parse_date_from_filename,
+    read_metadata_file,
+)
 
 # Internal dependencies imports
 from coastseg import exceptions, file_utilities
@@ -671,6 +678,12 @@ def update_extracted_shorelines_dict_transects_dict(
                 extracted_shorelines_dict, selected_indexes
             )
             file_utilities.to_file(extracted_shorelines_dict, json_file)
+            # keep the npz copy of the extracted shorelines dictionary in sync with the json file
+            npz_file = os.path.splitext(json_file)[0] + ".npz"
+            if os.path.isfile(npz_file):
+                file_utilities.save_extracted_shorelines_npz(
+                    extracted_shorelines_dict, npz_file
+                )
 
 
 def delete_selected_indexes(input_dict, selected_indexes):
@@ -714,6 +727,8 @@ def load_settings(
         "image_size_filter",
         "pan_off",
         "save_figure",
+        "figure_mode",
+        "output_format",
         "adjust_detection",
         "check_detection",
         "landsat_collection",
@@ -1323,6 +1338,163 @@ def get_response(url, stream=True):
     return response
 
 
+# name of the file in each ROI directory that caches the contents of the metadata files
+METADATA_CACHE_FILENAME = "metadata_cache.json"
+METADATA_CACHE_VERSION = 1
+
+
+def load_metadata_cache(cache_path: str) -> dict:
+    """
+    Loads the metadata cache created by get_cached_metadata.
+
+    Args:
+        cache_path (str): The path to the metadata cache file.
+
+    Returns:
+        dict: The cached metadata of each metadata file, keyed by the path of the file relative to the ROI directory.
+        Each entry contains the "size" and "mtime" of the file when it was read and its "metadata".
+        An empty dictionary is returned if the cache does not exist or cannot be read.
+    """
+    if not os.path.isfile(cache_path):
+        return {}
+    try:
+        with open(cache_path, "r") as f:
+            cache = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not read the metadata cache {cache_path}: {e}")
+        return {}
+    if not isinstance(cache, dict) or cache.get("version") != METADATA_CACHE_VERSION:
+        return {}
+    return cache.get("files", {})
+
+
+def save_metadata_cache(cache: dict, cache_path: str) -> None:
+    """
+    Saves the metadata cache created by get_cached_metadata.
+    The cache is written to a temporary file first so an interrupted write never leaves a partial cache.
+
+    Args:
+        cache (dict): The cached metadata of each metadata file. See load_metadata_cache.
+        cache_path (str): The path to save the metadata cache to.
+    """
+    temp_path = cache_path + ".tmp"
+    with open(temp_path, "w") as f:
+        json.dump({"version": METADATA_CACHE_VERSION, "files": cache}, f)
+    os.replace(temp_path, cache_path)
+
+
+def get_cached_metadata(inputs: dict) -> dict:
+    """
+    Gets the metadata of the downloaded images in the same format as coastsat's get_metadata.
+
+    Unlike get_metadata, the contents of each metadata .txt file are cached in metadata_cache.json
+    in the ROI directory. The cache is keyed by the path of each metadata file along with its size and
+    modification time, so only new or modified metadata files are read again. Like get_metadata, the
+    metadata is also saved to <sitename>_metadata.json in the ROI directory.
+
+    Args:
+        inputs (dict): The settings of the ROI with the following keys:
+            'sitename' (str): The name of the ROI directory.
+            'filepath' (str): The path to the directory containing the ROI directory.
+            'dates' (list): The start and end dates. Only images within the dates are included.
+            'sat_list' (list, optional): The satellites to include. Defaults to ["L5", "L7", "L8", "L9", "S2"].
+
+    Returns:
+        dict: The metadata for each satellite.
+        Example:
+        {
+            'L8':{'filenames':[], 'dates':[], 'epsg':[], 'acc_georef':[], 'im_quality':[], 'im_dimensions':[]},
+        }
+
+    Raises:
+        FileNotFoundError: If the ROI directory does not exist.
+        ValueError: If there are metadata files and the 'dates' key is missing from the inputs.
+    """
+    filepath = os.path.join(inputs["filepath"], inputs["sitename"])
+    if not os.path.exists(filepath):
+        raise FileNotFoundError(f"The directory {filepath} does not exist.")
+    cache_path = os.path.join(filepath, METADATA_CACHE_FILENAME)
+    cache = load_metadata_cache(cache_path)
+    cache_changed = False
+
+    metadata = {}
+    satellite_list = inputs.get("sat_list", ["L5", "L7", "L8", "L9", "S2"])
+    directories = os.listdir(filepath)
+    for satname in satellite_list:
+        if satname not in directories:
+            continue
+        metadata[satname] = {
+            "filenames": [],
+            "dates": [],
+            "epsg": [],
+            "acc_georef": [],
+            "im_quality": [],
+            "im_dimensions": [],
+        }
+        filepath_meta = os.path.join(filepath, satname, "meta")
+        if not os.path.exists(filepath_meta):
+            continue
+        entries = sorted(os.scandir(filepath_meta), key=lambda entry: entry.name)
+        if entries and inputs.get("dates", None) is None:
+            raise ValueError("The 'dates' key is missing from the inputs.")
+
+        # remove the metadata files that no longer exist from the cache
+        prefix = f"{satname}/meta/"
+        names = {entry.name for entry in entries}
+        for key in [key for key in cache if key.startswith(prefix)]:
+            if key[len(prefix) :] not in names:
+                del cache[key]
+                cache_changed = True
+        if not entries:
+            continue
+
+        start_date = format_date(inputs["dates"][0])
+        end_date = format_date(inputs["dates"][1])
+        for entry in entries:
+            # if the image date is outside the specified date range, skip it
+            input_date = parse_date_from_filename(entry.name)
+            if input_date < start_date or input_date > end_date:
+                continue
+            key = prefix + entry.name
+            stat = entry.stat()
+            cached = cache.get(key)
+            if (
+                cached is None
+                or cached["size"] != stat.st_size
+                or cached["mtime"] != stat.st_mtime_ns
+            ):
+                cached = {
+                    "size": stat.st_size,
+                    "mtime": stat.st_mtime_ns,
+                    "metadata": read_metadata_file(entry.path),
+                }
+                cache[key] = cached
+                cache_changed = True
+            meta_info = cached["metadata"]
+
+            metadata[satname]["filenames"].append(meta_info["filename"])
+            metadata[satname]["acc_georef"].append(meta_info["acc_georef"])
+            metadata[satname]["epsg"].append(meta_info["epsg"])
+            metadata[satname]["dates"].append(
+                parse_date_from_filename(meta_info["filename"])
+            )
+            metadata[satname]["im_quality"].append(meta_info["im_quality"])
+            # if the metadata file didn't contain im_height or im_width set this as an empty list
+            if meta_info["im_height"] == -1 or meta_info["im_width"] == -1:
+                metadata[satname]["im_dimensions"].append([])
+            else:
+                metadata[satname]["im_dimensions"].append(
+                    [meta_info["im_height"], meta_info["im_width"]]
+                )
+
+    if cache_changed:
+        save_metadata_cache(cache, cache_path)
+    # save a json file containing the metadata dict
+    metadata_json = os.path.join(filepath, f"{inputs['sitename']}_metadata.json")
+    file_utilities.to_file(metadata, metadata_json)
+    return metadata
+
+
 def filter_metadata(metadata: dict, sitename: str, filepath_data: str) -> dict[str]:
     """
     This function filters metadata to include only those files that exist in the given directory.
@@ -1605,10 +1777,65 @@ def export_dataframe_as_geojson(data:pd.DataFrame, output_file_path:str, x_col:s
     return output_file_path
 
 
+def order_points_by_nearest_neighbour(points: np.ndarray) -> np.ndarray:
+    """
+    Orders the points by starting at the first point and repeatedly moving to the nearest point that has not been visited.
+
+    The nearest unvisited point is found with a KD-tree. Once most of the points in the tree are visited the tree is
+    rebuilt from the unvisited points so the search does not slow down at the end of the walk.
+    When several unvisited points are the same distance away the one that comes first in points is picked.
+
+    Args:
+        points (numpy.ndarray): An array of unique points of shape (n, 2).
+
+    Returns:
+        numpy.ndarray: The indices of the points in the order they were visited.
+    """
+    num_points = len(points)
+    order = np.zeros(num_points, dtype=int)
+    if num_points <= 1:
+        return order[:num_points]
+    visited = np.zeros(num_points, dtype=bool)
+    visited[0] = True
+    current = 0
+    # the indices of the points in the tree
+    tree_indices = np.arange(num_points)
+    tree = cKDTree(points)
+    visited_in_tree = 1
+    for step in range(1, num_points):
+        # remove the visited points from the tree once they make up most of it
+        if visited_in_tree > len(tree_indices) // 2:
+            tree_indices = tree_indices[~visited[tree_indices]]
+            tree = cKDTree(points[tree_indices])
+            visited_in_tree = 0
+        # look at more and more neighbours until the nearest unvisited point is found
+        k = min(8, len(tree_indices))
+        while True:
+            distances, indices = tree.query(points[current], k=k)
+            distances = np.atleast_1d(distances)
+            neighbours = tree_indices[np.atleast_1d(indices)]
+            unvisited = ~visited[neighbours]
+            if np.any(unvisited):
+                nearest_distance = distances[unvisited].min()
+                # stop if every point as close as the nearest unvisited point was returned
+                if k == len(tree_indices) or distances[-1] > nearest_distance:
+                    current = neighbours[
+                        unvisited & (distances == nearest_distance)
+                    ].min()
+                    break
+            k = min(2 * k, len(tree_indices))
+        order[step] = current
+        visited[current] = True
+        visited_in_tree += 1
+    return order
+
+
 def create_complete_line_string(points):
     """
     Create a complete LineString from a list of points.
 
+    The points are ordered by starting at the first unique point and moving to the nearest unvisited point each time.
+
     Args:
         points (numpy.ndarray): An array of points representing the coordinates.
 
@@ -1625,36 +1852,47 @@ def create_complete_line_string(points):
     # Start with the first point in the list
     if len(unique_points) == 0:
         return None  # Return None if there are no points
-    
-    starting_point = unique_points[0]
-    current_point = starting_point
-    sorted_points = [starting_point]
-    visited_points = {tuple(starting_point)}
-
-    # Repeat until all points are visited
-    while len(visited_points) < len(unique_points):
-        nearest_distance = np.inf
-        nearest_point = None
-        for point in unique_points:
-            if tuple(point) in visited_points:
-                continue  # Skip already visited points
-            # Calculate the distance to the current point
-            distance = np.linalg.norm(point - current_point)
-            if distance < nearest_distance:
-                nearest_distance = distance
-                nearest_point = point
-
-        # Break if no unvisited nearest point was found (should not happen if all points are unique)
-        if nearest_point is None:
-            break
 
-        sorted_points.append(nearest_point)
-        visited_points.add(tuple(nearest_point))
-        current_point = nearest_point
+    sorted_points = unique_points[order_points_by_nearest_neighbour(unique_points)]
 
     # Convert the sorted list of points to a LineString
     return LineString(sorted_points)
 
+def create_complete_line_strings(points: np.ndarray, index: np.ndarray, num_lines: int) -> list:
+    """
+    Create a complete LineString for each group of points (see create_complete_line_string).
+
+    Args:
+        points (numpy.ndarray): An array of the points of all the lines.
+        index (numpy.ndarray): The index of the line each point belongs to. Must be sorted.
+        num_lines (int): The number of lines.
+
+    Returns:
+        list: A LineString for each line. None if the line has no points or only a single unique point.
+    """
+    counts = np.bincount(index, minlength=num_lines)
+    lines = [None] * num_lines
+    ordered_points = []
+    ordered_index = []
+    for line_index, line_points in enumerate(np.split(points, np.cumsum(counts)[:-1])):
+        unique_points = np.unique(line_points, axis=0)
+        if len(unique_points) < 2:
+            continue
+        ordered_points.append(
+            unique_points[order_points_by_nearest_neighbour(unique_points)]
+        )
+        ordered_index.append(np.full(len(unique_points), line_index))
+    if ordered_points:
+        # create all the LineStrings at once
+        line_indices = np.unique(np.concatenate(ordered_index))
+        linestrings = shapely.linestrings(
+            np.concatenate(ordered_points),
+            indices=np.searchsorted(line_indices, np.concatenate(ordered_index)),
+        )
+        for line_index, linestring in zip(line_indices, linestrings):
+            lines[line_index] = linestring
+    return lines
+
 def order_linestrings_gdf(gdf,dates, output_crs='epsg:4326'):
     """
     Orders the linestrings in a GeoDataFrame by creating complete line strings from the given points.
@@ -1674,12 +1912,10 @@ def order_linestrings_gdf(gdf,dates, output_crs='epsg:4326'):
         gdf.to_crs(output_crs, inplace=True)
     else:
         gdf.set_crs(output_crs, inplace=True)
-        
-    all_points = [shapely.get_coordinates(p) for p in gdf.geometry]
-    lines = []
-    for points in all_points:
-        line_string = create_complete_line_string(points)
-        lines.append(line_string)
+
+    # get the points of all the dates at once
+    points, index = shapely.get_coordinates(np.asarray(gdf.geometry), return_index=True)
+    lines = create_complete_line_strings(points, index, len(gdf))
     
     gdf = gpd.GeoDataFrame({'geometry': lines,'date': dates},crs=output_crs)
     return gdf
@@ -1704,56 +1940,54 @@ def add_shore_points_to_timeseries(timeseries_data: pd.DataFrame,
     org_crs = transects.crs
     utm_crs = transects.estimate_utm_crs()
     transects_utm = transects.to_crs(utm_crs)
-    
-    ##need some placeholders
-    shore_x_vals = [None]*len(timeseries_data)
-    shore_y_vals = [None]*len(timeseries_data)
-    timeseries_data['shore_x'] = shore_x_vals
-    timeseries_data['shore_y'] = shore_y_vals
-
-    ##loop over all transects
-    for i in range(len(transects_utm)):
-        transect = transects_utm.iloc[i]
-        transect_id = transect['id']
-        first = transect.geometry.coords[0]
-        last = transect.geometry.coords[1]
-        
-        idx = timeseries_data['transect_id'].str.contains(transect_id)
-        ##in case there is a transect in the config_gdf that doesn't have any intersections
-        ##skip that transect
-        if np.any(idx):
-            timeseries_data_filter = timeseries_data[idx]
-        else:
-            continue
 
-        idxes = timeseries_data_filter.index
-        distances = timeseries_data_filter['cross_distance']
-
-        angle = np.arctan2(last[1] - first[1], last[0] - first[0])
-
-        shore_x_utm = first[0]+distances*np.cos(angle)
-        shore_y_utm = first[1]+distances*np.sin(angle)
-        points_utm = [shapely.Point(xy) for xy in zip(shore_x_utm, shore_y_utm)]
-
-        #conversion from utm to wgs84, put them in the transect_timeseries csv and utm gdf
-        dummy_gdf_utm = gpd.GeoDataFrame({'geometry':points_utm},
-                                         crs=utm_crs)
-        dummy_gdf_wgs84 = dummy_gdf_utm.to_crs(org_crs)
+    # the origin and angle of each transect in UTM
+    geometries = np.asarray(transects_utm.geometry)
+    first = shapely.get_point(geometries, 0)
+    last = shapely.get_point(geometries, 1)
+    transect_origins = pd.DataFrame(
+        {
+            "x": shapely.get_x(first),
+            "y": shapely.get_y(first),
+            "angle": np.arctan2(
+                shapely.get_y(last) - shapely.get_y(first),
+                shapely.get_x(last) - shapely.get_x(first),
+            ),
+        },
+        index=transects_utm["id"].astype(str),
+    )
+    # if a transect id is repeated use the last transect with that id
+    transect_origins = transect_origins[
+        ~transect_origins.index.duplicated(keep="last")
+    ]
 
-        points_wgs84 = [shapely.get_coordinates(p) for p in dummy_gdf_wgs84.geometry]
-        points_wgs84 = np.array(points_wgs84)
-        points_wgs84 = points_wgs84.reshape(len(points_wgs84),2)
-        x_wgs84 = points_wgs84[:,0]
-        y_wgs84 = points_wgs84[:,1]
-        timeseries_data.loc[idxes,'shore_x'] = x_wgs84
-        timeseries_data.loc[idxes,'shore_y'] = y_wgs84
+    # join each row of the timeseries to its transect by the exact transect id
+    ##in case there is a transect in the config_gdf that doesn't have any intersections the row is NaN
+    matched = transect_origins.reindex(timeseries_data["transect_id"].astype(str))
+    distances = timeseries_data["cross_distance"].to_numpy(dtype=float)
+    angles = matched["angle"].to_numpy()
+    shore_x_utm = matched["x"].to_numpy() + distances * np.cos(angles)
+    shore_y_utm = matched["y"].to_numpy() + distances * np.sin(angles)
+
+    #conversion from utm to the crs of the transects for all the points at once
+    shore_x = np.full(len(timeseries_data), np.nan)
+    shore_y = np.full(len(timeseries_data), np.nan)
+    valid = np.isfinite(shore_x_utm) & np.isfinite(shore_y_utm)
+    if np.any(valid):
+        transformer = pyproj.Transformer.from_crs(utm_crs, org_crs, always_xy=True)
+        shore_x[valid], shore_y[valid] = transformer.transform(
+            shore_x_utm[valid], shore_y_utm[valid]
+        )
+    timeseries_data['shore_x'] = shore_x
+    timeseries_data['shore_y'] = shore_y
 
     return timeseries_data
 
 def add_lat_lon_to_timeseries(merged_timeseries_df, transects_gdf,timeseries_df,
                               save_location:str,
                               only_keep_points_on_transects:bool=False,
-                              extension:str=""):
+                              extension:str="",
+                              output_format:str="geojson"):
     """
     Adds latitude and longitude coordinates to a timeseries dataframe based on shoreline positions.
 
@@ -1765,6 +1999,7 @@ def add_lat_lon_to_timeseries(merged_timeseries_df, transects_gdf,timeseries_df,
         only_keep_points_on_transects (bool, optional): Whether to keep only the points that fall on the transects. 
                                                   Defaults to False.
         extension (str, optional): An extension to add to the output filenames. Defaults to "".
+        output_format (str, optional): The format to save the points and vectors in: "geojson", "geoparquet" or "flatgeobuf". Defaults to "geojson".
         
 
     Returns:
@@ -1800,11 +2035,11 @@ def add_lat_lon_to_timeseries(merged_timeseries_df, transects_gdf,timeseries_df,
     
     new_gdf_shorelines_wgs84=convert_points_to_linestrings(cross_shore_pts, group_col='date', output_crs='epsg:4326')
     new_gdf_shorelines_wgs84_path = os.path.join(save_location, f'{ext}_transect_time_series_vectors.geojson')
-    new_gdf_shorelines_wgs84.to_file(new_gdf_shorelines_wgs84_path)
+    file_utilities.write_geodata_file(new_gdf_shorelines_wgs84, new_gdf_shorelines_wgs84_path, output_format)
     
     # save the merged time series that includes the shore_x and shore_y columns to a geojson file and a  csv file
     merged_timeseries_gdf_cleaned = convert_date_gdf(merged_timeseries_gdf.drop(columns=['x','y','shore_x','shore_y','cross_distance']).rename(columns={'dates':'date'}).to_crs('epsg:4326'))
-    merged_timeseries_gdf_cleaned.to_file(os.path.join(save_location, f"{ext}_transect_time_series_points.geojson"), driver='GeoJSON')
+    file_utilities.write_geodata_file(merged_timeseries_gdf_cleaned, os.path.join(save_location, f"{ext}_transect_time_series_points.geojson"), output_format)
     merged_timeseries_df = pd.DataFrame(merged_timeseries_gdf.drop(columns=['geometry']))
 
     return merged_timeseries_df,timeseries_df
@@ -1832,6 +2067,7 @@ def intersect_with_buffered_transects(points_gdf, transects, buffer_distance = 0
     """
     Intersects points from a GeoDataFrame with another GeoDataFrame and exports the result to a new GeoDataFrame, retaining all original attributes.
     Additionally, returns the points that do not intersect with the buffered transects.
+    Each point is only checked against the transect whose id matches the point's transect_id.
     
     Parameters:
     - points_gdf: GeoDataFrame - The input GeoDataFrame containing the points to be intersected.
@@ -1843,17 +2079,33 @@ def intersect_with_buffered_transects(points_gdf, transects, buffer_distance = 0
     - dropped_rows: GeoDataFrame - The rows that were filtered out during the intersection process.
     """
     
-    buffered_lines_gdf = transects.copy()  # Create a copy to preserve the original data
-    buffered_lines_gdf['geometry'] = transects.geometry.buffer(buffer_distance)
-    points_within_buffer = points_gdf[points_gdf.geometry.within(buffered_lines_gdf.unary_union)]
-    
-    grouped = points_within_buffer.groupby('transect_id')
-    
-    # Filter out points not within their respective buffered transect
-    filtered = grouped.filter(lambda x: x.geometry.within(buffered_lines_gdf[buffered_lines_gdf['id'].isin(x['transect_id'])].unary_union).all())
+    # pair each point with the transect(s) that have the same id as its transect_id
+    point_transects = pd.DataFrame(
+        {
+            "id": points_gdf["transect_id"].astype(str).to_numpy(),
+            "point": np.arange(len(points_gdf)),
+        }
+    ).merge(
+        pd.DataFrame(
+            {
+                "id": transects["id"].astype(str).to_numpy(),
+                "transect": np.arange(len(transects)),
+            }
+        ),
+        on="id",
+    )
+    # a point is within the buffered transect if it is within the buffer distance of the transect
+    on_transect = shapely.dwithin(
+        np.asarray(points_gdf.geometry)[point_transects["point"].to_numpy()],
+        np.asarray(transects.geometry)[point_transects["transect"].to_numpy()],
+        buffer_distance,
+    )
+    keep = np.zeros(len(points_gdf), dtype=bool)
+    keep[point_transects["point"].to_numpy()[on_transect]] = True
 
-    # Identify the dropped rows by comparing the original dataframe within the buffer and the filtered results
-    dropped_rows = points_gdf[~points_gdf.index.isin(filtered.index)]
+    # Filter out points not within their respective buffered transect
+    filtered = points_gdf[keep]
+    dropped_rows = points_gdf[~keep]
 
     return filtered, dropped_rows
 
@@ -1890,6 +2142,7 @@ def save_transects(
     settings: dict,
     transects_gdf:gpd.GeoDataFrame,
     drop_intersection_pts = False,
+    output_format: str = "geojson",
 ) -> None:
     """
     Save transect data, including raw timeseries, intersection data, and cross distances.
@@ -1903,6 +2156,7 @@ def save_transects(
         - This will generated a file called "dropped_points_time_series.csv" that contains the points that were filtered out. If only_keep_points_on_transects is True.
         - Any shoreline points that were not on the transects will be removed from "raw_transect_time_series.csv" by setting those values to NaN.v If only_keep_points_on_transects is True.
         - The "raw_transect_time_series_merged.csv" will not contain any points that were not on the transects. If only_keep_points_on_transects is True.
+        output_format (str): The format to save the points and vectors of the time series in: "geojson", "geoparquet" or "flatgeobuf". Default is "geojson".
 
     Returns:
         None.
@@ -1927,7 +2181,8 @@ def save_transects(
     merged_timeseries_df,timeseries_df = add_lat_lon_to_timeseries(merged_timeseries_df, transects_gdf.to_crs('epsg:4326'),cross_distance_df,
                               save_location,
                               drop_intersection_pts,
-                              "raw")
+                              "raw",
+                              output_format)
     # save the raw transect time series which contains the columns ['dates', 'x', 'y', 'transect_id', 'cross_distance','shore_x','shore_y']  to file
     filepath = os.path.join(save_location, "raw_transect_time_series_merged.csv")
     merged_timeseries_df.to_csv(filepath, sep=",",index=False) 
@@ -1981,12 +2236,20 @@ def filter_dropped_points_out_of_timeseries(timeseries_df:pd.DataFrame, dropped_
     Returns:
         pandas.DataFrame: The filtered timeseries dataframe with dropped points set to NaN.
     """
-    # Iterate through unique transect ids from drop_df to avoid setting the same column multiple times
-    for t_id in dropped_points_df['transect_id'].unique():
-        # Find all the dates associated with this transect_id in dropped_points_df
-        dates_to_drop = dropped_points_df.loc[dropped_points_df['transect_id'] == t_id, 'dates']
-        timeseries_df.loc[timeseries_df['dates'].isin(dates_to_drop), t_id] = np.nan
-    return timeseries_df
+    # only the transects that are columns in the timeseries can be filtered
+    dropped_points = dropped_points_df.loc[
+        dropped_points_df['transect_id'].isin(timeseries_df.columns), ['dates', 'transect_id']
+    ].drop_duplicates()
+    if dropped_points.empty:
+        return timeseries_df
+    # make a mask of dates x transect ids that is True for each dropped point
+    dropped_mask = pd.crosstab(dropped_points['dates'], dropped_points['transect_id']) > 0
+    # align the mask with the rows and columns of the timeseries
+    dropped_mask = dropped_mask.reindex(
+        index=timeseries_df['dates'], columns=timeseries_df.columns, fill_value=False
+    )
+    dropped_mask.index = timeseries_df.index
+    return timeseries_df.mask(dropped_mask)
 
 
 def convert_points_to_linestrings(gdf, group_col='date', output_crs='epsg:4326') -> gpd.GeoDataFrame:
@@ -2495,12 +2758,12 @@ def clear_row(row: HBox):
     row.children = []
 
 
-def download_url(url: str, save_path: str, filename: str = None, chunk_size: int = 128):
+def download_url(url: str, save_path: str, filename: str = None, chunk_size: int = 1024 * 1024):
     """Downloads the data from the given url to the save_path location.
     Args:
         url (str): url to data to download
         save_path (str): directory to save data
-        chunk_size (int, optional):  Defaults to 128.
+        chunk_size (int, optional): The number of bytes read at a time. Defaults to 1 MB.
     """
     logger.info(f"download url: {url}")
     # get a response from the url
@@ -2754,19 +3017,21 @@ def get_transect_points_dict(feature: gpd.GeoDataFrame) -> dict:
             '<transect_id>': array([[start point],
                         [end point]]),}
     """
-    features = []
     # Use explode to break multilinestrings in linestrings
     feature_exploded = feature.explode(ignore_index=True)
-    # For each linestring portion of feature convert to lat,lon tuples
-    lat_lng = feature_exploded.apply(
-        lambda row: {str(row.id): np.array(np.array(row.geometry.coords).tolist())},
-        axis=1,
+    include_z = bool(feature_exploded.has_z.all())
+    # get the coordinates of all the linestrings at once along with the index of the linestring each belongs to
+    coords, index = shapely.get_coordinates(
+        np.asarray(feature_exploded.geometry),
+        include_z=include_z,
+        return_index=True,
     )
-    features = list(lat_lng)
-    new_dict = {}
-    for item in list(features):
-        new_dict = {**new_dict, **item}
-    return new_dict
+    # split the coordinates into one array per linestring
+    counts = np.bincount(index, minlength=len(feature_exploded))
+    linestring_coords = np.split(coords, np.cumsum(counts)[:-1])
+    transect_ids = feature_exploded["id"].astype(str)
+    # when a transect was exploded into several linestrings the last one is kept
+    return dict(zip(transect_ids, linestring_coords))
 
 
 def get_cross_distance_df(
@@ -2939,7 +3204,9 @@ def convert_linestrings_to_multipoints(gdf: gpd.GeoDataFrame) -> gpd.GeoDataFram
 
 
 def save_extracted_shorelines(
-    extracted_shorelines: "Extracted_Shoreline", save_path: str
+    extracted_shorelines: "Extracted_Shoreline",
+    save_path: str,
+    output_format: str = "geojson",
 ):
     """
     Save extracted shorelines, settings, and dictionary to their respective files.
@@ -2948,9 +3215,11 @@ def save_extracted_shorelines(
     - extracted_shorelines.geojson: contains the extracted shorelines as a GeoJSON object.
     - shoreline_settings.json: contains the shoreline settings as JSON data.
     - extracted_shorelines_dict.json: contains the extracted shorelines dictionary as JSON data.
+    - extracted_shorelines_dict.npz: contains the extracted shorelines dictionary in a columnar binary format.
 
     :param extracted_shorelines: An Extracted_Shoreline object containing the extracted shorelines, shoreline settings, and dictionary.
     :param save_path: The path where the output files will be saved.
+    :param output_format: The format to save the shoreline lines and points in: "geojson", "geoparquet" or "flatgeobuf". Defaults to "geojson".
     """
     if extracted_shorelines is None:
         logger.warning("No extracted shorelines to save.")
@@ -2962,16 +3231,20 @@ def save_extracted_shorelines(
         geomtype="lines",
     )
 
-    # Save extracted shorelines to GeoJSON files
-    extracted_shorelines.to_file(
-        save_path, "extracted_shorelines_lines.geojson", extracted_shorelines_gdf_lines
+    # Save extracted shorelines to GeoJSON files (or the output format)
+    file_utilities.write_geodata_file(
+        extracted_shorelines_gdf_lines,
+        os.path.join(save_path, "extracted_shorelines_lines.geojson"),
+        output_format,
     )
     # convert linestrings to multipoints
     points_gdf = convert_linestrings_to_multipoints(extracted_shorelines_gdf_lines)
     projected_gdf = stringify_datetime_columns(points_gdf)
-    # Save extracted shorelines as a GeoJSON file
-    extracted_shorelines.to_file(
-        save_path, "extracted_shorelines_points.geojson", projected_gdf
+    # Save extracted shorelines as a GeoJSON file (or the output format)
+    file_utilities.write_geodata_file(
+        projected_gdf,
+        os.path.join(save_path, "extracted_shorelines_points.geojson"),
+        output_format,
     )
 
     # Save shoreline settings as a JSON file
@@ -2987,6 +3260,11 @@ def save_extracted_shorelines(
         "extracted_shorelines_dict.json",
         extracted_shorelines.dictionary,
     )
+    # Save extracted shorelines dictionary in the columnar npz format which is faster to load
+    file_utilities.save_extracted_shorelines_npz(
+        extracted_shorelines.dictionary,
+        os.path.join(save_path, "extracted_shorelines_dict.npz"),
+    )
 
 
 def stringify_datetime_columns(gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
@@ -3177,6 +3455,7 @@ def save_config_files(
     shoreline_extraction_area_gdf=None,
     roi_gdf=None,
     epsg_code="epsg:4326",
+    output_format: str = "geojson",
 ):
     """
     Save configuration files.
@@ -3190,6 +3469,7 @@ def save_config_files(
         shorelines_gdf (GeoDataFrame): GeoDataFrame containing shorelines.
         roi_gdf (GeoDataFrame): GeoDataFrame containing ROIs.
         epsg_code (str): EPSG code for the coordinate reference system.
+        output_format (str): The format to save config_gdf in: "geojson", "geoparquet" or "flatgeobuf". Defaults to "geojson".
 
     Returns:
         None
@@ -3208,7 +3488,7 @@ def save_config_files(
         epsg_code=epsg_code,
         shoreline_extraction_area_gdf = shoreline_extraction_area_gdf
     )
-    file_utilities.config_to_file(config_gdf, save_location)
+    file_utilities.config_to_file(config_gdf, save_location, output_format)
 
 
 def rename_jpgs(src_path: str) -> None:
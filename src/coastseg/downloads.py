@@ -1,14 +1,19 @@
 import asyncio
 import concurrent.futures
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 import glob
+import hashlib
 import json
 import logging
 import math
 import os
 import platform
+import re
 import shutil
+import threading
+import time
 import zipfile
+from urllib.parse import urlparse
 
 import aiohttp
 import area
@@ -24,9 +29,21 @@ from typing import Collection, List, Optional, Tuple, Union
 
 from coastseg import common
 from coastseg import file_utilities
+from coastsat import SDS_download
+from coastsat.SDS_download import format_date
 
 logger = logging.getLogger(__name__)
 
+# name of the file in each ROI directory that records the imagery that was retrieved
+DOWNLOAD_MANIFEST_FILENAME = "download_manifest.json"
+DOWNLOAD_MANIFEST_VERSION = 1
+# imagery is added to Earth Engine some days after it is acquired so the most recent dates are never recorded as retrieved
+EE_INGESTION_DELAY = timedelta(days=7)
+# the logger coastsat's retrieve_images logs the images that failed to download to
+COASTSAT_DOWNLOAD_LOGGER = "satellite_download_logger"
+# matches the satellite in the errors retrieve_images logs when an image fails to download
+DOWNLOAD_FAILURE_PATTERN = re.compile(r"download for satellite (\S+) ")
+
 
 def get_collection_by_tier(
     polygon: List[List[float]],
@@ -191,6 +208,758 @@ def count_images_in_ee_collection(
     return image_counts
 
 
+def load_download_manifest(roi_path: str) -> dict:
+    """
+    Loads the download manifest of the ROI directory.
+
+    The manifest records the date ranges each satellite's imagery was retrieved for along with the download settings used,
+    and the filename and date of each image that was retrieved.
+    Example:
+    {
+        "version": 1,
+        "coverage": [
+            {"satname": "L8", "dates": ["2020-01-01T00:00:00+00:00", "2021-01-01T00:00:00+00:00"], "download_settings": {...}}
+        ],
+        "images": {"L8": {"2020-01-05-15-30-12_L8_ID_1_ms.tif": "2020-01-05T15:30:12+00:00"}}
+    }
+
+    Args:
+        roi_path (str): The path to the ROI directory.
+
+    Returns:
+        dict: The download manifest. An empty manifest is returned if it doesn't exist or cannot be read.
+    """
+    manifest_path = os.path.join(roi_path, DOWNLOAD_MANIFEST_FILENAME)
+    manifest = file_utilities.read_json_file(manifest_path) if os.path.isfile(manifest_path) else {}
+    if not manifest or manifest.get("version") != DOWNLOAD_MANIFEST_VERSION:
+        return {"version": DOWNLOAD_MANIFEST_VERSION, "coverage": [], "images": {}}
+    manifest.setdefault("coverage", [])
+    manifest.setdefault("images", {})
+    return manifest
+
+
+def save_download_manifest(manifest: dict, roi_path: str) -> None:
+    """
+    Saves the download manifest to the ROI directory.
+    The manifest is written to a temporary file first so an interrupted write never leaves a partial manifest.
+
+    Args:
+        manifest (dict): The download manifest. See load_download_manifest.
+        roi_path (str): The path to the ROI directory.
+    """
+    manifest_path = os.path.join(roi_path, DOWNLOAD_MANIFEST_FILENAME)
+    temp_path = manifest_path + ".tmp"
+    file_utilities.to_file(manifest, temp_path)
+    os.replace(temp_path, manifest_path)
+
+
+def get_download_settings(inputs: dict, **kwargs) -> dict:
+    """
+    Returns the settings that control which images are retrieved for the ROI.
+    Imagery retrieved with different download settings is not considered retrieved.
+
+    Args:
+        inputs (dict): The settings of the ROI. The "landsat_collection" is included in the download settings.
+        **kwargs: The keyword arguments passed to SDS_download.retrieve_images.
+
+    Returns:
+        dict: The download settings in a form that can be saved to JSON.
+    """
+    download_settings = dict(kwargs, landsat_collection=inputs.get("landsat_collection"))
+    return json.loads(json.dumps(download_settings, sort_keys=True, default=str))
+
+
+def get_uncovered_date_ranges(
+    covered_ranges: List[Tuple[datetime, datetime]],
+    start_date: datetime,
+    end_date: datetime,
+) -> List[Tuple[datetime, datetime]]:
+    """
+    Returns the parts of the date range from start_date to end_date that are not within any of the covered ranges.
+
+    Args:
+        covered_ranges (List[Tuple[datetime, datetime]]): The start and end dates of the ranges that are covered.
+        start_date (datetime): The start of the date range.
+        end_date (datetime): The end of the date range.
+
+    Returns:
+        List[Tuple[datetime, datetime]]: The start and end dates of the ranges that are not covered in chronological order.
+    """
+    uncovered_ranges = []
+    current_date = start_date
+    for covered_start, covered_end in sorted(covered_ranges):
+        if covered_end <= current_date:
+            continue
+        if covered_start >= end_date:
+            break
+        if covered_start > current_date:
+            uncovered_ranges.append((current_date, covered_start))
+        current_date = max(current_date, covered_end)
+    if current_date < end_date:
+        uncovered_ranges.append((current_date, end_date))
+    return uncovered_ranges
+
+
+def get_inputs_to_retrieve(manifest: dict, inputs: dict, download_settings: dict) -> Optional[dict]:
+    """
+    Narrows the inputs of the ROI to the satellites and date range that have not been retrieved
+    with the same download settings according to the download manifest.
+
+    Args:
+        manifest (dict): The download manifest of the ROI. See load_download_manifest.
+        inputs (dict): The settings of the ROI. Must contain the "dates" and "sat_list" keys.
+        download_settings (dict): The download settings. See get_download_settings.
+
+    Returns:
+        dict or None: A copy of the inputs with the "sat_list" and "dates" narrowed to the imagery that has not been retrieved.
+        None if all the imagery has already been retrieved.
+    """
+    start_date = format_date(inputs["dates"][0])
+    end_date = format_date(inputs["dates"][1])
+    sat_list = []
+    uncovered_ranges = []
+    for satname in inputs["sat_list"]:
+        covered_ranges = [
+            (format_date(coverage["dates"][0][:19]), format_date(coverage["dates"][1][:19]))
+            for coverage in manifest.get("coverage", [])
+            if coverage["satname"] == satname
+            and coverage["download_settings"] == download_settings
+        ]
+        sat_uncovered_ranges = get_uncovered_date_ranges(covered_ranges, start_date, end_date)
+        if sat_uncovered_ranges:
+            sat_list.append(satname)
+            uncovered_ranges.extend(sat_uncovered_ranges)
+    if not sat_list:
+        return None
+    inputs_to_retrieve = dict(inputs)
+    inputs_to_retrieve["sat_list"] = sat_list
+    # coastsat downloads a single date range so the date range covers all the dates that were not retrieved
+    narrowed_start = min(start for start, _ in uncovered_ranges)
+    narrowed_end = max(end for _, end in uncovered_ranges)
+    if (narrowed_start, narrowed_end) != (start_date, end_date):
+        inputs_to_retrieve["dates"] = [
+            narrowed_start.strftime("%Y-%m-%d"),
+            narrowed_end.strftime("%Y-%m-%d"),
+        ]
+    return inputs_to_retrieve
+
+
+class DownloadFailureRecorder(logging.Handler):
+    """
+    Records the satellites whose images coastsat's retrieve_images failed to download.
+
+    retrieve_images logs each image that failed to download and carries on with the next image, so the failures
+    are only known from its log. Only the records logged by the thread that created the recorder are used
+    because several ROIs can be retrieved at once in different threads.
+    """
+
+    def __init__(self, sat_list: Collection[str]):
+        """
+        Args:
+            sat_list (Collection[str]): The satellites being retrieved.
+                All of them are recorded as failed if an error doesn't name the satellite.
+        """
+        super().__init__(level=logging.ERROR)
+        self.sat_list = list(sat_list)
+        self.thread_id = threading.get_ident()
+        self.failed_satellites = set()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if record.thread != self.thread_id:
+            return
+        match = DOWNLOAD_FAILURE_PATTERN.search(record.getMessage())
+        if match and match.group(1) in self.sat_list:
+            self.failed_satellites.add(match.group(1))
+        else:
+            self.failed_satellites.update(self.sat_list)
+
+
+def update_download_manifest(
+    manifest: dict,
+    retrieved_inputs: dict,
+    download_settings: dict,
+    metadata: dict,
+    now: datetime = None,
+    failed_satellites: Collection[str] = (),
+) -> dict:
+    """
+    Records the imagery that was retrieved in the download manifest.
+
+    The date range of each satellite that was retrieved is recorded as covered, except for the most recent dates
+    because imagery is added to Earth Engine some days after it is acquired (see EE_INGESTION_DELAY).
+    The date range of the satellites with images that failed to download is not recorded as covered so they are retrieved again.
+
+    Args:
+        manifest (dict): The download manifest of the ROI. See load_download_manifest.
+        retrieved_inputs (dict): The inputs imagery was retrieved with. Must contain the "dates" and "sat_list" keys.
+        download_settings (dict): The download settings. See get_download_settings.
+        metadata (dict): The metadata of the imagery in the ROI directory. See common.get_cached_metadata.
+        now (datetime, optional): The current time. Defaults to None which uses the current UTC time.
+        failed_satellites (Collection[str], optional): The satellites with images that failed to download. Defaults to ().
+
+    Returns:
+        dict: The updated download manifest.
+    """
+    now = now or datetime.now(timezone.utc)
+    start_date = format_date(retrieved_inputs["dates"][0])
+    # the dates are recorded as whole days
+    latest_date = format_date((now - EE_INGESTION_DELAY).strftime("%Y-%m-%d"))
+    end_date = min(format_date(retrieved_inputs["dates"][1]), latest_date)
+    for satname in retrieved_inputs["sat_list"]:
+        if end_date <= start_date:
+            break
+        if satname in failed_satellites:
+            continue
+        covered_ranges = [(start_date, end_date)]
+        coverage_to_keep = []
+        for coverage in manifest["coverage"]:
+            if coverage["satname"] == satname and coverage["download_settings"] == download_settings:
+                covered_ranges.append(
+                    (format_date(coverage["dates"][0][:19]), format_date(coverage["dates"][1][:19]))
+                )
+            else:
+                coverage_to_keep.append(coverage)
+        # merge the overlapping date ranges
+        merged_ranges = []
+        for covered_start, covered_end in sorted(covered_ranges):
+            if merged_ranges and covered_start <= merged_ranges[-1][1]:
+                merged_ranges[-1][1] = max(merged_ranges[-1][1], covered_end)
+            else:
+                merged_ranges.append([covered_start, covered_end])
+        manifest["coverage"] = coverage_to_keep + [
+            {
+                "satname": satname,
+                "dates": [covered_start.isoformat(), covered_end.isoformat()],
+                "download_settings": download_settings,
+            }
+            for covered_start, covered_end in merged_ranges
+        ]
+    for satname, sat_metadata in metadata.items():
+        images = manifest["images"].setdefault(satname, {})
+        for filename, date in zip(sat_metadata.get("filenames", []), sat_metadata.get("dates", [])):
+            images[filename] = date.isoformat() if isinstance(date, datetime) else str(date)
+    return manifest
+
+
+def retrieve_new_images(inputs: dict, use_manifest: bool = True, **kwargs) -> None:
+    """
+    Retrieves the imagery of the ROI with SDS_download.retrieve_images, skipping the satellites and dates that
+    were already retrieved with the same download settings according to the ROI's download manifest.
+    The dates of a satellite are not recorded as retrieved if any of its images failed to download.
+
+    Args:
+        inputs (dict): The settings of the ROI. Must contain the "filepath", "sitename", "dates" and "sat_list" keys.
+        use_manifest (bool, optional): If False all the imagery is retrieved again. The manifest is still updated. Defaults to True.
+        **kwargs: Passed to SDS_download.retrieve_images. ex. cloud_threshold, months_list
+    """
+    roi_path = os.path.join(inputs["filepath"], inputs["sitename"])
+    manifest = load_download_manifest(roi_path)
+    download_settings = get_download_settings(inputs, **kwargs)
+    inputs_to_retrieve = inputs
+    if use_manifest:
+        inputs_to_retrieve = get_inputs_to_retrieve(manifest, inputs, download_settings)
+        if inputs_to_retrieve is None:
+            num_images = sum(len(images) for images in manifest["images"].values())
+            print(f"{inputs['sitename']}: All {num_images} images for {inputs['sat_list']} during {inputs['dates']} were already retrieved")
+            return
+        logger.info(
+            f"{inputs['sitename']}: retrieving {inputs_to_retrieve['sat_list']} during {inputs_to_retrieve['dates']}"
+        )
+    failure_recorder = DownloadFailureRecorder(inputs_to_retrieve["sat_list"])
+    download_logger = logging.getLogger(COASTSAT_DOWNLOAD_LOGGER)
+    download_logger.addHandler(failure_recorder)
+    try:
+        SDS_download.retrieve_images(inputs_to_retrieve, **kwargs)
+    finally:
+        download_logger.removeHandler(failure_recorder)
+    if failure_recorder.failed_satellites:
+        logger.warning(
+            f"{inputs['sitename']}: some {sorted(failure_recorder.failed_satellites)} images failed to download. They will be retrieved again next time."
+        )
+    # record the imagery that was retrieved
+    metadata = common.get_cached_metadata(inputs)
+    manifest = update_download_manifest(
+        manifest,
+        inputs_to_retrieve,
+        download_settings,
+        metadata,
+        failed_satellites=failure_recorder.failed_satellites,
+    )
+    save_download_manifest(manifest, roi_path)
+
+
+# number of bytes read at a time when a file is downloaded
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+# HTTP status codes that mean the request can succeed if it is made again later
+RETRY_STATUS_CODES = (408, 429, 500, 502, 503, 504)
+# host name used to rate limit the requests made to Earth Engine by coastsat's retrieve_images
+EE_HOST = "earthengine.googleapis.com"
+
+
+class HostRateLimiter:
+    """
+    Spaces out the requests made to each host so that no more than requests_per_second requests are started each second.
+    The rate limiter can be shared by threads and coroutines.
+    """
+
+    def __init__(self, requests_per_second: float = None):
+        """
+        Args:
+            requests_per_second (float, optional): The maximum number of requests started each second for each host.
+                Defaults to None which does not limit the requests.
+        """
+        self.min_interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self._next_request_times = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, host: str) -> float:
+        """
+        Reserves the next request to the host.
+
+        Args:
+            host (str): The host the request is made to.
+
+        Returns:
+            float: The number of seconds to wait before making the request.
+        """
+        with self._lock:
+            now = time.monotonic()
+            request_time = max(now, self._next_request_times.get(host, now))
+            self._next_request_times[host] = request_time + self.min_interval
+            return request_time - now
+
+    def wait(self, host: str) -> None:
+        """Blocks until a request can be made to the host."""
+        time.sleep(self.reserve(host))
+
+    async def async_wait(self, host: str) -> None:
+        """Waits until a request can be made to the host."""
+        await asyncio.sleep(self.reserve(host))
+
+
+def get_backoff_delay(
+    attempt: int,
+    backoff_factor: float = 1.0,
+    max_delay: float = 60.0,
+    retry_after: Optional[float] = None,
+) -> float:
+    """
+    Returns the number of seconds to wait before retrying a request.
+
+    Args:
+        attempt (int): The number of attempts that failed so far, starting at 1.
+        backoff_factor (float, optional): The delay after the first failed attempt, doubled after each failed attempt. Defaults to 1.0.
+        max_delay (float, optional): The maximum delay. Defaults to 60.0.
+        retry_after (float, optional): The delay the server asked for in the Retry-After header. Defaults to None.
+
+    Returns:
+        float: The number of seconds to wait.
+    """
+    if retry_after is not None:
+        return min(max(retry_after, 0.0), max_delay)
+    return min(backoff_factor * 2 ** (attempt - 1), max_delay)
+
+
+def get_retry_after(headers) -> Optional[float]:
+    """Returns the number of seconds in the Retry-After header or None if it is missing or is not a number."""
+    try:
+        return float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+def get_file_hash(path: str, algorithm: str = "md5", chunk_size: int = DOWNLOAD_CHUNK_SIZE):
+    """
+    Returns a hash object updated with the contents of the file.
+
+    Args:
+        path (str): The path to the file.
+        algorithm (str, optional): The name of a hashlib algorithm. Defaults to "md5".
+        chunk_size (int, optional): The number of bytes read at a time. Defaults to 1 MB.
+
+    Returns:
+        The hashlib hash object. Use hexdigest() to get the checksum.
+    """
+    file_hash = hashlib.new(algorithm)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            file_hash.update(chunk)
+    return file_hash
+
+
+def parse_checksum(checksum: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Splits a checksum in the format Zenodo uses into the algorithm and the hex digest.
+
+    Example:
+        parse_checksum("md5:2942bfabb3d05332b66eb128e0842cff") -> ("md5", "2942bfabb3d05332b66eb128e0842cff")
+        parse_checksum("2942bfabb3d05332b66eb128e0842cff") -> ("md5", "2942bfabb3d05332b66eb128e0842cff")
+
+    Args:
+        checksum (str): The checksum as "algorithm:digest" or just the md5 digest. Can be None.
+
+    Returns:
+        Tuple[Optional[str], Optional[str]]: The algorithm and the lower case digest. (None, None) if checksum is None.
+    """
+    if not checksum:
+        return None, None
+    algorithm, _, digest = checksum.rpartition(":")
+    return (algorithm or "md5").lower(), digest.lower()
+
+
+def get_content_range_total(headers) -> Optional[int]:
+    """Returns the total size of the file from the Content-Range header (ex. 'bytes 100-199/200') or None if it is unknown."""
+    total = headers.get("Content-Range", "").rpartition("/")[2]
+    return int(total) if total.isdigit() else None
+
+
+async def download_url(
+    session: aiohttp.ClientSession,
+    url: str,
+    save_path: str,
+    semaphore: asyncio.Semaphore,
+    rate_limiter: HostRateLimiter,
+    max_retries: int = 3,
+    backoff_factor: float = 1.0,
+    progress_bar: tqdm.auto.tqdm = None,
+    chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+    checksum: str = None,
+) -> str:
+    """
+    Downloads the url to the save path, retrying with exponential backoff when the request fails with a
+    status code in RETRY_STATUS_CODES, a connection error, a timeout or the file is incomplete.
+
+    The file is downloaded to save_path + ".part" and only renamed to save_path once it is complete.
+    If the .part file already exists, from an earlier attempt or an interrupted download, only the rest of the file
+    is requested with a Range header. Servers that ignore the Range header send the whole file, which replaces the .part file.
+    The size of the file is checked against the Content-Length and, if a checksum is given, its checksum is verified.
+    The size is not checked when the response has a Content-Encoding because aiohttp decompresses the body,
+    so the file on disk is larger than the Content-Length.
+    A file whose checksum does not match is deleted and downloaded again from the start.
+    The semaphore is only held while a request is made, so waiting to retry doesn't block other downloads.
+
+    Args:
+        session (aiohttp.ClientSession): The session used to make the requests.
+        url (str): The url to download.
+        save_path (str): The path to save the file to.
+        semaphore (asyncio.Semaphore): Limits the number of downloads made at once.
+        rate_limiter (HostRateLimiter): Limits the number of requests made to each host each second.
+        max_retries (int, optional): The number of times a failed download is retried. Defaults to 3.
+        backoff_factor (float, optional): The delay in seconds before the first retry. See get_backoff_delay. Defaults to 1.0.
+        progress_bar (tqdm.auto.tqdm, optional): Updated with the number of bytes downloaded. Defaults to None.
+        chunk_size (int, optional): The number of bytes read at a time. Defaults to 1 MB.
+        checksum (str, optional): The expected checksum of the file as "algorithm:digest" ex. "md5:2942bf...".
+            Defaults to None which skips the checksum verification.
+
+    Returns:
+        str: The path the file was saved to.
+
+    Raises:
+        Exception: If the download failed after max_retries retries or failed with a status code that is not retried.
+    """
+    host = urlparse(url).netloc
+    temp_path = save_path + ".part"
+    algorithm, expected_digest = parse_checksum(checksum)
+    failure_reason = ""
+    # the number of bytes of the .part file already added to the progress bar
+    counted = 0
+    for attempt in range(1, max_retries + 2):
+        retry_after = None
+        async with semaphore:
+            await rate_limiter.async_wait(host)
+            offset = os.path.getsize(temp_path) if os.path.isfile(temp_path) else 0
+            headers = {"Range": f"bytes={offset}-"} if offset else {}
+            received = False
+            try:
+                async with session.get(url, headers=headers) as response:
+                    if response.status == 416 and offset:
+                        # the .part file may already hold the whole file
+                        total_size = get_content_range_total(response.headers)
+                        received = total_size is not None
+                        failure_reason = f"status code {response.status}"
+                    elif response.status in (200, 206):
+                        if response.status == 200:
+                            # the server ignored the Range header and sent the whole file
+                            offset = 0
+                            total_size = response.content_length
+                        else:
+                            total_size = get_content_range_total(response.headers)
+                        if response.headers.get("Content-Encoding"):
+                            # the size on the server is the size of the compressed file
+                            total_size = None
+                        if progress_bar is not None and offset > counted:
+                            # the .part file existed before this call
+                            progress_bar.update(offset - counted)
+                        counted = offset
+                        with open(temp_path, "ab" if offset else "wb") as fd:
+                            async for chunk in response.content.iter_chunked(chunk_size):
+                                fd.write(chunk)
+                                counted += len(chunk)
+                                if progress_bar is not None:
+                                    progress_bar.update(len(chunk))
+                        received = True
+                    else:
+                        failure_reason = f"status code {response.status}"
+                        if response.status not in RETRY_STATUS_CODES:
+                            raise Exception(
+                                f"Download failed for {url} with {failure_reason}"
+                            )
+                        retry_after = get_retry_after(response.headers)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                failure_reason = f"{type(e).__name__} {e}"
+            if received:
+                failure_reason = verify_download(
+                    temp_path, total_size, algorithm, expected_digest
+                )
+                if failure_reason is None:
+                    os.replace(temp_path, save_path)
+                    return save_path
+            elif offset and failure_reason.startswith("status code 416"):
+                # the server can't tell how big the file is so start again
+                os.remove(temp_path)
+        if attempt <= max_retries:
+            delay = get_backoff_delay(attempt, backoff_factor, retry_after=retry_after)
+            logger.warning(
+                f"Download of {url} failed with {failure_reason}. Retrying in {delay} seconds ({attempt}/{max_retries})"
+            )
+            await asyncio.sleep(delay)
+    raise Exception(
+        f"Download failed for {url} after {max_retries} retries with {failure_reason}"
+    )
+
+
+def verify_download(
+    path: str,
+    total_size: Optional[int],
+    algorithm: Optional[str] = None,
+    expected_digest: Optional[str] = None,
+) -> Optional[str]:
+    """
+    Checks that a downloaded file is complete and has the expected checksum.
+
+    A file that is smaller than total_size is kept so the download can be resumed.
+    A file that is larger than total_size or whose checksum does not match is deleted.
+
+    Args:
+        path (str): The path to the downloaded file.
+        total_size (int): The size of the file on the server in bytes. None if it is unknown.
+        algorithm (str, optional): The hashlib algorithm of the checksum. Defaults to None.
+        expected_digest (str, optional): The expected hex digest of the file. Defaults to None which skips the checksum verification.
+
+    Returns:
+        Optional[str]: None if the file is valid otherwise the reason it is not.
+    """
+    size = os.path.getsize(path)
+    if total_size is not None and size < total_size:
+        return f"an incomplete file ({size} of {total_size} bytes)"
+    if total_size is not None and size > total_size:
+        os.remove(path)
+        return f"a file larger than expected ({size} of {total_size} bytes)"
+    if expected_digest and get_file_hash(path, algorithm).hexdigest() != expected_digest:
+        os.remove(path)
+        return f"a {algorithm} checksum that does not match {expected_digest}"
+    return None
+
+
+async def download_urls(
+    url_dict: dict,
+    max_concurrent: int = 4,
+    requests_per_second: float = None,
+    max_retries: int = 3,
+    backoff_factor: float = 1.0,
+    session: aiohttp.ClientSession = None,
+    desc: str = "Downloading files",
+    checksums: dict = None,
+    chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+) -> List[str]:
+    """
+    Downloads the urls concurrently with a single progress bar for all the bytes downloaded.
+
+    Every file is attempted even if some of them fail. See download_url for how each file is downloaded.
+
+    Args:
+        url_dict (dict): The urls to download by the path to save each one to. {save_path: url}
+        max_concurrent (int, optional): The maximum number of files downloaded at once. Defaults to 4.
+        requests_per_second (float, optional): The maximum number of requests started each second for each host.
+            Defaults to None which does not limit the requests.
+        max_retries (int, optional): The number of times each failed download is retried. Defaults to 3.
+        backoff_factor (float, optional): The delay in seconds before the first retry. Defaults to 1.0.
+        session (aiohttp.ClientSession, optional): The session used to make the requests.
+            Defaults to None which creates a session for the downloads.
+        desc (str, optional): The description of the progress bar. Defaults to "Downloading files".
+        checksums (dict, optional): The expected checksum of each file by its save path. {save_path: "md5:2942bf..."}
+            Files without a checksum are only checked against their Content-Length. Defaults to None.
+        chunk_size (int, optional): The number of bytes read at a time. Defaults to 1 MB.
+
+    Returns:
+        List[str]: The paths the files were saved to.
+
+    Raises:
+        Exception: If any of the downloads failed. The exception lists every download that failed.
+    """
+    checksums = checksums or {}
+    semaphore = asyncio.Semaphore(max_concurrent)
+    rate_limiter = HostRateLimiter(requests_per_second)
+
+    async def download_all(session: aiohttp.ClientSession, progress_bar) -> list:
+        return await asyncio.gather(
+            *[
+                download_url(
+                    session,
+                    url,
+                    save_path,
+                    semaphore,
+                    rate_limiter,
+                    max_retries=max_retries,
+                    backoff_factor=backoff_factor,
+                    progress_bar=progress_bar,
+                    chunk_size=chunk_size,
+                    checksum=checksums.get(save_path),
+                )
+                for save_path, url in url_dict.items()
+            ],
+            return_exceptions=True,
+        )
+
+    with tqdm.auto.tqdm(
+        unit="B", unit_scale=True, unit_divisor=1024, desc=desc
+    ) as progress_bar:
+        if session is None:
+            async with aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=None, sock_read=600)
+            ) as new_session:
+                results = await download_all(new_session, progress_bar)
+        else:
+            results = await download_all(session, progress_bar)
+    failures = [str(result) for result in results if isinstance(result, BaseException)]
+    if failures:
+        raise Exception(
+            f"{len(failures)} of {len(url_dict)} downloads failed:\n" + "\n".join(failures)
+        )
+    return results
+
+
+def download_files(url_dict: dict, checksums: dict = None, **kwargs) -> List[str]:
+    """
+    Downloads the urls with download_urls and waits for the downloads to finish.
+    Interrupted downloads are resumed from their .part files the next time they are downloaded.
+
+    Works both in scripts and in jupyter notebooks where an event loop is already running.
+
+    Args:
+        url_dict (dict): The urls to download by the path to save each one to. {save_path: url}
+        checksums (dict, optional): The expected checksum of each file by its save path. {save_path: "md5:2942bf..."}
+        **kwargs: Passed to download_urls. ex. max_concurrent, chunk_size
+
+    Returns:
+        List[str]: The paths the files were saved to.
+
+    Raises:
+        Exception: If any of the downloads failed.
+    """
+    coroutine = download_urls(url_dict, checksums=checksums, **kwargs)
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    if platform.system() == "Windows":
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    # apply a nested loop to jupyter's event loop for async downloading
+    nest_asyncio.apply()
+    return loop.run_until_complete(coroutine)
+
+
+def download_url_to_file(
+    url: str, save_path: str, filename: str = None, checksum: str = None, **kwargs
+) -> str:
+    """
+    Downloads a single url to the save path. See download_files.
+
+    Args:
+        url (str): The url to download.
+        save_path (str): The path to save the file to.
+        filename (str, optional): The name shown in the progress bar. Defaults to the name of the save path.
+        checksum (str, optional): The expected checksum of the file as "algorithm:digest". Defaults to None.
+        **kwargs: Passed to download_urls. ex. max_retries, chunk_size
+
+    Returns:
+        str: The path the file was saved to.
+    """
+    filename = filename or os.path.basename(save_path)
+    download_files(
+        {save_path: url},
+        checksums={save_path: checksum},
+        desc=f"Downloading {filename}",
+        **kwargs,
+    )
+    return save_path
+
+
+def retrieve_images_for_rois(
+    inputs_list: List[dict],
+    max_concurrent: int = 4,
+    requests_per_second: float = 1.0,
+    max_retries: int = 2,
+    backoff_factor: float = 30.0,
+    use_manifest: bool = True,
+    **kwargs,
+) -> dict:
+    """
+    Retrieves the imagery of several ROIs in parallel with retrieve_new_images.
+
+    The number of ROIs retrieved at once is limited by max_concurrent and the retrievals are started
+    no faster than requests_per_second so Earth Engine is not flooded with requests. A ROI whose retrieval
+    fails is retried with exponential backoff. A single progress bar shows the number of ROIs retrieved.
+
+    Args:
+        inputs_list (List[dict]): The settings of each ROI. See retrieve_new_images.
+        max_concurrent (int, optional): The maximum number of ROIs retrieved at once. Defaults to 4.
+        requests_per_second (float, optional): The maximum number of retrievals started each second. Defaults to 1.0.
+        max_retries (int, optional): The number of times a failed retrieval is retried. Defaults to 2.
+        backoff_factor (float, optional): The delay in seconds before the first retry. Defaults to 30.0.
+        use_manifest (bool, optional): Whether to skip the imagery that was already retrieved. Defaults to True.
+        **kwargs: Passed to SDS_download.retrieve_images. ex. cloud_threshold, months_list
+
+    Returns:
+        dict: The exception raised by each ROI whose retrieval failed by its sitename. Empty if all the retrievals succeeded.
+    """
+    rate_limiter = HostRateLimiter(requests_per_second)
+
+    def retrieve(inputs: dict) -> None:
+        for attempt in range(1, max_retries + 2):
+            rate_limiter.wait(EE_HOST)
+            try:
+                return retrieve_new_images(inputs, use_manifest=use_manifest, **kwargs)
+            except Exception as e:
+                if attempt > max_retries:
+                    raise
+                delay = get_backoff_delay(attempt, backoff_factor)
+                logger.warning(
+                    f"{inputs['sitename']}: retrieving imagery failed with {e}. Retrying in {delay} seconds ({attempt}/{max_retries})"
+                )
+                time.sleep(delay)
+
+    failures = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_concurrent) as executor:
+        futures = {
+            executor.submit(retrieve, inputs): inputs["sitename"]
+            for inputs in inputs_list
+        }
+        for future in tqdm.auto.tqdm(
+            concurrent.futures.as_completed(futures),
+            total=len(futures),
+            desc="Downloading ROIs",
+        ):
+            sitename = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                logger.error(f"{sitename}: retrieving imagery failed. {e}")
+                print(f"{sitename}: retrieving imagery failed. {e}")
+                failures[sitename] = e
+    return failures
+
+
 def download_url_dict(url_dict):
     for save_path, url in url_dict.items():
         # get a response from the url
@@ -240,18 +1009,18 @@ def download_url_dict(url_dict):
                         ascii=False,
                         position=0,
                     ) as pbar:
-                        for chunk in response.iter_content(1024):
+                        for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
                             if not chunk:
                                 break
                             fd.write(chunk)
                             pbar.update(len(chunk))
             else:
                 with open(save_path, "wb") as fd:
-                    for chunk in response.iter_content(1024):
+                    for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
                         fd.write(chunk)
 
 
-async def async_download_url_dict(url_dict: dict = {}):
+async def async_download_url_dict(url_dict: dict = {}, max_concurrent: int = 1):
     """
     Asynchronously downloads files from a given dictionary of URLs and save locations.
 
@@ -259,6 +1028,8 @@ async def async_download_url_dict(url_dict: dict = {}):
     ----------
     url_dict : dict, optional
         A dictionary where the keys represent local save paths and the values are the corresponding URLs of the files to be downloaded. Default is an empty dictionary.
+    max_concurrent : int, optional
+        The maximum number of files downloaded at once. Default is 1.
 
     Usage
     -----
@@ -270,73 +1041,7 @@ async def async_download_url_dict(url_dict: dict = {}):
 
     await async_download_url_dict(url_dict)
     """
-
-    def session_creator():
-        # Set the custom timeout value (in seconds)
-        keepalive_timeout = 100
-        # Configure the timeout
-        connector = aiohttp.TCPConnector(keepalive_timeout=keepalive_timeout)
-        # Create and return the session with the configured timeout
-        return aiohttp.ClientSession(
-            connector=connector, timeout=aiohttp.ClientTimeout(total=600)
-        )
-
-    # allow 1 concurrent downloads
-    semaphore = asyncio.Semaphore(1)
-    tasks = []
-    for save_path, url in url_dict.items():
-        task = asyncio.create_task(
-            download_zenodo_file(
-                semaphore, session_creator, url, save_path, max_retries=0
-            )
-        )
-        tasks.append(task)
-    # start all the tasks at once
-    await tqdm.asyncio.tqdm.gather(*tasks)
-
-
-async def async_download_url_dict(url_dict: dict = {}):
-    """
-    Asynchronously downloads files from a given dictionary of URLs and save locations.
-
-    Parameters
-    ----------
-    url_dict : dict, optional
-        A dictionary where the keys represent local save paths and the values are the corresponding URLs of the files to be downloaded. Default is an empty dictionary.
-
-    Usage
-    -----
-    url_dict = {
-        "/path/to/save/file1.h5": "https://zenodo.org/record/7574784/file1.h5",
-        "/path/to/save/file2.json": "https://zenodo.org/record/7574784/file2.json",
-        "/path/to/save/file3.txt": "https://zenodo.org/record/7574784/file3.txt",
-    }
-
-    await async_download_url_dict(url_dict)
-    """
-
-    def session_creator():
-        # Set the custom timeout value (in seconds)
-        keepalive_timeout = 100
-        # Configure the timeout
-        connector = aiohttp.TCPConnector(keepalive_timeout=keepalive_timeout)
-        # Create and return the session with the configured timeout
-        return aiohttp.ClientSession(
-            connector=connector, timeout=aiohttp.ClientTimeout(total=600)
-        )
-
-    # allow 1 concurrent downloads
-    semaphore = asyncio.Semaphore(1)
-    tasks = []
-    for save_path, url in url_dict.items():
-        task = asyncio.create_task(
-            download_zenodo_file(
-                semaphore, session_creator, url, save_path, max_retries=0
-            )
-        )
-        tasks.append(task)
-    # start all the tasks at once
-    await tqdm.asyncio.tqdm.gather(*tasks)
+    await download_urls(url_dict, max_concurrent=max_concurrent)
 
 
 async def download_zenodo_file(
@@ -526,7 +1231,7 @@ async def download_with_retry(
                         ascii=False,
                         position=0,
                     ) as pbar:
-                        async for chunk in response.content.iter_chunked(1024):
+                        async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
                             if not chunk:
                                 break
                             fd.write(chunk)
@@ -534,14 +1239,14 @@ async def download_with_retry(
                         return True, None, response.status
             else:
                 with open(save_location, "wb") as fd:
-                    async for chunk in response.content.iter_chunked(1024):
+                    async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
                         fd.write(chunk)
                     return True, None, response.status
 
 
 async def async_download_url(session, url: str, save_path: str):
     model_name = url.split("/")[-1]
-    chunk_size: int = 2048
+    chunk_size: int = DOWNLOAD_CHUNK_SIZE
     async with session.get(url, raise_for_status=True) as r:
         content_length = r.headers.get("Content-Length")
         if content_length is not None:
@@ -577,7 +1282,7 @@ async def download_file(session, url, save_location):
                     print(response.status)
                     return
                 with open(save_location, "wb") as f:
-                    async for chunk in response.content.iter_chunked(1024):
+                    async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
                         if not chunk:
                             break
                         f.write(chunk)
@@ -1,23 +1,25 @@
 # Standard library imports
 import colorsys
+import concurrent.futures
 import copy
 import shutil
+import hashlib
 import fnmatch
 import json
 import json
 import logging
 import re
 import os
+import threading
 import datetime
 from glob import glob
 from time import perf_counter
 from typing import Optional, Union, List, Dict
 from time import perf_counter
-from typing import Dict, List, Optional, Union
+from typing import Collection, Dict, List, Optional, Tuple, Union
 from itertools import islice
 
 # External dependencies imports
-import dask
 import geopandas as gpd
 import matplotlib.lines as mlines
 import matplotlib.patches as mpatches
@@ -46,7 +48,6 @@ import pandas as pd
 import skimage.measure as measure
 import skimage.morphology as morphology
 
-from coastsat.SDS_download import get_metadata
 from coastsat.SDS_shoreline import extract_shorelines
 from coastsat.SDS_tools import (
     get_filenames,
@@ -59,6 +60,8 @@ from coastsat.SDS_transects import compute_intersection_QC
 from coastsat import SDS_preprocess, SDS_shoreline, SDS_tools
 from ipyleaflet import GeoJSON
 from matplotlib import gridspec
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 from matplotlib.colors import rgb2hex
 from matplotlib.pyplot import get_cmap
 from skimage import measure, morphology
@@ -66,7 +69,7 @@ from tqdm.auto import tqdm
 
 # Internal dependencies imports
 from coastseg import common, exceptions
-from coastseg.validation import get_satellites_in_directory
+from coastseg.validation import get_satellites_in_directory, Satellite
 from coastseg.filters import filter_model_outputs, apply_land_mask
 from coastseg.common import get_filtered_files_dict, edit_metadata
 
@@ -78,6 +81,15 @@ pd.set_option("mode.chained_assignment", None)
 logger = logging.getLogger(__name__)
 __all__ = ["Extracted_Shoreline"]
 
+# the ways the shoreline detection figures can be created (see get_figure_mode)
+FIGURE_MODES = ("off", "inline", "deferred")
+# directory in the session the arrays of deferred detection figures are saved to
+DETECTION_FIGURE_DATA_DIR = "detection_figure_data"
+# maximum number of detection figure templates kept by each thread (see get_detection_figure_template)
+MAX_DETECTION_FIGURE_TEMPLATES = 8
+# the detection figure templates of each thread
+_detection_figure_templates = threading.local()
+
 
 def time_func(func):
     def wrapper(*args, **kwargs):
@@ -324,6 +336,162 @@ def combine_satellite_data(satellite_data: dict) -> dict:
     return merged_satellite_data
 
 
+def get_executor(
+    scheduler: str = "threads", num_workers: Optional[int] = None
+) -> concurrent.futures.Executor:
+    """
+    Creates the pool of workers used to process the satellite images.
+
+    Args:
+        scheduler (str, optional): The type of workers to use. Either "threads" or "processes". Defaults to "threads".
+        num_workers (int, optional): The maximum number of workers. Defaults to None which uses the number of CPUs.
+
+    Returns:
+        concurrent.futures.Executor: The pool of workers.
+
+    Raises:
+        ValueError: If the scheduler is not "threads" or "processes".
+    """
+    if scheduler == "threads":
+        return concurrent.futures.ThreadPoolExecutor(max_workers=num_workers)
+    if scheduler == "processes":
+        return concurrent.futures.ProcessPoolExecutor(max_workers=num_workers)
+    raise ValueError(
+        f"scheduler must be 'threads' or 'processes' not '{scheduler}'"
+    )
+
+
+def create_empty_satellite_output() -> dict:
+    """Returns the dictionary the extracted shorelines for a single satellite are stored in."""
+    return {
+        "dates": [],
+        "geoaccuracy": [],
+        "shorelines": [],
+        "cloud_cover": [],
+        "filename": [],
+        "idx": [],
+    }
+
+
+def process_satellites(
+    satnames: List[str],
+    settings: dict,
+    metadata: dict,
+    session_path: str,
+    class_indices: List[int] = None,
+    class_mapping: Dict[int, str] = None,
+    save_location: str = "",
+    shoreline_extraction_area: gpd.GeoDataFrame = None,
+    num_workers: Optional[int] = None,
+    scheduler: str = "threads",
+    npz_index: Dict[tuple, str] = None,
+    **kwargs: dict,
+) -> dict:
+    """
+    Processes the imagery of all the satellites to extract shorelines.
+
+    The images of all the satellites are submitted to a single pool of workers and the results are collected
+    as soon as each image is finished, so a slow image never keeps the other workers waiting.
+    The extracted shorelines for each satellite are ordered by the index of the image in the metadata.
+
+    Args:
+        satnames (List[str]): The names of the satellites to process.
+        settings (dict): A dictionary containing settings for the shoreline extraction. See process_satellite for the required keys.
+        metadata (dict): A dictionary containing metadata for the satellite imagery.
+            Metadata is the output of the get_metadata function in SDS_download.py.
+        session_path (str): The path to the session directory.
+        class_indices (list, optional): A list of class indices to extract. Defaults to None.
+        class_mapping (dict, optional): A dictionary mapping class indices to class names. Defaults to None.
+        save_location (str, optional): The path to save the extracted shorelines. Defaults to "".
+        shoreline_extraction_area (gpd.GeoDataFrame, optional): A GeoDataFrame containing the extraction area for the shorelines. Defaults to None.
+        num_workers (int, optional): The maximum number of images processed at once. Defaults to None which uses the number of CPUs.
+        scheduler (str, optional): Process the images with "threads" or "processes". Defaults to "threads".
+        npz_index (dict, optional): An index of the npz files in the session made with create_npz_index. Defaults to None.
+
+    Returns:
+        dict: A dictionary containing the extracted shorelines for each satellite.
+    """
+    output = {satname: create_empty_satellite_output() for satname in satnames}
+    collection = settings["inputs"]["landsat_collection"]
+    # check the figure mode is valid before any images are processed
+    get_figure_mode(settings)
+
+    # each task is the arguments to process_satellite_image for one image
+    tasks = []
+    for satname in satnames:
+        filenames = metadata[satname]["filenames"]
+        if len(filenames) == 0:
+            logger.warning(f"Satellite {satname} had no imagery")
+            continue
+        # deep copy settings
+        satellite_settings = copy.deepcopy(settings)
+        filepath = get_filepath(satellite_settings["inputs"], satname)
+        pixel_size = get_pixel_size_for_satellite(satname)
+        # get the minimum beach area in number of pixels depending on the satellite
+        satellite_settings["min_length_sl"] = get_min_shoreline_length(
+            satname, satellite_settings["min_length_sl"]
+        )
+        for index in range(len(filenames)):
+            tasks.append(
+                (
+                    satname,
+                    index,
+                    (
+                        filenames[index],
+                        filepath,
+                        satellite_settings,
+                        satname,
+                        collection,
+                        metadata[satname]["epsg"][index],
+                        pixel_size,
+                        session_path,
+                        class_indices,
+                        class_mapping,
+                        save_location,
+                        satellite_settings.get("apply_cloud_mask", True),
+                        shoreline_extraction_area,
+                        npz_index,
+                    ),
+                )
+            )
+
+    if not tasks:
+        return output
+
+    results = {satname: {} for satname in satnames}
+    with tqdm(
+        total=len(tasks),
+        desc=f"Mapping Shorelines for {', '.join(satnames)}",
+        leave=True,
+        position=0,
+    ) as pbar:
+        with get_executor(scheduler, num_workers) as executor:
+            futures = {
+                executor.submit(process_satellite_image, *args): (satname, index)
+                for satname, index, args in tasks
+            }
+            for future in concurrent.futures.as_completed(futures):
+                satname, index = futures[future]
+                results[satname][index] = future.result()
+                pbar.update(1)
+
+    # add the results in the order of the images in the metadata
+    for satname in satnames:
+        for index in sorted(results[satname]):
+            result = results[satname][index]
+            if result is None:
+                continue
+            output[satname]["dates"].append(metadata[satname]["dates"][index])
+            output[satname]["geoaccuracy"].append(
+                metadata[satname]["acc_georef"][index]
+            )
+            output[satname]["shorelines"].append(result["shorelines"])
+            output[satname]["cloud_cover"].append(result["cloud_cover"])
+            output[satname]["filename"].append(metadata[satname]["filenames"][index])
+            output[satname]["idx"].append(index)
+    return output
+
+
 def process_satellite(
     satname: str,
     settings: dict,
@@ -332,8 +500,9 @@ def process_satellite(
     class_indices: List[int] = None,
     class_mapping: Dict[int, str] = None,
     save_location: str = "",
-    batch_size: int = 10,
     shoreline_extraction_area: gpd.GeoDataFrame = None,
+    num_workers: Optional[int] = None,
+    scheduler: str = "threads",
     **kwargs: dict,
 ):
     """
@@ -369,110 +538,26 @@ def process_satellite(
         class_indices (list, optional): A list of class indices to extract. Defaults to None.
         class_mapping (dict, optional): A dictionary mapping class indices to class names. Defaults to None.
         save_location (str, optional): The path to save the extracted shorelines. Defaults to "".
-        batch_size (int, optional): The number of images to process in each batch. Defaults to 10.
         shoreline_extraction_area (gpd.GeoDataFrame, optional): A GeoDataFrame containing the extraction area for the shorelines. Defaults to None.
+        num_workers (int, optional): The maximum number of images processed at once. Defaults to None which uses the number of CPUs.
+        scheduler (str, optional): Process the images with "threads" or "processes". Defaults to "threads".
     Returns:
         dict: A dictionary containing the extracted shorelines for the satellite.
     """
-    # filenames of tifs (ms) for this satellite
-    filenames = metadata[satname]["filenames"]
-    output = {}
-    output.setdefault(satname, {})
-    output[satname].setdefault("dates", [])
-    output[satname].setdefault("geoaccuracy", [])
-    output[satname].setdefault("shorelines", [])
-    output[satname].setdefault("cloud_cover", [])
-    output[satname].setdefault("filename", [])
-    output[satname].setdefault("idx", [])
-
-    if len(filenames) == 0:
-        logger.warning(f"Satellite {satname} had no imagery")
-        return output
-
-    collection = settings["inputs"]["landsat_collection"]
-    # deep copy settings
-    settings = copy.deepcopy(settings)
-    filepath = get_filepath(settings["inputs"], satname)
-    pixel_size = get_pixel_size_for_satellite(satname)
-
-    # get the minimum beach area in number of pixels depending on the satellite
-    settings["min_length_sl"] = get_min_shoreline_length(
-        satname, settings["min_length_sl"]
-    )
-
-    # loop through the images
-    espg_list = []
-    geoaccuracy_list = []
-    timestamps = []
-    tasks = []
-
-    # compute number of batches
-    num_batches = len(filenames) // batch_size
-    if len(filenames) % batch_size != 0:
-        num_batches += 1
-
-    # initialize progress bar
-    pbar = tqdm(
-        total=len(filenames),
-        desc=f"Mapping Shorelines for {satname}",
-        leave=True,
-        position=0,
+    return process_satellites(
+        [satname],
+        settings,
+        metadata,
+        session_path,
+        class_indices,
+        class_mapping,
+        save_location,
+        shoreline_extraction_area=shoreline_extraction_area,
+        num_workers=num_workers,
+        scheduler=scheduler,
+        **kwargs,
     )
 
-    for batch in range(num_batches):
-        espg_list = []
-        geoaccuracy_list = []
-        timestamps = []
-        tasks = []
-
-        # generate tasks for the current batch
-        for index in range(
-            batch * batch_size, min((batch + 1) * batch_size, len(filenames))
-        ):
-            image_epsg = metadata[satname]["epsg"][index]
-            espg_list.append(image_epsg)
-            geoaccuracy_list.append(metadata[satname]["acc_georef"][index])
-            timestamps.append(metadata[satname]["dates"][index])
-            tasks.append(
-                dask.delayed(process_satellite_image)(
-                    filenames[index],
-                    filepath,
-                    settings,
-                    satname,
-                    collection,
-                    image_epsg,
-                    pixel_size,
-                    session_path,
-                    class_indices,
-                    class_mapping,
-                    save_location,
-                    settings.get("apply_cloud_mask", True),
-                    shoreline_extraction_area,
-                )
-            )
-
-        # compute tasks in batches
-        results = dask.compute(*tasks)
-        # update progress bar
-        num_tasks_computed = len(tasks)
-        pbar.update(num_tasks_computed)
-
-        for index, result in enumerate(results):
-            if result is None:
-                continue
-            output.setdefault(satname, {})
-            output[satname].setdefault("dates", []).append(timestamps[index])
-            output[satname].setdefault("geoaccuracy", []).append(
-                geoaccuracy_list[index]
-            )
-            output[satname].setdefault("shorelines", []).append(result["shorelines"])
-            output[satname].setdefault("cloud_cover", []).append(result["cloud_cover"])
-            output[satname].setdefault("filename", []).append(filenames[index])
-            output[satname].setdefault("idx", []).append(index)
-
-    pbar.close()
-    return output
-
 
 def get_cloud_cover_combined(cloud_mask: np.ndarray):
     """
@@ -538,6 +623,7 @@ def process_satellite_image(
     save_location: str = "",
     apply_cloud_mask: bool = True,
     shoreline_extraction_area : gpd.GeoDataFrame = None,
+    npz_index: Dict[tuple, str] = None,
 ) -> Dict[str, Union[np.ndarray, float]]:
     """
     Processes a single satellite image to extract the shoreline.
@@ -555,6 +641,9 @@ def process_satellite_image(
         class_mapping (dict, optional): A dictionary mapping class indices to class names. Defaults to None.
         save_location (str, optional): The path to save the extracted shorelines. Defaults to "".
         apply_cloud_mask (bool, optional): Whether to apply the cloud mask. Defaults to True.
+        shoreline_extraction_area (gpd.GeoDataFrame, optional): A GeoDataFrame containing the extraction area for the shorelines. Defaults to None.
+        npz_index (dict, optional): An index of the npz files in the session made with create_npz_index.
+            Defaults to None which searches the session directory for the npz file.
 
     Returns:
         dict: A dictionary containing the extracted shoreline and cloud cover percentage.
@@ -607,17 +696,21 @@ def process_satellite_image(
         cloud_mask.shape, georef, image_epsg, pixel_size, settings
     )
     # read the model outputs from the npz file for this image
-    npz_file = find_matching_npz(filename, os.path.join(session_path, "good"))
-    if npz_file is None:
-        npz_file = find_matching_npz(filename, session_path)
+    if npz_index is not None:
+        npz_file = find_npz_in_index(filename, npz_index)
+    else:
+        npz_file = find_matching_npz(filename, os.path.join(session_path, "good"))
+        if npz_file is None:
+            npz_file = find_matching_npz(filename, session_path)
     # logger.info(f"npz_file: {npz_file}")
     if npz_file is None:
         logger.warning(f"npz file not found for {filename}")
         return None
 
     # get the labels for water and land
-    land_mask = load_merged_image_labels(npz_file, class_indices=class_indices)
-    all_labels = load_image_labels(npz_file)
+    all_labels, land_mask = load_image_labels_and_merged_labels(
+        npz_file, class_indices=class_indices
+    )
 
     min_beach_area = settings["min_beach_area"]
     land_mask = remove_small_objects_and_binarize(land_mask, min_beach_area)
@@ -646,25 +739,28 @@ def process_satellite_image(
     # filter shorelines within the extraction area
     
     shoreline = SDS_shoreline.filter_shoreline( shoreline,shoreline_extraction_area,output_epsg)
-    shoreline_extraction_area_array = SDS_shoreline.get_extract_shoreline_extraction_area_array(shoreline_extraction_area, output_epsg, roi_gdf)
-    
-    # plot the results
-    shoreline_detection_figures(
-        im_ms,
-        cloud_mask,
-        land_mask,
-        all_labels,
-        shoreline,
-        image_epsg,
-        georef,
-        settings,
-        date,
-        satname,
-        class_mapping,
-        save_location,
-        ref_shoreline_buffer,
-        shoreline_extraction_area=shoreline_extraction_area_array,
-    )
+
+    # plot the results (or save the arrays to plot them later)
+    figure_mode = get_figure_mode(settings)
+    if figure_mode != "off":
+        shoreline_extraction_area_array = SDS_shoreline.get_extract_shoreline_extraction_area_array(shoreline_extraction_area, output_epsg, roi_gdf)
+        shoreline_detection_figures(
+            im_ms,
+            cloud_mask,
+            land_mask,
+            all_labels,
+            shoreline,
+            image_epsg,
+            georef,
+            settings,
+            date,
+            satname,
+            class_mapping,
+            save_location,
+            ref_shoreline_buffer,
+            shoreline_extraction_area=shoreline_extraction_area_array,
+            figure_mode=figure_mode,
+        )
     # create dictionary of output
     output = {
         "shorelines": shoreline,
@@ -751,6 +847,55 @@ def find_matching_npz(filename, directory):
     return None
 
 
+def create_npz_index(directories: List[str]) -> Dict[tuple, str]:
+    """
+    Creates an index of the .npz model outputs in the directories so the npz file for each image can be found
+    without searching the directories again. Directories listed first take precedence.
+
+    The npz files are expected to start with the timestamp of the image followed by an underscore and
+    contain the satellite name after the timestamp. ex. "2020-01-01-00-00-00_RGB_L8.npz"
+
+    Args:
+        directories (List[str]): The directories containing the npz files. Directories that do not exist are skipped.
+
+    Returns:
+        Dict[tuple, str]: A dictionary mapping (timestamp, satname) to the path of the npz file.
+            ex. {("2020-01-01-00-00-00", "L8"): "session/good/2020-01-01-00-00-00_RGB_L8.npz"}
+    """
+    satnames = [satellite.value for satellite in Satellite]
+    npz_index = {}
+    for directory in directories:
+        if not os.path.isdir(directory):
+            continue
+        for file in os.listdir(directory):
+            if not file.endswith(".npz"):
+                continue
+            timestamp = file.split("_")[0]
+            remainder = file[len(timestamp) :]
+            for satname in satnames:
+                if satname in remainder:
+                    npz_index.setdefault(
+                        (timestamp, satname), os.path.join(directory, file)
+                    )
+    return npz_index
+
+
+def find_npz_in_index(filename: str, npz_index: Dict[tuple, str]) -> Optional[str]:
+    """
+    Returns the npz file for the image filename from an index made with create_npz_index.
+
+    Args:
+        filename (str): The filename of the image. ex. "2020-01-01-00-00-00_L8_ID_1_ms.tif"
+        npz_index (Dict[tuple, str]): A dictionary mapping (timestamp, satname) to the path of the npz file.
+
+    Returns:
+        Optional[str]: The path to the npz file or None if the image does not have a npz file.
+    """
+    parts = filename.split("_")
+    timestamp, satname = parts[0], parts[1]
+    return npz_index.get((timestamp, satname))
+
+
 def merge_classes(im_labels: np.ndarray, classes_to_merge: list) -> np.ndarray:
     """
     Merge the specified classes in the given numpy array of class labels by creating a new numpy array with 1 values
@@ -761,13 +906,7 @@ def merge_classes(im_labels: np.ndarray, classes_to_merge: list) -> np.ndarray:
     :return: an integer numpy array with 1 values for the merged classes and 0 values for all other classes.
     """
     # Create an integer numpy array with 1 values for the merged classes and 0 values for all other classes
-    updated_labels = np.zeros(shape=(im_labels.shape[0], im_labels.shape[1]), dtype=int)
-
-    # Set 1 values for merged classes
-    for idx in classes_to_merge:
-        updated_labels = np.logical_or(updated_labels, im_labels == idx).astype(int)
-
-    return updated_labels
+    return np.isin(im_labels, classes_to_merge).astype(int)
 
 
 def load_image_labels(npz_file: str) -> np.ndarray:
@@ -812,6 +951,32 @@ def load_merged_image_labels(
     return im_labels
 
 
+def load_image_labels_and_merged_labels(
+    npz_file: str, class_indices: list = [2, 1, 0]
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Load the image labels from a .npz file and merge the classes in class_indices in a single pass.
+    The "grey_label" array is only read from the .npz file once.
+
+    Parameters:
+    npz_file (str): The path to the .npz file containing the image labels.
+    class_indices (list): The indexes of the classes to merge.
+
+    Returns:
+    tuple[np.ndarray, np.ndarray]:
+        - A 2D numpy array containing the image labels from the .npz file.
+        - A 2D uint8 numpy array containing 1 for the merged classes and 0 for all other classes.
+    """
+    if not os.path.isfile(npz_file) or not npz_file.endswith(".npz"):
+        raise ValueError(f"{npz_file} is not a valid .npz file.")
+
+    with np.load(npz_file) as data:
+        all_labels = data["grey_label"]
+    # 1 for water, 0 for anything else (land, other, sand, etc.)
+    merged_labels = np.isin(all_labels, class_indices).astype(np.uint8)
+    return all_labels, merged_labels
+
+
 def increase_image_intensity(
     im_ms: np.ndarray, cloud_mask: np.ndarray, prob_high: float = 99.9
 ) -> "np.ndarray[float]":
@@ -950,7 +1115,7 @@ def plot_image_with_legend(
     if im_ref_buffer is not None:
         masked_array = np.ma.masked_where(im_ref_buffer == False, im_ref_buffer)
     # color map for the reference shoreline buffer
-    masked_cmap = plt.cm.get_cmap("PiYG")
+    masked_cmap = get_cmap("PiYG")
 
     # if original_image is wider than 2.5 times as tall, plot the images in a 3x1 grid (vertical)
     if original_image.shape[0] > 2.5 * original_image.shape[1]:
@@ -1025,71 +1190,581 @@ def save_detection_figure(fig, filepath: str, date: str, satname: str) -> None:
     Args:
     fig (Figure): The figure object to save.
     filepath (str): The directory path where the image will be saved.
-    date (str): The date the satellite image was taken in the format 'YYYYMMDD'.
-    satname (str): The name of the satellite that took the image.
+    date (str): The date the satellite image was taken in the format 'YYYYMMDD'.
+    satname (str): The name of the satellite that took the image.
+
+    Returns:
+    None
+    """
+    fig.savefig(
+        os.path.join(filepath, date + "_" + satname + ".jpg"),
+        dpi=150,
+        bbox_inches="tight",
+    )
+    plt.close(fig)  # Close the figure after saving
+    plt.close("all")
+    del fig
+
+
+class DetectionFigureTemplate:
+    """
+    A shoreline detection figure that is created once and reused for every image with the same shape.
+
+    The axes, legends and artists are created when the template is made. Each image only replaces the
+    data of the images, shoreline points and titles before the figure is saved. The figure is drawn with the
+    Agg canvas directly instead of pyplot so it can be rendered in threads and worker processes.
+
+    Use get_detection_figure_template to get the template for an image.
+    """
+
+    def __init__(
+        self,
+        shape: tuple,
+        class_mapping: dict,
+        num_extraction_areas: int = 0,
+    ):
+        """
+        Args:
+            shape (tuple): The (height, width) of the images the figure is made for.
+            class_mapping (dict): A dictionary mapping class indices to class names.
+            num_extraction_areas (int, optional): The number of shoreline extraction area polygons drawn on the figure. Defaults to 0.
+        """
+        height, width = shape
+        self.figure = Figure(figsize=(18, 9))
+        FigureCanvasAgg(self.figure)
+
+        # if the image is more than 2.5 times as tall as it is wide, plot the images in a 3x1 grid (vertical)
+        if height > 2.5 * width:
+            gs = gridspec.GridSpec(3, 1, figure=self.figure)
+            ax2_idx, ax3_idx = (1, 0), (2, 0)
+            bbox_to_anchor = (1.05, 0.5)
+            loc = "center left"
+        else:
+            gs = gridspec.GridSpec(1, 3, figure=self.figure)
+            ax2_idx, ax3_idx = (0, 1), (0, 2)
+            bbox_to_anchor = (0.5, -0.23)
+            loc = "lower center"
+        gs.update(bottom=0.03, top=0.97, left=0.03, right=0.97)
+        ax1 = self.figure.add_subplot(gs[0, 0])
+        ax2 = self.figure.add_subplot(gs[ax2_idx], sharex=ax1, sharey=ax1)
+        ax3 = self.figure.add_subplot(gs[ax3_idx], sharex=ax1, sharey=ax1)
+        self.axes = [ax1, ax2, ax3]
+
+        empty_image = np.zeros((height, width, 3), dtype=np.float32)
+        empty_mask = np.ma.masked_all((height, width), dtype=bool)
+        # the original image, merged classes and all classes
+        self.images = [ax.imshow(empty_image) for ax in self.axes]
+        # the reference shoreline buffer is drawn over the merged classes and all classes
+        self.buffer_images = [
+            ax.imshow(empty_mask, cmap=get_cmap("PiYG"), alpha=0.60)
+            for ax in self.axes[1:]
+        ]
+        self.shoreline_lines = [
+            ax.plot([], [], "k.", markersize=1)[0] for ax in self.axes
+        ]
+        self.extraction_area_lines = [
+            [
+                ax.plot([], [], color="#cb42f5", markersize=1)[0]
+                for _ in range(num_extraction_areas)
+            ]
+            for ax in self.axes
+        ]
+        for ax in self.axes:
+            ax.axis("off")
+            # keep the limits of the image when the shoreline is updated
+            ax.set_autoscale_on(False)
+
+        # Create legend for the shorelines
+        additional_legend_items = [
+            mlines.Line2D([], [], color="k", linestyle="-", label="shoreline"),
+            mpatches.Patch(
+                color="#800000", alpha=0.80, label="Reference shoreline buffer"
+            ),
+        ]
+        if num_extraction_areas > 0:
+            additional_legend_items.append(
+                mlines.Line2D(
+                    [],
+                    [],
+                    color="#cb42f5",
+                    linestyle="-",
+                    label="shoreline extraction area",
+                )
+            )
+        merged_classes_legend = create_legend(
+            class_mapping={0: "other", 1: "water"},
+            additional_patches=additional_legend_items,
+        )
+        all_classes_legend = create_legend(
+            class_mapping, additional_patches=additional_legend_items
+        )
+        for ax, legend in zip(self.axes[1:], [merged_classes_legend, all_classes_legend]):
+            ax.legend(
+                handles=legend,
+                bbox_to_anchor=bbox_to_anchor,
+                loc=loc,
+                borderaxespad=0.0,
+            )
+
+    def update(
+        self,
+        images: list,
+        pixelated_shoreline: np.ndarray,
+        im_ref_buffer: np.ndarray = None,
+        pixelated_shoreline_extraction_area: list = None,
+        titles: list[str] = None,
+    ) -> None:
+        """
+        Replaces the data drawn on the figure.
+
+        Args:
+            images (list): The original image, the merged classes overlay and the all classes overlay.
+            pixelated_shoreline (numpy.ndarray): The shoreline points in pixel coordinates.
+            im_ref_buffer (numpy.ndarray, optional): The reference shoreline buffer. Defaults to None which hides the buffer.
+            pixelated_shoreline_extraction_area (list, optional): The polygons of the shoreline extraction area in pixel coordinates.
+                Must contain num_extraction_areas polygons. Defaults to None.
+            titles (list, optional): The titles of the three plots. Defaults to None which keeps the current titles.
+        """
+        for image, data in zip(self.images, images):
+            image.set_data(data)
+
+        for buffer_image in self.buffer_images:
+            buffer_image.set_visible(im_ref_buffer is not None)
+            if im_ref_buffer is not None:
+                buffer_image.set_data(
+                    np.ma.masked_where(im_ref_buffer == False, im_ref_buffer)
+                )
+                buffer_image.autoscale()
+
+        for line in self.shoreline_lines:
+            line.set_data(pixelated_shoreline[:, 0], pixelated_shoreline[:, 1])
+
+        for lines in self.extraction_area_lines:
+            for line, polygon in zip(lines, pixelated_shoreline_extraction_area or []):
+                line.set_data(polygon[:, 0], polygon[:, 1])
+
+        if titles:
+            for ax, title in zip(self.axes, titles):
+                ax.set_title(title)
+
+    def save(self, filepath: str) -> None:
+        """
+        Saves the figure as a jpg.
+
+        Args:
+            filepath (str): The path to save the jpg to.
+        """
+        self.figure.savefig(filepath, dpi=150, bbox_inches="tight")
+
+
+def get_detection_figure_template(
+    shape: tuple,
+    satname: str,
+    class_mapping: dict,
+    num_extraction_areas: int = 0,
+) -> DetectionFigureTemplate:
+    """
+    Returns the detection figure template for the shape, satellite and classes of an image.
+
+    The templates are kept for each thread so threads never draw on the same figure. At most
+    MAX_DETECTION_FIGURE_TEMPLATES templates are kept for each thread.
+
+    Args:
+        shape (tuple): The (height, width) of the image.
+        satname (str): The satellite name.
+        class_mapping (dict): A dictionary mapping class indices to class names.
+        num_extraction_areas (int, optional): The number of shoreline extraction area polygons. Defaults to 0.
+
+    Returns:
+        DetectionFigureTemplate: The template for the image.
+    """
+    templates = getattr(_detection_figure_templates, "templates", None)
+    if templates is None:
+        templates = _detection_figure_templates.templates = {}
+    key = (tuple(shape), satname, tuple(class_mapping.items()), num_extraction_areas)
+    if key not in templates:
+        if len(templates) >= MAX_DETECTION_FIGURE_TEMPLATES:
+            templates.clear()
+        templates[key] = DetectionFigureTemplate(
+            shape, class_mapping, num_extraction_areas
+        )
+    return templates[key]
+
+
+def create_legend(
+    class_mapping: dict, color_mapping: dict = None, additional_patches: list = None
+) -> list[mpatches.Patch]:
+    """
+    Creates a list of legend patches using class and color mappings.
+
+    Args:
+    class_mapping (dict): A dictionary mapping class indices to class names.
+    color_mapping (dict, optional): A dictionary mapping class indices to colors. Defaults to None.
+    additional_patches (list, optional): A list of additional patches to be appended to the legend. Defaults to None.
+
+    Returns:
+    list: A list of legend patches.
+    """
+    if color_mapping is None:
+        color_mapping = create_color_mapping_as_ints(class_mapping.keys())
+
+    legend = [
+        mpatches.Patch(
+            color=np.array(color) / 255, label=f"{class_mapping.get(index, f'{index}')}"
+        )
+        for index, color in color_mapping.items()
+    ]
+
+    return legend + additional_patches if additional_patches else legend
+
+
+def create_overlay(
+    im_RGB: "np.ndarray[float]",
+    im_labels: "np.ndarray[int]",
+    overlay_opacity: float = 0.35,
+) -> "np.ndarray[float]":
+    """
+    Create an overlay on the given image using the provided labels and
+    specified overlay opacity.
+
+    Args:
+    im_RGB (np.ndarray[float]): The input image as an RGB numpy array (height, width, 3).
+    im_labels (np.ndarray[int]): The array containing integer labels of the same dimensions as the input image.
+    overlay_opacity (float, optional): The opacity value for the overlay (default: 0.35).
+
+    Returns:
+    np.ndarray[float]: The combined numpy array of the input image and the overlay.
+    """
+    # Create an overlay using the given labels
+    overlay = create_classes_overlay_image(im_labels)
+    # Combine the original image and the overlay using the correct opacity
+    combined_float = im_RGB * (1 - overlay_opacity) + overlay * overlay_opacity
+    return combined_float
+
+
+def get_figure_mode(settings: dict) -> str:
+    """
+    Returns how the shoreline detection figures are created for each image.
+
+    The modes are:
+        "inline": render and save the figure while the image is processed (default)
+        "deferred": save the arrays needed to render the figure so render_detection_figures can render them later
+        "off": do not create the figures
+    If "figure_mode" is not in the settings then "save_figure" selects between "inline" and "off".
+
+    Args:
+        settings (dict): The settings used to extract the shorelines.
+
+    Returns:
+        str: The figure mode. One of FIGURE_MODES.
+
+    Raises:
+        ValueError: If the figure mode is not one of FIGURE_MODES.
+    """
+    figure_mode = settings.get("figure_mode")
+    if figure_mode is None:
+        return "inline" if settings.get("save_figure", True) else "off"
+    if figure_mode not in FIGURE_MODES:
+        raise ValueError(
+            f"figure_mode must be one of {FIGURE_MODES} not '{figure_mode}'"
+        )
+    return figure_mode
+
+
+def get_detection_figure_location(settings: dict, save_location: str = "") -> str:
+    """
+    Returns the directory the jpg_files and detection figure data of the shorelines are saved to.
+
+    Args:
+        settings (dict): The settings used to extract the shorelines. Must contain settings["inputs"]["sitename"] and settings["inputs"]["filepath"].
+        save_location (str, optional): The directory the extracted shorelines are saved to. Defaults to "" which uses the sitename directory.
+
+    Returns:
+        str: The directory the figures are saved under.
+    """
+    if save_location:
+        return save_location
+    return os.path.join(settings["inputs"]["filepath"], settings["inputs"]["sitename"])
+
+
+def create_detection_figure_data(
+    im_ms: np.ndarray,
+    cloud_mask: "np.ndarray[bool]",
+    merged_labels: np.ndarray,
+    all_labels: np.ndarray,
+    shoreline: np.ndarray,
+    image_epsg: str,
+    georef,
+    settings: dict,
+    im_ref_buffer: np.ndarray = None,
+    shoreline_extraction_area: np.ndarray = None,
+) -> dict:
+    """
+    Creates the arrays needed to render a shoreline detection figure.
+
+    The shoreline and shoreline extraction area are converted to pixel coordinates so the figure can be
+    rendered without the georeference of the image.
+
+    Args:
+    im_ms (numpy.ndarray): The multispectral image.
+    cloud_mask (numpy.ndarray): The cloud mask.
+    merged_labels (numpy.ndarray): The merged class labels.
+    all_labels (numpy.ndarray): All class labels.
+    shoreline (numpy.ndarray): The shoreline points.
+    image_epsg (str): The EPSG code of the image.
+    georef (numpy.ndarray): The georeference matrix.
+    settings (dict): The settings dictionary.
+    im_ref_buffer (numpy.ndarray, optional): The reference shoreline buffer. Defaults to None.
+    shoreline_extraction_area (numpy.ndarray, optional): The area where the shoreline was extracted. Defaults to None.
+
+    Returns:
+    dict: A dictionary with the keys "im_RGB", "cloud_mask", "merged_labels", "all_labels", "pixelated_shoreline",
+          "im_ref_buffer" and "shoreline_extraction_area".
+    """
+    # increase the intensity of the image for visualization
+    im_RGB = increase_image_intensity(im_ms, cloud_mask, prob_high=99.9)
+
+    # Convert shoreline points to pixel coordinates
+    try:
+        pixelated_shoreline = SDS_tools.convert_world2pix(
+            SDS_tools.convert_epsg(shoreline, settings["output_epsg"], image_epsg)[
+                :, [0, 1]
+            ],
+            georef,
+        )
+    except:
+        pixelated_shoreline = np.array([[np.nan, np.nan], [np.nan, np.nan]])
+
+    # Convert shoreline extraction area to pixel coordinates
+    shoreline_extraction_area_pix = []
+    if shoreline_extraction_area is not None:
+        for idx in range(len(shoreline_extraction_area)):
+            shoreline_extraction_area_pix.append(
+                SDS_preprocess.transform_world_coords_to_pixel_coords(shoreline_extraction_area[idx],settings["output_epsg"], georef, image_epsg)
+            )
+
+    return {
+        "im_RGB": im_RGB,
+        "cloud_mask": cloud_mask,
+        "merged_labels": merged_labels,
+        "all_labels": all_labels,
+        "pixelated_shoreline": pixelated_shoreline,
+        "im_ref_buffer": im_ref_buffer,
+        "shoreline_extraction_area": shoreline_extraction_area_pix,
+    }
+
+
+def save_detection_figure_data(
+    figure_data: dict,
+    filepath: str,
+    sitename: str,
+    date: str,
+    satname: str,
+    class_mapping: dict,
+) -> str:
+    """
+    Saves the arrays needed to render a shoreline detection figure to a compressed npz file named <date>_<satname>.npz.
+
+    The RGB image is stored as uint8 and the labels as uint8 to keep the files small.
+    Use render_detection_figures to render the figures from the saved files.
+
+    Args:
+    figure_data (dict): The arrays returned by create_detection_figure_data.
+    filepath (str): The directory to save the npz file to.
+    sitename (str): The name of the site. Used as the title of the first plot.
+    date (str): The date of the image.
+    satname (str): The satellite name.
+    class_mapping (dict): A dictionary mapping class indices to class names.
+
+    Returns:
+    str: The path to the saved npz file.
+    """
+    os.makedirs(filepath, exist_ok=True)
+    extraction_area = figure_data["shoreline_extraction_area"]
+    # store the polygons of the extraction area as one array of points and the index each polygon starts at
+    offsets = np.cumsum([0] + [len(polygon) for polygon in extraction_area])
+    if extraction_area:
+        extraction_area_points = np.concatenate(
+            [np.asarray(polygon)[:, :2] for polygon in extraction_area]
+        )
+    else:
+        extraction_area_points = np.empty((0, 2))
+    im_ref_buffer = figure_data["im_ref_buffer"]
+
+    npz_path = os.path.join(filepath, f"{date}_{satname}.npz")
+    np.savez_compressed(
+        npz_path,
+        im_RGB=np.round(np.nan_to_num(figure_data["im_RGB"]) * 255).astype(np.uint8),
+        cloud_mask=figure_data["cloud_mask"].astype(bool),
+        merged_labels=figure_data["merged_labels"].astype(np.uint8),
+        all_labels=figure_data["all_labels"].astype(np.uint8),
+        pixelated_shoreline=figure_data["pixelated_shoreline"],
+        im_ref_buffer=np.empty((0, 0), dtype=bool)
+        if im_ref_buffer is None
+        else im_ref_buffer.astype(bool),
+        extraction_area_points=extraction_area_points,
+        extraction_area_offsets=offsets,
+        sitename=sitename,
+        date=date,
+        satname=satname,
+        class_mapping=json.dumps({str(k): v for k, v in class_mapping.items()}),
+    )
+    return npz_path
+
+
+def load_detection_figure_data(npz_path: str) -> tuple:
+    """
+    Loads the arrays saved by save_detection_figure_data.
+
+    Args:
+    npz_path (str): The path to the npz file.
+
+    Returns:
+    tuple: The figure data dictionary (see create_detection_figure_data) and a dictionary with the keys
+           "sitename", "date", "satname" and "class_mapping".
+    """
+    with np.load(npz_path) as data:
+        offsets = data["extraction_area_offsets"]
+        points = data["extraction_area_points"]
+        im_ref_buffer = data["im_ref_buffer"]
+        figure_data = {
+            "im_RGB": data["im_RGB"].astype(np.float32) / 255,
+            "cloud_mask": data["cloud_mask"],
+            "merged_labels": data["merged_labels"],
+            "all_labels": data["all_labels"],
+            "pixelated_shoreline": data["pixelated_shoreline"],
+            "im_ref_buffer": None if im_ref_buffer.size == 0 else im_ref_buffer,
+            "shoreline_extraction_area": [
+                points[start:end] for start, end in zip(offsets[:-1], offsets[1:])
+            ],
+        }
+        figure_info = {
+            "sitename": str(data["sitename"]),
+            "date": str(data["date"]),
+            "satname": str(data["satname"]),
+            "class_mapping": {
+                int(k): v for k, v in json.loads(str(data["class_mapping"])).items()
+            },
+        }
+    return figure_data, figure_info
+
+
+def render_detection_figure(
+    figure_data: dict,
+    filepath: str,
+    sitename: str,
+    date: str,
+    satname: str,
+    class_mapping: dict,
+) -> str:
+    """
+    Renders a shoreline detection figure and saves it as a jpg named <date>_<satname>.jpg.
+
+    Args:
+    figure_data (dict): The arrays returned by create_detection_figure_data.
+    filepath (str): The directory path where the image will be saved.
+    sitename (str): The name of the site. Used as the title of the first plot.
+    date (str): The date of the image.
+    satname (str): The satellite name.
+    class_mapping (dict): A dictionary mapping class indices to class names.
 
     Returns:
-    None
+    str: The path to the saved jpg.
     """
-    fig.savefig(
-        os.path.join(filepath, date + "_" + satname + ".jpg"),
-        dpi=150,
-        bbox_inches="tight",
+    os.makedirs(filepath, exist_ok=True)
+    im_RGB = figure_data["im_RGB"]
+    cloud_mask = figure_data["cloud_mask"]
+    shoreline_extraction_area_pix = figure_data["shoreline_extraction_area"]
+
+    im_merged = create_overlay(im_RGB, figure_data["merged_labels"], overlay_opacity=0.35)
+    im_all = create_overlay(im_RGB, figure_data["all_labels"], overlay_opacity=0.35)
+
+    # Mask clouds in the images
+    im_RGB, im_merged, im_all = mask_clouds_in_images(
+        im_RGB, im_merged, im_all, cloud_mask
     )
-    plt.close(fig)  # Close the figure after saving
-    plt.close("all")
-    del fig
 
+    # reuse the figure made for the previous image with the same shape
+    template = get_detection_figure_template(
+        im_RGB.shape[:2], satname, class_mapping, len(shoreline_extraction_area_pix)
+    )
+    template.update(
+        [im_RGB, im_merged, im_all],
+        figure_data["pixelated_shoreline"],
+        figure_data["im_ref_buffer"],
+        shoreline_extraction_area_pix,
+        titles=[sitename, date, satname],
+    )
+    # save a .jpg under /jpg_files/detection
+    jpg_path = os.path.join(filepath, date + "_" + satname + ".jpg")
+    template.save(jpg_path)
+    return jpg_path
 
-def create_legend(
-    class_mapping: dict, color_mapping: dict = None, additional_patches: list = None
-) -> list[mpatches.Patch]:
+
+def render_detection_figure_from_file(npz_path: str, filepath: str) -> str:
     """
-    Creates a list of legend patches using class and color mappings.
+    Renders the shoreline detection figure saved by save_detection_figure_data.
 
     Args:
-    class_mapping (dict): A dictionary mapping class indices to class names.
-    color_mapping (dict, optional): A dictionary mapping class indices to colors. Defaults to None.
-    additional_patches (list, optional): A list of additional patches to be appended to the legend. Defaults to None.
+    npz_path (str): The path to the npz file.
+    filepath (str): The directory path where the image will be saved.
 
     Returns:
-    list: A list of legend patches.
+    str: The path to the saved jpg.
     """
-    if color_mapping is None:
-        color_mapping = create_color_mapping_as_ints(class_mapping.keys())
-
-    legend = [
-        mpatches.Patch(
-            color=np.array(color) / 255, label=f"{class_mapping.get(index, f'{index}')}"
-        )
-        for index, color in color_mapping.items()
-    ]
-
-    return legend + additional_patches if additional_patches else legend
+    figure_data, figure_info = load_detection_figure_data(npz_path)
+    return render_detection_figure(figure_data, filepath, **figure_info)
 
 
-def create_overlay(
-    im_RGB: "np.ndarray[float]",
-    im_labels: "np.ndarray[int]",
-    overlay_opacity: float = 0.35,
-) -> "np.ndarray[float]":
+def render_detection_figures(
+    save_location: str,
+    dates: List[str] = None,
+    num_workers: Optional[int] = None,
+    scheduler: str = "processes",
+) -> List[str]:
     """
-    Create an overlay on the given image using the provided labels and
-    specified overlay opacity.
+    Renders the shoreline detection figures saved when the shorelines were extracted with the "deferred" figure_mode.
+
+    The figures are rendered in parallel and saved to the jpg_files/detection directory in the save_location.
 
     Args:
-    im_RGB (np.ndarray[float]): The input image as an RGB numpy array (height, width, 3).
-    im_labels (np.ndarray[int]): The array containing integer labels of the same dimensions as the input image.
-    overlay_opacity (float, optional): The opacity value for the overlay (default: 0.35).
+        save_location (str): The directory the extracted shorelines were saved to.
+            The figure data is read from the detection_figure_data directory in this directory.
+        dates (List[str], optional): Only render the figures of images whose date starts with one of these dates.
+            Example: ["2020-01-01", "2021-05-10-18-30-00"]. Defaults to None which renders all the figures.
+        num_workers (int, optional): The maximum number of figures rendered at once. Defaults to None which uses the number of CPUs.
+        scheduler (str, optional): Render the figures with "threads" or "processes". Defaults to "processes".
 
     Returns:
-    np.ndarray[float]: The combined numpy array of the input image and the overlay.
+        List[str]: The paths to the rendered jpgs.
     """
-    # Create an overlay using the given labels
-    overlay = create_classes_overlay_image(im_labels)
-    # Combine the original image and the overlay using the correct opacity
-    combined_float = im_RGB * (1 - overlay_opacity) + overlay * overlay_opacity
-    return combined_float
+    data_path = os.path.join(save_location, DETECTION_FIGURE_DATA_DIR)
+    if not os.path.isdir(data_path):
+        logger.warning(f"No detection figure data found at {data_path}")
+        return []
+    npz_files = sorted(
+        os.path.join(data_path, filename)
+        for filename in os.listdir(data_path)
+        if filename.endswith(".npz")
+        and (not dates or any(filename.startswith(date) for date in dates))
+    )
+    if not npz_files:
+        return []
+
+    filepath = os.path.join(save_location, "jpg_files", "detection")
+    jpg_files = []
+    with tqdm(
+        total=len(npz_files), desc="Rendering detection figures", leave=True
+    ) as pbar:
+        with get_executor(scheduler, num_workers) as executor:
+            futures = [
+                executor.submit(render_detection_figure_from_file, npz_file, filepath)
+                for npz_file in npz_files
+            ]
+            for future in concurrent.futures.as_completed(futures):
+                jpg_files.append(future.result())
+                pbar.update(1)
+    return sorted(jpg_files)
 
 
 def shoreline_detection_figures(
@@ -1107,6 +1782,7 @@ def shoreline_detection_figures(
     save_location: str = "",
     im_ref_buffer: np.ndarray = None,
     shoreline_extraction_area:np.ndarray=None,
+    figure_mode: str = "inline",
 ):
     """
     Creates shoreline detection figures with overlays and saves them as JPEG files.
@@ -1126,92 +1802,49 @@ def shoreline_detection_figures(
     save_location (str, optional): The directory path where the images will be saved. Defaults to "".
     im_ref_buffer (numpy.ndarray, optional): The reference shoreline buffer. Defaults to None.
     shoreline_extraction_area (numpy.ndarray, optional): The area where the shoreline was extracted. Defaults to None.
+    figure_mode (str, optional): "inline" saves the figure as a jpg, "deferred" saves the arrays needed to render the figure
+        to the detection_figure_data directory instead and "off" does nothing. Defaults to "inline".
     """
+    if figure_mode == "off":
+        return
     sitename = settings["inputs"]["sitename"]
-    if save_location:
-        filepath = os.path.join(save_location, "jpg_files", "detection")
-    else:
-        filepath_data = settings["inputs"]["filepath"]
-        filepath = os.path.join(filepath_data, sitename, "jpg_files", "detection")
-        
-        
-    os.makedirs(filepath, exist_ok=True)
-    # logger.info(f"shoreline_detection_figures filepath: {filepath}")
-    logger.info(f"im_ref_buffer.shape: {im_ref_buffer.shape}")
-
-    # increase the intensity of the image for visualization
-    im_RGB = increase_image_intensity(im_ms, cloud_mask, prob_high=99.9)
-
-
-    im_merged = create_overlay(im_RGB, merged_labels, overlay_opacity=0.35)
-    im_all = create_overlay(im_RGB, all_labels, overlay_opacity=0.35)
-
-
-    # Mask clouds in the images
-    im_RGB, im_merged, im_all = mask_clouds_in_images(
-        im_RGB, im_merged, im_all, cloud_mask
-    )
-
-    # Convert shoreline points to pixel coordinates
-    try:
-        pixelated_shoreline = SDS_tools.convert_world2pix(
-            SDS_tools.convert_epsg(shoreline, settings["output_epsg"], image_epsg)[
-                :, [0, 1]
-            ],
-            georef,
-        )
-    except:
-        pixelated_shoreline = np.array([[np.nan, np.nan], [np.nan, np.nan]])
+    location = get_detection_figure_location(settings, save_location)
 
-    # Convert shoreline extraction area to pixel coordinates
-    shoreline_extraction_area_pix = np.array([[np.nan, np.nan], [np.nan, np.nan]])
-    shoreline_extraction_area_pix  = []
     if shoreline_extraction_area is not None:
         if len(shoreline_extraction_area) == 0:
             shoreline_extraction_area = None
-    
-    if shoreline_extraction_area is not None:
-        shoreline_extraction_area_pix  = []
-        for idx in range(len(shoreline_extraction_area)):
-            shoreline_extraction_area_pix.append(
-                SDS_preprocess.transform_world_coords_to_pixel_coords(shoreline_extraction_area[idx],settings["output_epsg"], georef, image_epsg)
-            )
-    # Create legend for the shorelines
-    black_line = mlines.Line2D([], [], color="k", linestyle="-", label="shoreline")
-    buffer_patch = mpatches.Patch(
-        color="#800000", alpha=0.80, label="Reference shoreline buffer"
-    )
-    # The additional patches to be appended to the legend
-    additional_legend_items = [black_line, buffer_patch]
-    
-    if shoreline_extraction_area is not None:
-        shoreline_extraction_area_line = mlines.Line2D([], [], color="#cb42f5", linestyle="-", label="shoreline extraction area")
-        additional_legend_items.append(shoreline_extraction_area_line)
 
-    # create a legend for the class colors and the shoreline
-    all_classes_legend = create_legend(
-        class_mapping, additional_patches=additional_legend_items
-    )
-    merged_classes_legend = create_legend(
-        class_mapping={0: "other", 1: "water"},
-        additional_patches=additional_legend_items,
+    figure_data = create_detection_figure_data(
+        im_ms,
+        cloud_mask,
+        merged_labels,
+        all_labels,
+        shoreline,
+        image_epsg,
+        georef,
+        settings,
+        im_ref_buffer,
+        shoreline_extraction_area,
     )
+    if figure_mode == "deferred":
+        save_detection_figure_data(
+            figure_data,
+            os.path.join(location, DETECTION_FIGURE_DATA_DIR),
+            sitename,
+            date,
+            satname,
+            class_mapping,
+        )
+        return
 
-    # Plot images
-    fig = plot_image_with_legend(
-        im_RGB,
-        im_merged,
-        im_all,
-        pixelated_shoreline,
-        merged_classes_legend,
-        all_classes_legend,
-        im_ref_buffer,
-        titles=[sitename, date, satname],
-        pixelated_shoreline_extraction_area=shoreline_extraction_area_pix,
+    render_detection_figure(
+        figure_data,
+        os.path.join(location, "jpg_files", "detection"),
+        sitename,
+        date,
+        satname,
+        class_mapping,
     )
-    # save a .jpg under /jpg_files/detection
-    save_detection_figure(fig, filepath, date, satname)
-    plt.close(fig)
 
 
 def mask_clouds_in_images(
@@ -1327,10 +1960,13 @@ def extract_shorelines_with_dask(
     class_mapping: dict = None,
     save_location: str = "",
     shoreline_extraction_area: gpd.GeoDataFrame = None,
+    num_workers: Optional[int] = None,
+    scheduler: str = "threads",
     **kwargs: dict,
 ) -> dict:
     """
-    Extracts shorelines from satellite imagery using a Dask-based implementation.
+    Extracts shorelines from satellite imagery.
+    The images from all the satellites are processed in a single pool of workers.
 
     Args:
         session_path (str): The path to the session directory.
@@ -1340,6 +1976,8 @@ def extract_shorelines_with_dask(
         class_mapping (dict, optional): A dictionary mapping class indices to class names. Defaults to None.
         save_location (str, optional): The path to save the extracted shorelines. Defaults to "".
         shoreline_extraction_area (gpd.GeoDataFrame, optional): A GeoDataFrame containing the area where the shoreline was extracted. Defaults to None.
+        num_workers (int, optional): The maximum number of images processed at once. Defaults to None which uses the number of CPUs.
+        scheduler (str, optional): Process the images with "threads" or "processes". Defaults to "threads".
         **kwargs (dict): Additional keyword arguments.
 
     Returns:
@@ -1360,6 +1998,8 @@ def extract_shorelines_with_dask(
     filtered_files = get_filtered_files_dict(good_folder, "npz", sitename)
     # keep only the metadata for the files that were sorted as 'good'
     metadata = edit_metadata(metadata, filtered_files)
+    # index the model outputs once so each image's npz file is found without searching the session again
+    npz_index = create_npz_index([good_folder, session_path])
 
     for satname in metadata.keys():
         if not metadata[satname]:
@@ -1384,26 +2024,20 @@ def extract_shorelines_with_dask(
                 f"edit_metadata metadata['{satname}'] length {len(metadata[satname].get('im_quality',[]))} of im_quality: {np.unique(metadata[satname].get('im_quality',[]))}"
             )
 
-    shoreline_dict = {}
-    for satname in metadata.keys():
-        satellite_dict = process_satellite(
-            satname,
-            settings,
-            metadata,
-            session_path,
-            class_indices,
-            class_mapping,
-            save_location,
-            batch_size=10,
-            shoreline_extraction_area=shoreline_extraction_area,
-            **kwargs,
-        )
-        if not satellite_dict:
-            shoreline_dict[satname] = {}
-        elif not satname in satellite_dict.keys():
-            shoreline_dict[satname] = {}
-        else:
-            shoreline_dict[satname] = satellite_dict[satname]
+    shoreline_dict = process_satellites(
+        list(metadata.keys()),
+        settings,
+        metadata,
+        session_path,
+        class_indices,
+        class_mapping,
+        save_location,
+        shoreline_extraction_area=shoreline_extraction_area,
+        num_workers=num_workers,
+        scheduler=scheduler,
+        npz_index=npz_index,
+        **kwargs,
+    )
 
     for satname in shoreline_dict.keys():
         # Check and log 'reference shoreline' if it exists
@@ -1534,32 +2168,75 @@ def get_pixel_size_for_satellite(satname: str) -> int:
     return pixel_size
 
 
+def get_extracted_shorelines_npz_path(dir_path: str) -> Optional[str]:
+    """
+    Returns the path to the extracted shorelines dictionary npz file if it can be used instead of the JSON file.
+
+    The npz file is only used if it is at least as new as the extracted shorelines dictionary JSON file,
+    so a JSON file edited by an older version of CoastSeg is never ignored.
+
+    Args:
+        dir_path: The path to the directory containing the extracted shoreline files.
+
+    Returns:
+        The path to the npz file or None if it doesn't exist or is older than the JSON file.
+    """
+    npz_paths = glob(os.path.join(dir_path, "*shoreline*dict*.npz"))
+    if not npz_paths:
+        return None
+    npz_path = npz_paths[0]
+    json_path = os.path.splitext(npz_path)[0] + ".json"
+    if os.path.isfile(json_path) and os.path.getmtime(json_path) > os.path.getmtime(
+        npz_path
+    ):
+        return None
+    return npz_path
+
+
 def load_extracted_shoreline_from_files(
     dir_path: str,
+    mmap_mode: Optional[str] = None,
 ) -> Optional["Extracted_Shoreline"]:
     """
     Load the extracted shoreline from the given directory.
 
     The function searches the directory for the extracted shoreline GeoJSON file, the shoreline settings JSON file,
     and the extracted shoreline dictionary JSON file. If any of these files are missing, the function returns None.
+    If the extracted shoreline dictionary npz file exists and is at least as new as the JSON file it is loaded instead.
 
     Args:
         dir_path: The path to the directory containing the extracted shoreline files.
+        mmap_mode: If "r" the shorelines in the npz file are memory mapped and only read when used. Defaults to None.
 
     Returns:
         An instance of the Extracted_Shoreline class containing the extracted shoreline data, or None if any of the
         required files are missing.
     """
+    # the extracted shorelines can be saved in any of the output formats
     required_files = {
-        "geojson": "*shoreline*.geojson",
-        "settings": "*shoreline*settings*.json",
-        "dict": "*shoreline*dict*.json",
+        "geojson": [
+            f"*shoreline*{extension}"
+            for extension in file_utilities.GEODATA_EXTENSIONS
+        ],
+        "settings": ["*shoreline*settings*.json"],
+        "dict": ["*shoreline*dict*.json"],
     }
 
     extracted_files = {}
     logger.info(f"Loading extracted shorelines from: {dir_path}")
-    for file_type, file_pattern in required_files.items():
-        file_paths = glob(os.path.join(dir_path, file_pattern))
+    npz_path = get_extracted_shorelines_npz_path(dir_path)
+    if npz_path:
+        extracted_files["dict"] = file_utilities.load_extracted_shorelines_npz(
+            npz_path, mmap_mode=mmap_mode
+        )
+    for file_type, file_patterns in required_files.items():
+        if file_type in extracted_files:
+            continue
+        file_paths = [
+            file_path
+            for file_pattern in file_patterns
+            for file_path in glob(os.path.join(dir_path, file_pattern))
+        ]
         if not file_paths:
             logger.warning(f"No {file_type} file could be loaded from {dir_path}")
             return None
@@ -1586,6 +2263,263 @@ def load_extracted_shoreline_from_files(
     return extracted_shorelines
 
 
+# settings that control how the detection figures are saved, these don't change the extracted shorelines
+SETTINGS_HASH_EXCLUDED_KEYS = (
+    "figure_mode",
+    "save_figure",
+    "settings_hash",
+    "processed_filenames",
+)
+# the inputs that identify the imagery the shorelines are extracted from
+SETTINGS_HASH_INPUT_KEYS = ("roi_id", "polygon", "landsat_collection", "sitename")
+
+
+def get_shoreline_settings_hash(
+    shoreline_settings: dict, shoreline_extraction_area: gpd.GeoDataFrame = None
+) -> str:
+    """
+    Returns a hash of the shoreline settings that change the shoreline extracted from each image.
+
+    The date range, satellite list and location of the data directory are not part of the hash because
+    they only control which images are processed. The settings that only control the detection figures
+    are not part of the hash either.
+
+    Args:
+        shoreline_settings (dict): The shoreline settings created by Extracted_Shoreline.create_shoreline_settings.
+        shoreline_extraction_area (gpd.GeoDataFrame, optional): The area shorelines are extracted from. Defaults to None.
+
+    Returns:
+        str: The sha256 hash of the settings.
+    """
+    settings = {
+        key: value
+        for key, value in shoreline_settings.items()
+        if key not in SETTINGS_HASH_EXCLUDED_KEYS and key != "inputs"
+    }
+    inputs = shoreline_settings.get("inputs", {})
+    settings["inputs"] = {
+        key: inputs.get(key) for key in SETTINGS_HASH_INPUT_KEYS if key in inputs
+    }
+    if shoreline_extraction_area is not None and not shoreline_extraction_area.empty:
+        settings["shoreline_extraction_area"] = [
+            geom.wkb_hex
+            for geom in shoreline_extraction_area.to_crs("EPSG:4326").geometry
+        ]
+    settings_json = json.dumps(
+        settings,
+        sort_keys=True,
+        default=lambda value: value.tolist()
+        if isinstance(value, np.ndarray)
+        else str(value),
+    )
+    return hashlib.sha256(settings_json.encode("utf-8")).hexdigest()
+
+
+def normalize_extracted_shorelines_dict(extracted_shorelines: dict) -> dict:
+    """
+    Converts an extracted shorelines dictionary loaded from file to the types created during extraction.
+    The dates are converted from ISO strings to datetimes and the shorelines are converted to numpy arrays.
+
+    Args:
+        extracted_shorelines (dict): The extracted shorelines dictionary.
+
+    Returns:
+        dict: The extracted shorelines dictionary with datetimes and numpy arrays.
+    """
+    extracted_shorelines = dict(extracted_shorelines)
+    extracted_shorelines["dates"] = [
+        datetime.datetime.fromisoformat(date) if isinstance(date, str) else date
+        for date in extracted_shorelines.get("dates", [])
+    ]
+    extracted_shorelines["shorelines"] = [
+        np.asarray(shoreline, dtype=float).reshape(-1, 2)
+        for shoreline in extracted_shorelines.get("shorelines", [])
+    ]
+    return extracted_shorelines
+
+
+def get_previous_extraction(session_path: str, settings_hash: str) -> Tuple[dict, list]:
+    """
+    Returns the extracted shorelines saved in the session if they were extracted with the same settings.
+
+    Args:
+        session_path (str): The session directory the extracted shorelines were saved to.
+        settings_hash (str): The hash of the current shoreline settings. See get_shoreline_settings_hash.
+
+    Returns:
+        Tuple[dict, list]: The extracted shorelines dictionary and the filenames of all the images that were
+        processed to create it, including the images no shoreline was extracted from.
+        An empty dictionary and list are returned if the session has no extracted shorelines or they were
+        extracted with different settings.
+    """
+    if not session_path or not os.path.isdir(session_path):
+        return {}, []
+    settings_path = os.path.join(session_path, "shoreline_settings.json")
+    shoreline_settings = file_utilities.read_json_file(settings_path)
+    if not shoreline_settings:
+        return {}, []
+    if shoreline_settings.get("settings_hash") != settings_hash:
+        logger.info(
+            f"The extracted shorelines in {session_path} used different settings and will be extracted again."
+        )
+        return {}, []
+
+    npz_path = get_extracted_shorelines_npz_path(session_path)
+    json_path = os.path.join(session_path, "extracted_shorelines_dict.json")
+    if npz_path:
+        extracted_shorelines = file_utilities.load_extracted_shorelines_npz(npz_path)
+    elif os.path.isfile(json_path):
+        extracted_shorelines = file_utilities.load_data_from_json(json_path)
+    else:
+        return {}, []
+    extracted_shorelines = normalize_extracted_shorelines_dict(extracted_shorelines)
+    processed_filenames = list(
+        shoreline_settings.get(
+            "processed_filenames", extracted_shorelines.get("filename", [])
+        )
+    )
+    return extracted_shorelines, processed_filenames
+
+
+def remove_processed_images_from_metadata(
+    metadata: dict, processed_filenames: Collection[str]
+) -> dict:
+    """
+    Removes the images that were already processed from the metadata.
+
+    Args:
+        metadata (dict): The metadata of each satellite. See common.get_cached_metadata.
+        processed_filenames (Collection[str]): The filenames of the images that were already processed.
+
+    Returns:
+        dict: The metadata of each satellite without the processed images.
+    """
+    processed_filenames = set(processed_filenames)
+    filtered_metadata = {}
+    for satname, sat_metadata in metadata.items():
+        keep = [
+            filename not in processed_filenames
+            for filename in sat_metadata.get("filenames", [])
+        ]
+        filtered_metadata[satname] = {
+            key: [value for value, keep_value in zip(values, keep) if keep_value]
+            if isinstance(values, list) and len(values) == len(keep)
+            else values
+            for key, values in sat_metadata.items()
+        }
+    return filtered_metadata
+
+
+def get_metadata_filenames(metadata: dict) -> list:
+    """Returns the filenames of all the images in the metadata."""
+    return [
+        filename
+        for sat_metadata in metadata.values()
+        for filename in sat_metadata.get("filenames", [])
+    ]
+
+
+def merge_extracted_shorelines_dicts(previous: dict, new: dict) -> dict:
+    """
+    Merges two extracted shorelines dictionaries into one sorted chronologically.
+
+    Args:
+        previous (dict): The extracted shorelines dictionary of the previous extraction.
+        new (dict): The extracted shorelines dictionary of the images that were processed since.
+
+    Returns:
+        dict: The merged extracted shorelines dictionary.
+    """
+    if not previous:
+        return new
+    if not new or not new.get("dates"):
+        return previous
+    keys = list(previous.keys()) + [key for key in new.keys() if key not in previous]
+    merged = {
+        key: list(previous.get(key, [None] * len(previous["dates"])))
+        + list(new.get(key, [None] * len(new["dates"])))
+        for key in keys
+    }
+    idx_sorted = sorted(range(len(merged["dates"])), key=lambda i: merged["dates"][i])
+    return {key: [values[i] for i in idx_sorted] for key, values in merged.items()}
+
+
+def compute_transects_incrementally(
+    extracted_shorelines: dict,
+    transects_gdf: gpd.GeoDataFrame,
+    settings: dict,
+    previous_dates: list,
+    session_path: str,
+) -> dict:
+    """
+    Computes the intersection between the shorelines and the transects, reusing the intersections saved in
+    the session's transects_cross_distances.json for the shorelines whose dates are in previous_dates.
+
+    The saved intersections are only reused if they were computed for the previous dates with the same
+    transect settings and transects. When the "multiple_inter" setting is "auto" the outliers of each transect are
+    removed based on all of its intersections, so all the intersections are computed again.
+
+    Args:
+        extracted_shorelines (dict): contains the extracted shorelines and corresponding metadata
+        transects_gdf (gpd.GeoDataFrame): transects in ROI with crs = output_crs in settings
+        settings (dict): settings dict with the transect settings. See common.get_transect_settings.
+        previous_dates (list): The dates of the shorelines the saved intersections were computed for.
+        session_path (str): The session directory containing transects_cross_distances.json.
+
+    Returns:
+        dict: time-series of cross-shore distance along each of the transects.
+              Not tidally corrected.
+    """
+    cross_distance_path = os.path.join(session_path, "transects_cross_distances.json")
+    transect_settings_path = os.path.join(session_path, "transects_settings.json")
+    previous_cross_distance = {}
+    if (
+        previous_dates
+        and settings.get("multiple_inter") != "auto"
+        and os.path.isfile(cross_distance_path)
+        and file_utilities.read_json_file(transect_settings_path)
+        == json.loads(json.dumps(common.get_transect_settings(settings)))
+    ):
+        previous_cross_distance = file_utilities.load_data_from_json(
+            cross_distance_path
+        )
+    transect_ids = set(transects_gdf["id"].astype(str))
+    if set(previous_cross_distance.keys()) != transect_ids or any(
+        len(values) != len(previous_dates)
+        for values in previous_cross_distance.values()
+    ):
+        return compute_transects_from_roi(
+            extracted_shorelines, transects_gdf, settings
+        )
+
+    previous_index = {date: i for i, date in enumerate(previous_dates)}
+    dates = extracted_shorelines["dates"]
+    new_idx = [i for i, date in enumerate(dates) if date not in previous_index]
+    logger.info(
+        f"Computing the transect intersections of {len(new_idx)} of {len(dates)} shorelines"
+    )
+    new_cross_distance = {}
+    if new_idx:
+        new_shorelines = {
+            key: [values[i] for i in new_idx]
+            for key, values in extracted_shorelines.items()
+        }
+        new_cross_distance = compute_transects_from_roi(
+            new_shorelines, transects_gdf, settings
+        )
+    cross_distance = {}
+    for transect_id, previous_values in previous_cross_distance.items():
+        previous_values = np.array(previous_values, dtype=float)
+        values = np.full(len(dates), np.nan)
+        for i, date in enumerate(dates):
+            if date in previous_index:
+                values[i] = previous_values[previous_index[date]]
+        if new_idx:
+            values[new_idx] = new_cross_distance[transect_id]
+        cross_distance[transect_id] = values
+    return cross_distance
+
+
 class Extracted_Shoreline:
     """Extracted_Shoreline: contains the extracted shorelines within a Region of Interest (ROI)"""
 
@@ -1604,6 +2538,8 @@ class Extracted_Shoreline:
         self.dictionary = {}
         # shoreline_settings: dictionary of settings used to extract shoreline
         self.shoreline_settings = {}
+        # previous_dates: dates of the shorelines that were extracted before an incremental extraction
+        self.previous_dates = []
 
     def __str__(self):
         # Get column names and their data types
@@ -1783,6 +2719,7 @@ class Extracted_Shoreline:
         settings: dict = None,
         output_directory:str = None,
         shoreline_extraction_area: gpd.GeoDataFrame = None,
+        incremental: bool = False,
     ) -> "Extracted_Shoreline":
         """
         Extracts shorelines for a specified region of interest (ROI) and returns an Extracted_Shoreline class instance.
@@ -1796,6 +2733,9 @@ class Extracted_Shoreline:
         - output_directory (str): The path to the directory where the extracted shorelines will be saved.
            - detection figures will be saved in a subfolder called 'jpg_files' within the output_directory.
            - extract_shoreline reports will be saved within the output_directory.
+        - shoreline_extraction_area (GeoDataFrame, optional): The area to extract shorelines from. Defaults to None.
+        - incremental (bool, optional): If True, only the images that were not already processed with the same settings
+            in the output_directory are processed and merged with the shorelines saved there. Defaults to False.
 
         Returns:
         - object: The Extracted_Shoreline class instance.
@@ -1810,7 +2750,8 @@ class Extracted_Shoreline:
             roi_settings,
             settings,
             output_directory=output_directory,
-            shoreline_extraction_area = shoreline_extraction_area
+            shoreline_extraction_area = shoreline_extraction_area,
+            incremental=incremental,
         )
         if self.dictionary == {}:
             logger.warning(f"No extracted shorelines for ROI {roi_id}")
@@ -1837,6 +2778,7 @@ class Extracted_Shoreline:
         new_session_path: str = None,
         output_directory: str = None, 
         shoreline_extraction_area : gpd.geodataframe = None,  
+        incremental: bool = False,
         **kwargs: dict,
     ) -> "Extracted_Shoreline":
         """
@@ -1871,6 +2813,9 @@ class Extracted_Shoreline:
             - detection figures will be saved in a subfolder called 'jpg_files' within the output_directory.
             - extract_shoreline reports will be saved within the output_directory.
         - shoreline_extraction_area (gpd.geodataframe, optional): A GeoDataFrame containing the area to extract shorelines from. Defaults to None.
+        - incremental (bool, optional): If True, only the images that were not already processed with the same settings
+            in the new_session_path are processed and merged with the shorelines saved there. Defaults to False.
+        - **kwargs: Passed to extract_shorelines_with_dask. ex. num_workers and scheduler control the pool of workers that process the images.
         Returns:
         - object: The Extracted_Shoreline class instance.
         """
@@ -1931,7 +2876,7 @@ class Extracted_Shoreline:
             f"Number of 'reference_shoreline': {len(ref_sl)} for ROI {roi_id}"
         )
         # gets metadata used to extract shorelines
-        metadata = get_metadata(self.shoreline_settings["inputs"])
+        metadata = common.get_cached_metadata(self.shoreline_settings["inputs"])
         sitename = self.shoreline_settings["inputs"]["sitename"]
         filepath_data = self.shoreline_settings["inputs"]["filepath"]
 
@@ -1967,14 +2912,28 @@ class Extracted_Shoreline:
                         f"edit_metadata metadata['{satname}'] length {len(metadata[satname].get('im_quality',[]))} of im_quality: {np.unique(metadata[satname].get('im_quality',[]))}"
                     )
 
-            extracted_shorelines_dict = extract_shorelines_with_dask(
-                session_path,
+            metadata, previous_shorelines = self._get_images_to_process(
                 metadata,
-                self.shoreline_settings,
-                class_indices=water_classes_indices,
-                class_mapping=class_mapping,
-                save_location=new_session_path,
-                shoreline_extraction_area=shoreline_extraction_area,
+                new_session_path,
+                shoreline_extraction_area,
+                incremental,
+            )
+            if previous_shorelines and not get_metadata_filenames(metadata):
+                logger.info("No new images to extract shorelines from.")
+                extracted_shorelines_dict = {}
+            else:
+                extracted_shorelines_dict = extract_shorelines_with_dask(
+                    session_path,
+                    metadata,
+                    self.shoreline_settings,
+                    class_indices=water_classes_indices,
+                    class_mapping=class_mapping,
+                    save_location=new_session_path,
+                    shoreline_extraction_area=shoreline_extraction_area,
+                    **kwargs,
+                )
+            extracted_shorelines_dict = merge_extracted_shorelines_dicts(
+                previous_shorelines, extracted_shorelines_dict
             )
             if extracted_shorelines_dict == {}:
                 raise Exception(f"Failed to extract any shorelines.")
@@ -2067,7 +3026,8 @@ class Extracted_Shoreline:
             roi_settings: dict,
             settings: dict,
             output_directory: str = None, 
-            shoreline_extraction_area : gpd.geodataframe = None           
+            shoreline_extraction_area : gpd.geodataframe = None,
+            incremental: bool = False,
         ) -> dict:
         """
         Extracts shorelines for a specified region of interest (ROI).
@@ -2100,6 +3060,8 @@ class Extracted_Shoreline:
                 - detection figures will be saved in a subfolder called 'jpg_files' within the output_directory.
                 - extract_shoreline reports will be saved within the output_directory.
             shoreline_extraction_area (gpd.geodataframe, optional): A GeoDataFrame containing the area to extract shorelines from. Defaults to None.
+            incremental (bool, optional): If True, only the images that were not processed with the same settings in the
+                output_directory are processed and their shorelines are merged with the shorelines saved there. Defaults to False.
         Returns:
             dict: Dictionary containing the extracted shorelines for the specified ROI.
         """
@@ -2113,7 +3075,7 @@ class Extracted_Shoreline:
             settings, roi_settings, reference_shoreline
         )
         # gets metadata used to extract shorelines
-        metadata = get_metadata(self.shoreline_settings["inputs"])
+        metadata = common.get_cached_metadata(self.shoreline_settings["inputs"])
         sitename = self.shoreline_settings["inputs"]["sitename"]
         filepath_data = self.shoreline_settings["inputs"]["filepath"]
 
@@ -2150,9 +3112,19 @@ class Extracted_Shoreline:
                     f"edit_metadata metadata['{satname}'] length {len(metadata[satname].get('im_quality',[]))} of im_quality: {np.unique(metadata[satname].get('im_quality',[]))}"
                 )
 
+        metadata, previous_shorelines = self._get_images_to_process(
+            metadata, output_directory, shoreline_extraction_area, incremental
+        )
+        if previous_shorelines and not get_metadata_filenames(metadata):
+            logger.info("No new images to extract shorelines from.")
+            return previous_shorelines
+
         # extract shorelines with coastsat's models
         extracted_shorelines = extract_shorelines(metadata, self.shoreline_settings,output_directory=output_directory, shoreline_extraction_area=shoreline_extraction_area)
         logger.info(f"extracted_shoreline_dict: {extracted_shorelines}")
+        extracted_shorelines = merge_extracted_shorelines_dicts(
+            previous_shorelines, extracted_shorelines
+        )
         # postprocessing by removing duplicates and removing in inaccurate georeferencing (set threshold to 10 m)
         extracted_shorelines = remove_duplicates(
             extracted_shorelines
@@ -2162,6 +3134,49 @@ class Extracted_Shoreline:
         )  # remove inaccurate georeferencing (set threshold to 10 m)
         return extracted_shorelines
 
+    def _get_images_to_process(
+        self,
+        metadata: dict,
+        output_directory: str,
+        shoreline_extraction_area: gpd.GeoDataFrame = None,
+        incremental: bool = False,
+    ) -> Tuple[dict, dict]:
+        """
+        Records the hash of the shoreline settings and the images processed in the shoreline settings.
+        If incremental is True, removes the images that were already processed with the same settings in the
+        output_directory from the metadata.
+
+        Args:
+            metadata (dict): The metadata of the images to extract shorelines from.
+            output_directory (str): The session directory the extracted shorelines are saved to.
+            shoreline_extraction_area (gpd.GeoDataFrame, optional): The area to extract shorelines from. Defaults to None.
+            incremental (bool, optional): Whether to skip the images that were already processed. Defaults to False.
+
+        Returns:
+            Tuple[dict, dict]: The metadata of the images to process and the previously extracted shorelines dictionary.
+            The dictionary is empty if incremental is False or the shorelines were extracted with different settings.
+        """
+        settings_hash = get_shoreline_settings_hash(
+            self.shoreline_settings, shoreline_extraction_area
+        )
+        self.shoreline_settings["settings_hash"] = settings_hash
+        previous_shorelines, processed_filenames = {}, []
+        if incremental:
+            previous_shorelines, processed_filenames = get_previous_extraction(
+                output_directory, settings_hash
+            )
+            metadata = remove_processed_images_from_metadata(
+                metadata, processed_filenames
+            )
+            logger.info(
+                f"Skipping {len(processed_filenames)} images that were already processed. {len(get_metadata_filenames(metadata))} new images to process."
+            )
+        self.previous_dates = list(previous_shorelines.get("dates", []))
+        self.shoreline_settings["processed_filenames"] = sorted(
+            set(processed_filenames) | set(get_metadata_filenames(metadata))
+        )
+        return metadata, previous_shorelines
+
     def create_shoreline_settings(
         self,
         settings: dict,
@@ -2187,6 +3202,7 @@ class Extracted_Shoreline:
             "percent_no_data" (float): percentage of no data allowed
             "model_session_path" (str): path to model session file
             "apply_cloud_mask" (bool): whether to apply cloud mask
+            "figure_mode" (str): how the detection figures are created "inline", "deferred" or "off"
             }
             roi_settings (dict): Dictionary containing settings for the ROI. 
             It must have the following keys:
@@ -2236,6 +3252,7 @@ class Extracted_Shoreline:
             "percent_no_data",
             "model_session_path",  # path to model session file
             "apply_cloud_mask",
+            "figure_mode",
         ]
         shoreline_settings = {k: v for k, v in settings.items() if k in SHORELINE_KEYS}
         shoreline_settings.update(
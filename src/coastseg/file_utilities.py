@@ -4,6 +4,8 @@ import glob
 import shutil
 import json
 import logging
+import struct
+import zipfile
 import datetime
 from typing import Union, Collection
 
@@ -22,6 +24,15 @@ from coastseg import core_utilities
 # Logger setup
 logger = logging.getLogger(__name__)
 
+# the file extension and driver used to save the session files in each output format
+# geoparquet files are written with GeoDataFrame.to_parquet which requires pyarrow
+OUTPUT_FORMATS = {
+    "geojson": (".geojson", "GeoJSON"),
+    "geoparquet": (".parquet", None),
+    "flatgeobuf": (".fgb", "FlatGeobuf"),
+}
+GEODATA_EXTENSIONS = tuple(extension for extension, _ in OUTPUT_FORMATS.values())
+
 
 @contextmanager
 def progress_bar_context(
@@ -209,8 +220,8 @@ def find_file_by_regex(
 
 def validate_config_files_exist(src: str) -> bool:
     """Check if config files exist in the source directory.
-    Looks for files with names starting with "config_gdf" and ending with ".geojson"
-    and a file named "config.json" in the source directory.
+    Looks for files with names starting with "config_gdf" and ending with ".geojson" (or the extension
+    of another output format) and a file named "config.json" in the source directory.
     Args:
         src (str): the source directory
     Returns:
@@ -220,7 +231,7 @@ def validate_config_files_exist(src: str) -> bool:
     config_gdf_exists = False
     config_json_exists = False
     for file in files:
-        if file.startswith("config_gdf") and file.endswith(".geojson"):
+        if file.startswith("config_gdf") and file.endswith(GEODATA_EXTENSIONS):
             config_gdf_exists = True
         elif file == "config.json":
             config_json_exists = True
@@ -345,34 +356,40 @@ def find_parent_directory(
         path = parent_dir
 
 
-def config_to_file(config: Union[dict, gpd.GeoDataFrame], filepath: str):
+def config_to_file(
+    config: Union[dict, gpd.GeoDataFrame], filepath: str, output_format: str = "geojson"
+):
     """Saves config to config.json or config_gdf.geojson
     config's type is dict or geodataframe respectively
 
     Args:
         config (Union[dict, gpd.GeoDataFrame]): data to save to config file
         filepath (str): full path to directory to save config file. NOT INCLUDING THE FILE
+        output_format (str, optional): the format to save config_gdf in. One of the keys in OUTPUT_FORMATS. Defaults to "geojson".
     """
     # default save path
     filepath = str(filepath)
     save_path = filepath
+    config_gdf_filenames = [
+        get_geodata_filename("config_gdf.geojson", fmt) for fmt in OUTPUT_FORMATS
+    ]
     # check if config.json or config_gdf.geojson in the filepath
     if filepath.endswith("config.json"):
         filename = f"config.json"
         write_to_json(filepath, config)
-    elif filepath.endswith("config_gdf.geojson"):
-        filename = f"config.json"
+    elif filepath.endswith(tuple(config_gdf_filenames)):
+        filename = os.path.basename(filepath)
         os.makedirs(os.path.dirname(filepath), exist_ok=True)
-        config.to_file(filepath, driver="GeoJSON")
+        write_geodata_file(config, filepath)
     elif isinstance(config, dict):
         filename = f"config.json"
         save_path = os.path.abspath(os.path.join(filepath, filename))
         write_to_json(save_path, config)
     elif isinstance(config, gpd.GeoDataFrame):
-        filename = f"config_gdf.geojson"
+        filename = get_geodata_filename("config_gdf.geojson", output_format)
         save_path = os.path.abspath(os.path.join(filepath, filename))
         os.makedirs(os.path.dirname(filepath), exist_ok=True)
-        config.to_file(save_path, driver="GeoJSON")
+        write_geodata_file(config, save_path)
         
     logger.info(f"Saved {filename} saved to {save_path}")
 
@@ -766,6 +783,133 @@ def mk_new_dir(name: str, location: str):
         raise Exception("Location provided does not exist.")
 
 
+def get_output_format(settings: dict) -> str:
+    """
+    Returns the output format the session files are saved in from the settings.
+
+    Args:
+        settings (dict): The settings. The output format is read from the "output_format" key.
+
+    Returns:
+        str: The output format. One of the keys in OUTPUT_FORMATS. Defaults to "geojson".
+
+    Raises:
+        ValueError: If the output format is not one of the keys in OUTPUT_FORMATS.
+    """
+    output_format = str(settings.get("output_format", "geojson") or "geojson").lower()
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(
+            f"output_format must be one of {list(OUTPUT_FORMATS.keys())} not '{output_format}'"
+        )
+    return output_format
+
+
+def get_geodata_filename(filename: str, output_format: str = "geojson") -> str:
+    """
+    Returns the filename with the file extension of the output format.
+
+    Example:
+        get_geodata_filename("config_gdf.geojson", "geoparquet") -> "config_gdf.parquet"
+
+    Args:
+        filename (str): The filename or path. Its extension is replaced.
+        output_format (str, optional): One of the keys in OUTPUT_FORMATS. Defaults to "geojson".
+
+    Returns:
+        str: The filename with the extension of the output format.
+    """
+    extension = OUTPUT_FORMATS[get_output_format({"output_format": output_format})][0]
+    return os.path.splitext(filename)[0] + extension
+
+
+def get_geodata_file_format(filepath: str) -> str:
+    """
+    Returns the output format of a file from its extension.
+
+    Args:
+        filepath (str): The path to the file.
+
+    Returns:
+        str: One of the keys in OUTPUT_FORMATS. Files with an unknown extension are "geojson".
+    """
+    extension = os.path.splitext(filepath)[1].lower()
+    for output_format, (format_extension, _) in OUTPUT_FORMATS.items():
+        if extension == format_extension:
+            return output_format
+    return "geojson"
+
+
+def write_geodata_file(
+    gdf: gpd.GeoDataFrame, filepath: str, output_format: str = None
+) -> str:
+    """
+    Saves the GeoDataFrame in the output format.
+
+    Args:
+        gdf (gpd.GeoDataFrame): The GeoDataFrame to save.
+        filepath (str): The path to save the file to. If output_format is given the extension is replaced
+            with the extension of the output format.
+        output_format (str, optional): One of the keys in OUTPUT_FORMATS. Defaults to None which uses
+            the format of the extension of the filepath.
+
+    Returns:
+        str: The path the file was saved to.
+    """
+    if output_format is None:
+        output_format = get_geodata_file_format(filepath)
+    else:
+        filepath = get_geodata_filename(filepath, output_format)
+    if output_format == "geoparquet":
+        gdf.to_parquet(filepath)
+    else:
+        gdf.to_file(filepath, driver=OUTPUT_FORMATS[output_format][1])
+    return filepath
+
+
+def find_geodata_file(filepath: str) -> Union[str, None]:
+    """
+    Finds the file saved in any of the output formats with the same name as the filepath.
+
+    Example:
+        find_geodata_file("session/config_gdf.geojson") -> "session/config_gdf.parquet"
+        if the session was saved in the geoparquet format.
+
+    Args:
+        filepath (str): The path to the file with any of the extensions in OUTPUT_FORMATS.
+
+    Returns:
+        str or None: The path to the file that exists. If the file exists in several formats the most
+        recently modified is returned. None if the file doesn't exist in any format.
+    """
+    filepaths = [
+        get_geodata_filename(filepath, output_format)
+        for output_format in OUTPUT_FORMATS
+    ]
+    filepaths = [path for path in filepaths if os.path.isfile(path)]
+    if not filepaths:
+        return None
+    return max(filepaths, key=os.path.getmtime)
+
+
+def get_session_output_format(session_path: str, default: str = "geojson") -> str:
+    """
+    Returns the output format the extracted shorelines of a session were saved in.
+
+    Args:
+        session_path (str): The path to the session directory.
+        default (str, optional): The output format returned if no extracted shorelines file exists. Defaults to "geojson".
+
+    Returns:
+        str: One of the keys in OUTPUT_FORMATS.
+    """
+    filepath = find_geodata_file(
+        os.path.join(session_path, "extracted_shorelines_lines.geojson")
+    )
+    if filepath is None:
+        return default
+    return get_geodata_file_format(filepath)
+
+
 def read_geojson_file(geojson_file: str) -> dict:
     """Returns the geojson of the selected ROIs from the file specified by geojson_file"""
     with open(geojson_file) as f:
@@ -779,6 +923,8 @@ def read_gpd_file(filename: str) -> gpd.GeoDataFrame:
     """
     if os.path.exists(filename):
         logger.info(f"Opening \n {filename}")
+        if get_geodata_file_format(filename) == "geoparquet":
+            return gpd.read_parquet(filename)
         return gpd.read_file(filename)
     else:
         raise FileNotFoundError
@@ -850,6 +996,153 @@ def load_data_from_json(filepath: str) -> dict:
     return data
 
 
+def save_extracted_shorelines_npz(data: dict, filepath: str) -> None:
+    """
+    Saves the extracted shorelines dictionary to an uncompressed npz file in a columnar format.
+
+    The shorelines are stored as one array of all their points ("shorelines_coords") and the index
+    each shoreline starts at ("shorelines_offsets") so the shoreline i is coords[offsets[i]:offsets[i+1]].
+    The dates are stored as ISO format strings and every other key is stored as an array when all its values are
+    numbers or all its values are strings. Any other values are stored together as JSON in "json_columns".
+    The npz file is not compressed so the shoreline points can be memory mapped by load_extracted_shorelines_npz.
+
+    Args:
+        data (dict): The extracted shorelines dictionary. Must contain the key "shorelines".
+        filepath (str): Path (including filename) where the npz file should be saved.
+    """
+    arrays = {}
+    json_columns = {}
+    shorelines = [np.asarray(shoreline, dtype=float) for shoreline in data["shorelines"]]
+    num_columns = next((s.shape[1] for s in shorelines if s.ndim == 2 and len(s)), 2)
+    shorelines = [shoreline.reshape(-1, num_columns) for shoreline in shorelines]
+    arrays["shorelines_offsets"] = np.cumsum(
+        [0] + [len(shoreline) for shoreline in shorelines], dtype=np.int64
+    )
+    arrays["shorelines_coords"] = (
+        np.concatenate(shorelines) if shorelines else np.empty((0, num_columns))
+    )
+
+    for key, values in data.items():
+        if key == "shorelines":
+            continue
+        if key == "dates":
+            arrays["dates"] = np.array(
+                [
+                    date.isoformat() if hasattr(date, "isoformat") else str(date)
+                    for date in values
+                ],
+                dtype=str,
+            )
+            continue
+        values = list(values) if isinstance(values, (list, tuple, np.ndarray)) else None
+        if values is not None and all(isinstance(v, str) for v in values):
+            arrays[key] = np.array(values, dtype=str)
+        elif values is not None and all(
+            isinstance(v, (int, float, np.number)) and not isinstance(v, bool)
+            for v in values
+        ):
+            arrays[key] = np.array(values)
+        else:
+            json_columns[key] = data[key]
+
+    arrays["keys"] = np.array(list(data.keys()), dtype=str)
+    arrays["json_columns"] = np.array(
+        json.dumps(
+            json_columns,
+            default=lambda obj: obj.item() if isinstance(obj, np.generic) else str(obj),
+        )
+    )
+    # write to a temporary file first so a failed save never leaves a partial file behind
+    temp_filepath = f"{filepath}.tmp"
+    with open(temp_filepath, "wb") as fp:
+        np.savez(fp, **arrays)
+    os.replace(temp_filepath, filepath)
+
+
+def load_extracted_shorelines_npz(filepath: str, mmap_mode: str = None) -> dict:
+    """
+    Reads the extracted shorelines dictionary saved by save_extracted_shorelines_npz.
+
+    The dictionary is the same as the one returned by load_data_from_json for the extracted_shorelines_dict.json file.
+
+    Args:
+        filepath (str): Path to the npz file.
+        mmap_mode (str, optional): If "r" the shoreline points are memory mapped instead of read, so each shoreline
+            is only read from disk when it is used. Defaults to None which reads all the points.
+
+    Returns:
+        dict: The extracted shorelines dictionary.
+    """
+    with np.load(filepath) as npz:
+        keys = npz["keys"].tolist()
+        json_columns = json.loads(str(npz["json_columns"]))
+        offsets = npz["shorelines_offsets"]
+        columns = {
+            key: npz[key]
+            for key in keys
+            if key != "shorelines" and key not in json_columns
+        }
+        coords = None
+        if mmap_mode is not None:
+            coords = memmap_npz_array(filepath, "shorelines_coords", mmap_mode)
+        if coords is None:
+            coords = npz["shorelines_coords"]
+
+    data = {}
+    for key in keys:
+        if key == "shorelines":
+            data[key] = np.split(coords, offsets[1:-1]) if len(offsets) > 1 else []
+        elif key == "dates":
+            data[key] = [
+                datetime.datetime.fromisoformat(date) for date in columns[key].tolist()
+            ]
+        elif key in json_columns:
+            data[key] = json_columns[key]
+        else:
+            data[key] = columns[key].tolist()
+    return data
+
+
+def memmap_npz_array(filepath: str, name: str, mode: str = "r") -> Union[np.memmap, None]:
+    """
+    Memory maps an array stored without compression in a npz file.
+
+    Args:
+        filepath (str): Path to the npz file.
+        name (str): The name of the array in the npz file.
+        mode (str, optional): The mode to open the memory map with. Defaults to "r".
+
+    Returns:
+        np.memmap or None: The memory mapped array or None if the array is compressed and can't be memory mapped.
+    """
+    with zipfile.ZipFile(filepath) as archive:
+        info = archive.getinfo(f"{name}.npy")
+    if info.compress_type != zipfile.ZIP_STORED:
+        return None
+    with open(filepath, "rb") as fp:
+        # skip the local file header of the array to get to the start of the .npy file
+        fp.seek(info.header_offset)
+        local_header = fp.read(30)
+        name_length, extra_length = struct.unpack("<HH", local_header[26:30])
+        fp.seek(info.header_offset + 30 + name_length + extra_length)
+        version = np.lib.format.read_magic(fp)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(fp)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(fp)
+        offset = fp.tell()
+    if 0 in shape:
+        return np.empty(shape, dtype=dtype)
+    return np.memmap(
+        filepath,
+        dtype=dtype,
+        mode=mode,
+        shape=shape,
+        offset=offset,
+        order="F" if fortran_order else "C",
+    )
+
+
 def rename_jpgs(src_path: str) -> None:
     """Renames all the jpgs in the data directory in coastseg
     Args:
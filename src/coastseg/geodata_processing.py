@@ -8,6 +8,7 @@ from typing import Union
 from coastseg import shoreline
 from coastseg import transects
 from coastseg import shoreline_extraction_area
+from coastseg import file_utilities
 import geopandas as gpd
 import pandas as pd
 from typing import List, Callable, Any
@@ -62,7 +63,8 @@ def edit_gdf_file(
     """
     gdf = read_gpd_file(filepath)
     new_gdf = filter_function(gdf, **kwargs)
-    new_gdf.to_file(filepath, driver="GeoJSON")
+    # save the file in the same format it was read from
+    file_utilities.write_geodata_file(new_gdf, filepath)
 
 
 def create_geofeature_geodataframe(
@@ -158,6 +160,8 @@ def read_gpd_file(filename: str) -> gpd.GeoDataFrame:
     """
     if os.path.exists(filename):
         logger.info(f"Opening \n {filename}")
+        if file_utilities.get_geodata_file_format(filename) == "geoparquet":
+            return gpd.read_parquet(filename)
         return gpd.read_file(filename)
     else:
         raise FileNotFoundError(filename)
@@ -0,0 +1,113 @@
+"""
+Functions that convert the downloaded imagery into the imagery the models are run on.
+
+These functions are run in worker processes, so this module only imports numpy and skimage.
+Importing zoo_model in each worker would import tensorflow again.
+"""
+import os
+from typing import List
+
+import numpy as np
+import skimage.io
+
+
+def is_output_up_to_date(output_file: str, input_files: List[str]) -> bool:
+    """Returns True if the output file exists and is newer than all of the input files it was made from."""
+    if not os.path.isfile(output_file):
+        return False
+    output_mtime = os.path.getmtime(output_file)
+    return all(os.path.getmtime(input_file) <= output_mtime for input_file in input_files)
+
+
+def create_five_band_file(files: List[str], output_file: str) -> str:
+    """
+    Stacks the bands of the images into a single npz file.
+    The file is written to a temporary file first so an interrupted write never leaves a partial file
+    that is_output_up_to_date considers up to date.
+
+    Args:
+        files (List[str]): The paths to the RGB, MNDWI and NDWI images.
+        output_file (str): The path to save the npz file to.
+
+    Returns:
+        str: The path to the npz file.
+    """
+    # create stack which takes care of different sized inputs
+    im = np.dstack([skimage.io.imread(k) for k in files])
+    datadict = {}
+    datadict["arr_0"] = im.astype(np.uint8)
+    datadict["num_bands"] = im.shape[-1]
+    datadict["files"] = [file_name.split(os.sep)[-1] for file_name in files]
+    temp_file = output_file + ".tmp"
+    try:
+        # savez_compressed adds .npz to filenames that don't end with it so it's given the open file
+        with open(temp_file, "wb") as f:
+            np.savez_compressed(f, **datadict)
+        os.replace(temp_file, output_file)
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+    return output_file
+
+
+def create_infrared_index_image(
+    RGB_file: str, infrared_file: str, output_file: str
+) -> str:
+    """
+    Creates a (NDWI/MNDWI) image from the green band of an RGB image and an infrared(NIR/SWIR) image and saves it as a jpg.
+    The index is computed in float32. The image is written to a temporary file first so an interrupted write never leaves
+    a partial image that is_output_up_to_date considers up to date.
+
+    Args:
+        RGB_file (str): The path to the RGB image.
+        infrared_file (str): The path to the NIR or SWIR image.
+        output_file (str): The path to save the NDWI or MNDWI image to.
+
+    Returns:
+        str: The path to the NDWI or MNDWI image.
+    """
+    # Read green band from RGB image and cast to float
+    green_band = skimage.io.imread(RGB_file)[:, :, 1].astype(np.float32)
+    # Read infrared(SWIR or NIR) and cast to float
+    infrared = skimage.io.imread(infrared_file).astype(np.float32)
+    # Transform 0 to np.NAN
+    green_band[green_band == 0] = np.nan
+    infrared[infrared == 0] = np.nan
+
+    # ensure both matrices have equivalent size
+    if not np.shape(green_band) == np.shape(infrared):
+        # common is only imported for the few images that need to be resized because it is slow to import
+        from coastseg import common
+
+        gx, gy = np.shape(green_band)
+        nx, ny = np.shape(infrared)
+        # resize both matrices to have equivalent size
+        green_band = common.scale(
+            green_band, np.maximum(gx, nx), np.maximum(gy, ny)
+        )
+        infrared = common.scale(infrared, np.maximum(gx, nx), np.maximum(gy, ny))
+
+    # output_img(MNDWI/NDWI) imagery formula (Green - SWIR) / (Green + SWIR)
+    output_img = np.divide(infrared - green_band, infrared + green_band)
+    # Convert the NaNs to -1
+    output_img[np.isnan(output_img)] = -1
+    # Rescale to be between 0 - 255
+    min_value, max_value = output_img.min(), output_img.max()
+    output_img = 255 * (output_img - min_value) / (max_value - min_value)
+
+    # save output_img(MNDWI/NDWI) as .jpg in output directory
+    temp_file = output_file + ".tmp"
+    try:
+        skimage.io.imsave(
+            temp_file,
+            output_img.astype("uint8"),
+            check_contrast=False,
+            quality=100,
+            # the format can't be read from the extension of the temporary file
+            extension=os.path.splitext(output_file)[1],
+        )
+        os.replace(temp_file, output_file)
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+    return output_file
@@ -85,6 +85,8 @@ def format_as_html(settings: dict):
     <p>Distance from clouds (dist_clouds): {settings.get("dist_clouds", "unknown")}</p>
     <p>output_epsg: {settings.get("output_epsg", "unknown")}</p>
     <p>save_figure: {settings.get("save_figure", "unknown")}</p>
+    <p>figure_mode: {settings.get("figure_mode", "unknown")}</p>
+    <p>output_format: {settings.get("output_format", "unknown")}</p>
     <p>Min beach area (min_beach_area): {settings.get("min_beach_area", "unknown")}</p>
     <p>Min Length of Shoreline (min_length_sl): {settings.get("min_length_sl", "unknown")}</p>
     <p>Apply cloud mask to images (apply_cloud_mask): {settings.get("apply_cloud_mask", "unknown")}</p>
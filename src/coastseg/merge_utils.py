@@ -12,6 +12,7 @@ from shapely.ops import unary_union
 
 # Local application/library specific imports
 from coastseg import geodata_processing
+from coastseg import file_utilities
 
 
 def convert_multipoints_to_linestrings(gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
@@ -130,6 +131,7 @@ def read_first_geojson_file(
 ):
     """
     Reads the first available GeoJSON file from the given directory.
+    The files can also be saved in any of the other output formats (see file_utilities.OUTPUT_FORMATS).
 
     Args:
         directory (str): The directory path where the files are located.
@@ -145,10 +147,10 @@ def read_first_geojson_file(
         filenames = [filenames]
     # Loop over the filenames
     for filename in filenames:
-        filepath = os.path.join(directory, filename)
+        filepath = file_utilities.find_geodata_file(os.path.join(directory, filename))
 
         # If the file exists, read it and return the GeoDataFrame
-        if os.path.exists(filepath):
+        if filepath is not None:
             return geodata_processing.read_gpd_file(filepath)
 
     # If none of the files exist, raise an exception
@@ -343,7 +345,7 @@ def read_geojson_files(
     """Read GeoJSON files into GeoDataFrames and return a list."""
     gdfs = []
     for path in filepaths:
-        gdf = gpd.read_file(path)
+        gdf = geodata_processing.read_gpd_file(path)
         if crs:
             gdf = gdf.to_crs(crs)
         print(f"Read {len(gdf)} features from {path}")
@@ -464,7 +466,9 @@ def merge_geojson_files(session_locations, dest, crs=None):
 
     """
     filepaths = [
-        os.path.join(location, "config_gdf.geojson") for location in session_locations
+        file_utilities.find_geodata_file(os.path.join(location, "config_gdf.geojson"))
+        or os.path.join(location, "config_gdf.geojson")
+        for location in session_locations
     ]
     gdfs = read_geojson_files(filepaths, crs=crs)
     merged_gdf = gpd.GeoDataFrame(concatenate_gdfs(gdfs), geometry="geometry")
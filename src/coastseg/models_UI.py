@@ -757,6 +757,8 @@ def format_as_html(settings: dict):
     <p>dist_clouds: {settings.get("dist_clouds", "unknown")}</p>
     <p>output_epsg: {settings.get("output_epsg", "unknown")}</p>
     <p>save_figure: {settings.get("save_figure", "unknown")}</p>
+    <p>figure_mode: {settings.get("figure_mode", "unknown")}</p>
+    <p>output_format: {settings.get("output_format", "unknown")}</p>
     <p>min_beach_area: {settings.get("min_beach_area", "unknown")}</p>
     <p>min_length_sl: {settings.get("min_length_sl", "unknown")}</p>
     <p>cloud_mask_issue: {settings.get("cloud_mask_issue", "unknown")}</p>
@@ -8,11 +8,11 @@ from typing import Any, Dict, List, Optional, Callable
 from coastseg import exception_handler
 from coastseg.exceptions import DownloadError
 from coastseg.common import (
-    download_url,
     preprocess_geodataframe,
     create_unique_ids,
 )
 from coastseg.common import validate_geometry_types
+from coastseg.downloads import download_url_to_file
 from coastseg.feature import Feature
 
 # External dependencies imports
@@ -36,7 +36,7 @@ class ShorelineServices:
         preprocess_service=None,
         create_unique_ids_service=None,
     ):
-        self.download_service = download_service or download_url
+        self.download_service = download_service or download_url_to_file
         self.preprocess_service = preprocess_service or preprocess_geodataframe
         self.create_ids_service = create_unique_ids_service or create_unique_ids
 
@@ -55,7 +55,7 @@ class Shoreline(Feature):
         services: ShorelineServices = None,
         download_location: str = None,
     ):
-        # function to download shoreline files by default use download_url
+        # function to download shoreline files by default use download_url_to_file
         services = services or ShorelineServices()
         self.download_service = services.download_service
         self.preprocess_service = services.preprocess_service
@@ -399,10 +399,13 @@ class Shoreline(Feature):
         self, filename: str, save_location: str, dataset_id: str = "7814755"
     ):
         """Downloads the shoreline file from zenodo
+        An interrupted download resumes from where it stopped the next time the file is downloaded.
         Args:
             filename (str): name of file to download
             save_location (str): full path to location to save the downloaded shoreline file
             dataset_id (str, optional): zenodo id of file. Defaults to '7814755'.
+        Raises:
+            DownloadError: if the file could not be downloaded
         """
 
         # Construct the download URL
@@ -411,7 +414,13 @@ class Shoreline(Feature):
 
         # Download shorelines from Zenodo
         logger.info(f"Retrieving file: {save_location} from {url}")
-        self.download_service(url, save_location, filename=filename)
+        try:
+            self.download_service(url, save_location, filename=filename)
+        except DownloadError:
+            raise
+        except Exception as e:
+            logger.error(f"Shoreline {filename} failed to download from {url}. {e}")
+            raise DownloadError(filename) from e
 
 
 # helper functions
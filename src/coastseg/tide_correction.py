@@ -1,11 +1,14 @@
 # Standard library imports
+import concurrent.futures
 import os
 import logging
 import pathlib
+import tempfile
 from pathlib import Path
 from typing import Collection, Dict, Tuple, Union
 
 from coastseg import file_utilities
+from coastseg import geodata_processing
 from coastseg.file_utilities import progress_bar_context
 from coastseg.common import merge_dataframes, convert_transect_ids_to_rows,get_seaward_points_gdf,add_lat_lon_to_timeseries
 from coastseg import core_utilities
@@ -25,24 +28,31 @@ import pyTMD.utilities
 # Logger setup
 logger = logging.getLogger(__name__)
 
+# number of decimal places the longitudes and latitudes are rounded to in the tide constituents cache (about 0.1m)
+CONSTITUENTS_CACHE_DECIMALS = 6
+
 
 def compute_tidal_corrections(
-    session_name, roi_ids: Collection, beach_slope: float, reference_elevation: float,only_keep_points_on_transects:bool=False
+    session_name, roi_ids: Collection, beach_slope: float, reference_elevation: float,only_keep_points_on_transects:bool=False,
+    max_workers: int = 1,
 ):
     logger.info(
         f"Computing tides for ROIs {roi_ids} beach_slope: {beach_slope} reference_elevation: {reference_elevation}"
     )
     try:
-        correct_all_tides(
+        failed_rois = correct_all_tides(
             roi_ids,
             session_name,
             reference_elevation,
             beach_slope,
             only_keep_points_on_transects=only_keep_points_on_transects,
+            max_workers=max_workers,
         )
     except Exception as e:
         print(f"Tide Model Not Found Error \n {e}")
     else:
+        if failed_rois:
+            print(f"\nTidal corrections failed for ROIs: {list(failed_rois.keys())}")
         print("\ntidal corrections completed")
 
 def correct_all_tides(
@@ -52,19 +62,27 @@ def correct_all_tides(
     beach_slope: float,
     only_keep_points_on_transects:bool=False,
     use_progress_bar: bool = True,
-):
+    max_workers: int = 1,
+) -> Dict[str, str]:
     """
     Corrects the tides for all regions of interest (ROIs).
 
     This function validates the existence of a tide model, loads the regions the tide model was clipped to from a geojson file,
     and corrects the tides for each ROI. It logs the progress and updates a progress bar if use_progress_bar is True.
 
+    If max_workers is greater than 1 the ROIs are tidally corrected at the same time in a pool of processes.
+    In this mode an error while correcting one ROI is logged and the remaining ROIs are still corrected.
+
     Args:
         roi_ids (Collection): The IDs of the ROIs to correct the tides for.
         session_name (str): The name of the session containing the extracted shorelines.
         reference_elevation (float): The reference elevation to use for the tide correction.
         beach_slope (float): The beach slope to use for the tide correction.
         use_progress_bar (bool, optional): Whether to display a progress bar. Defaults to True.
+        max_workers (int, optional): The number of processes used to correct the ROIs. Defaults to 1 which corrects the ROIs one at a time.
+
+    Returns:
+        Dict[str, str]: The ROI IDs that could not be tidally corrected mapped to the error. Always empty when max_workers is 1.
     """
     # validate tide model exists at CoastSeg/tide_model
     model_location = get_tide_model_location()
@@ -72,6 +90,19 @@ def correct_all_tides(
     tide_regions_file = file_utilities.load_package_resource(
         "tide_model", "tide_regions_map.geojson"
     )
+    if max_workers > 1 and len(roi_ids) > 1:
+        return correct_all_tides_in_parallel(
+            roi_ids,
+            session_name,
+            reference_elevation,
+            beach_slope,
+            model_location,
+            tide_regions_file,
+            only_keep_points_on_transects=only_keep_points_on_transects,
+            use_progress_bar=use_progress_bar,
+            max_workers=max_workers,
+        )
+
     with progress_bar_context(
         use_progress_bar,
         total=len(roi_ids),
@@ -90,6 +121,75 @@ def correct_all_tides(
             )
             logger.info(f"{roi_id} was tidally corrected")
             update(f"{roi_id} was tidally corrected")
+    return {}
+
+
+def correct_all_tides_in_parallel(
+    roi_ids: Collection,
+    session_name: str,
+    reference_elevation: float,
+    beach_slope: float,
+    model_location: str,
+    tide_regions_file: str,
+    only_keep_points_on_transects: bool = False,
+    use_progress_bar: bool = True,
+    max_workers: int = 2,
+) -> Dict[str, str]:
+    """
+    Corrects the tides for each ROI in a separate process with at most max_workers processes running at once.
+
+    A single progress bar is updated as each ROI finishes. If an ROI fails to be tidally corrected the error is
+    logged and the other ROIs are still corrected.
+
+    Args:
+        roi_ids (Collection): The IDs of the ROIs to correct the tides for.
+        session_name (str): The name of the session containing the extracted shorelines.
+        reference_elevation (float): The reference elevation to use for the tide correction.
+        beach_slope (float): The beach slope to use for the tide correction.
+        model_location (str): Path to the tide model.
+        tide_regions_file (str): Path to the file containing the regions the tide model was clipped to.
+        only_keep_points_on_transects (bool, optional): If True, keeps only the shoreline points that are on the transects. Defaults to False.
+        use_progress_bar (bool, optional): Whether to display a progress bar. Defaults to True.
+        max_workers (int, optional): The maximum number of processes to use. Defaults to 2.
+
+    Returns:
+        Dict[str, str]: The ROI IDs that could not be tidally corrected mapped to the error.
+    """
+    failed_rois = {}
+    with progress_bar_context(
+        use_progress_bar,
+        total=len(roi_ids),
+        description=f"Correcting Tides for {len(roi_ids)} ROIs",
+    ) as update:
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=min(max_workers, len(roi_ids))
+        ) as executor:
+            futures = {
+                executor.submit(
+                    correct_tides,
+                    roi_id,
+                    session_name,
+                    reference_elevation,
+                    beach_slope,
+                    model_location,
+                    tide_regions_file,
+                    only_keep_points_on_transects=only_keep_points_on_transects,
+                    use_progress_bar=False,
+                ): roi_id
+                for roi_id in roi_ids
+            }
+            for future in concurrent.futures.as_completed(futures):
+                roi_id = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.error(f"{roi_id} could not be tidally corrected: {e}")
+                    failed_rois[roi_id] = str(e)
+                    update(f"{roi_id} could not be tidally corrected")
+                else:
+                    logger.info(f"{roi_id} was tidally corrected")
+                    update(f"{roi_id} was tidally corrected")
+    return failed_rois
 
 
 def save_transect_settings(
@@ -246,7 +346,9 @@ def correct_tides(
         tide_corrected_timeseries_merged_df,timeseries_df  = add_lat_lon_to_timeseries(tide_corrected_timeseries_df, transects_gdf.to_crs('epsg:4326'),pivot_df,
                                 session_path,
                                 only_keep_points_on_transects,
-                                'tidally_corrected')
+                                'tidally_corrected',
+                                # save in the same format as the rest of the session
+                                file_utilities.get_session_output_format(session_path))
         
         # Save the Tidally corrected time series
         timeseries_df.to_csv(os.path.join(session_path, 'tidally_corrected_transect_time_series.csv'),index=False)
@@ -302,11 +404,15 @@ def get_transects(roi_id: str, session_name: str):
     roi_location = file_utilities.find_matching_directory_by_id(session_path, roi_id)
     if roi_location is not None:
         session_path = roi_location
-    # locate the config_gdf.geojson containing the transects
-    config_path = file_utilities.find_file_by_regex(
-        session_path, r"^config_gdf\.geojson$"
+    # locate the config_gdf containing the transects, it may have been saved in any of the output formats
+    config_path = file_utilities.find_geodata_file(
+        os.path.join(session_path, "config_gdf.geojson")
     )
-    # Load the GeoJSON file containing transect data
+    if config_path is None:
+        raise FileNotFoundError(
+            f"No config_gdf file was found in {session_path}"
+        )
+    # Load the file containing transect data
     transects_gdf = read_and_filter_geojson(config_path)
     # get only the transects that intersect with this ROI
     # this may not be necessary because these should have NaN values
@@ -329,6 +435,7 @@ def setup_tide_model_config(model_path: str) -> dict:
         "CUTOFF": 10,
         "METHOD": "bilinear",
         "REGION_DIRECTORY": os.path.join(model_path, "region"),
+        "USE_CACHE": True,
     }
 
 
@@ -506,6 +613,10 @@ def predict_tides_for_df(
     """
     Predict tides for a points in the DataFrame.
 
+    The points are grouped by their "region_id" so the tide constituents for each region of the
+    tide model are read once for all the points in that region, then the tides for every point and
+    date are predicted together.
+
     Parameters:
     - seaward_points_gdf: A GeoDataFrame containing seaward points for each transect
     - timeseries_df: A DataFrame containing time series data for each transect. A DataFrame containing time series data for the transects
@@ -518,26 +629,434 @@ def predict_tides_for_df(
     Contains columns dates,x,y,tide,transect_id
     """
     region_directory = config["REGION_DIRECTORY"]
-    # Apply the get_tide_predictions over each row and collect results in a list
-    all_tides = seaward_points_gdf.apply(
-        lambda row: get_tide_predictions(row.geometry.x,
-                                         row.geometry.y,
-                                         timeseries_df,
-                                         f"{region_directory}{row['region_id']}",
-                                         row["transect_id"]), axis=1
-    )
-    # Filter out None values
-    all_tides = all_tides.dropna()
+    if seaward_points_gdf["region_id"].isna().any():
+        missing_ids = seaward_points_gdf.loc[
+            seaward_points_gdf["region_id"].isna(), "transect_id"
+        ].tolist()
+        logger.warning(
+            f"Transects {missing_ids} are not within any of the tide model regions. Tides will not be predicted for them."
+        )
+
+    all_tides = []
+    for region_id, region_points_gdf in seaward_points_gdf.groupby("region_id"):
+        tides_df = model_tides_for_transects(
+            region_points_gdf.geometry.x.to_numpy(),
+            region_points_gdf.geometry.y.to_numpy(),
+            region_points_gdf["transect_id"].to_numpy(),
+            timeseries_df,
+            directory=f"{region_directory}{int(region_id)}",
+            model=config.get("MODEL", "FES2014"),
+            method=config.get("METHOD", "bilinear"),
+            extrapolate=config.get("EXTRAPOLATE", True),
+            cutoff=config.get("CUTOFF", 10.0),
+            use_cache=config.get("USE_CACHE", True),
+        )
+        if not tides_df.empty:
+            all_tides.append(tides_df)
     # if no tides are predicted return an empty dataframe
-    if all_tides.empty:
+    if not all_tides:
         return pd.DataFrame(columns=["dates", "x", "y", "tide", "transect_id"])
-    
+
     # Concatenate all the results
-    all_tides_df = pd.concat(all_tides.tolist())
+    all_tides_df = pd.concat(all_tides, ignore_index=True)
 
     return all_tides_df
 
 
+def load_tide_model(directory: Union[str, pathlib.Path], model: str = "FES2014"):
+    """
+    Load the pyTMD model definition for the tide model stored in the directory.
+
+    Args:
+        directory (str or pathlib.Path): The directory containing the tide model data files.
+            ex. "C:/development/doodleverse/CoastSeg/tide_model/region0"
+        model (str, optional): The name of the tide model. Defaults to "FES2014".
+
+    Returns:
+        pyTMD.io.model: The model definition for the tide elevations.
+
+    Raises:
+        FileNotFoundError: If the directory does not exist.
+    """
+    # Check tide directory is accessible
+    if directory is not None:
+        directory = pathlib.Path(directory).expanduser()
+        if not directory.exists():
+            raise FileNotFoundError("Invalid tide directory")
+
+    # Get parameters for tide model; use custom definition file for
+    return pyTMD.io.model(directory, format="netcdf", compressed=False).elevation(
+        model
+    )
+
+
+def get_constituents_cache_path(
+    directory: Union[str, pathlib.Path],
+    model: str = "FES2014",
+    method: str = "bilinear",
+    extrapolate: bool = True,
+    cutoff: float = 10.0,
+) -> str:
+    """
+    Get the path to the file that caches the tidal constituents interpolated from the tide model region in the directory.
+    There is one cache file for each combination of model, interpolation method, extrapolate and cutoff.
+
+    Args:
+        directory (str or pathlib.Path): The directory containing the tide model data files.
+            ex. "C:/development/doodleverse/CoastSeg/tide_model/region0"
+        model (str, optional): The name of the tide model. Defaults to "FES2014".
+        method (str, optional): Method used to interpolate the tidal constituents. Defaults to "bilinear".
+        extrapolate (bool, optional): Whether tides were extrapolated for locations outside of the model domain. Defaults to True.
+        cutoff (float, optional): Extrapolation cutoff in kilometers. Defaults to 10.0.
+
+    Returns:
+        str: The path to the cache file. ex. "tide_model/region0/constituents_FES2014_bilinear_extrapolate_cutoff_10.0.npz"
+    """
+    extrapolate_name = "extrapolate" if extrapolate else "no_extrapolate"
+    filename = f"constituents_{model}_{method}_{extrapolate_name}_cutoff_{float(cutoff)}.npz"
+    return os.path.join(directory, filename)
+
+
+def get_constituents_cache_keys(lon: np.ndarray, lat: np.ndarray) -> list:
+    """
+    Round the longitudes and latitudes to CONSTITUENTS_CACHE_DECIMALS decimal places
+    so they can be used to look up points in the constituents cache.
+
+    Returns:
+        list: A list of (lon, lat) tuples.
+    """
+    lon = np.round(np.asarray(lon, dtype=float), CONSTITUENTS_CACHE_DECIMALS)
+    lat = np.round(np.asarray(lat, dtype=float), CONSTITUENTS_CACHE_DECIMALS)
+    return list(zip(lon.tolist(), lat.tolist()))
+
+
+def read_constituents_cache(
+    cache_path: str, lon: np.ndarray, lat: np.ndarray, constituents: list
+) -> Tuple[np.ma.MaskedArray, np.ndarray]:
+    """
+    Read the cached tidal constituents for each point.
+
+    Args:
+        cache_path (str): The path to the constituents cache file.
+        lon (np.ndarray): The longitudes of the points.
+        lat (np.ndarray): The latitudes of the points.
+        constituents (list): The names of the constituents of the tide model. The cache is ignored if it contains different constituents.
+
+    Returns:
+        Tuple[np.ma.MaskedArray, np.ndarray]:
+            - the complex harmonic constants with shape (number of points, number of constituents). Points not in the cache are masked.
+            - a boolean array that is True for each point that was found in the cache
+    """
+    hc = np.ma.zeros((len(lon), len(constituents)), dtype=complex)
+    hc.mask = np.ones(hc.shape, dtype=bool)
+    found = np.zeros(len(lon), dtype=bool)
+    if not os.path.exists(cache_path):
+        return hc, found
+    try:
+        with np.load(cache_path, allow_pickle=False) as cache:
+            if cache["constituents"].tolist() != list(constituents):
+                logger.warning(
+                    f"Ignoring the constituents cache {cache_path} because it was made with different constituents"
+                )
+                return hc, found
+            cache_index = {
+                key: index
+                for index, key in enumerate(
+                    zip(cache["lon"].tolist(), cache["lat"].tolist())
+                )
+            }
+            rows = [
+                cache_index.get(key, -1) for key in get_constituents_cache_keys(lon, lat)
+            ]
+            rows = np.array(rows, dtype=int)
+            found = rows >= 0
+            hc[found] = np.ma.array(
+                cache["hc"][rows[found]], mask=cache["mask"][rows[found]]
+            )
+    except (OSError, KeyError, ValueError) as e:
+        logger.warning(f"Could not read the constituents cache {cache_path}: {e}")
+        found = np.zeros(len(lon), dtype=bool)
+    return hc, found
+
+
+def update_constituents_cache(
+    cache_path: str,
+    lon: np.ndarray,
+    lat: np.ndarray,
+    hc: np.ma.MaskedArray,
+    constituents: list,
+) -> None:
+    """
+    Add the tidal constituents of the points to the constituents cache.
+
+    The cache is written to a temporary file that then replaces the cache file so
+    that the cache is never left partially written.
+
+    Args:
+        cache_path (str): The path to the constituents cache file.
+        lon (np.ndarray): The longitudes of the points.
+        lat (np.ndarray): The latitudes of the points.
+        hc (np.ma.MaskedArray): The complex harmonic constants of each point with shape (number of points, number of constituents).
+        constituents (list): The names of the constituents.
+    """
+    keys = get_constituents_cache_keys(lon, lat)
+    new_lon = np.array([key[0] for key in keys], dtype=float)
+    new_lat = np.array([key[1] for key in keys], dtype=float)
+    new_hc = np.ma.getdata(hc).astype(complex)
+    new_mask = np.ma.getmaskarray(hc)
+
+    try:
+        if os.path.exists(cache_path):
+            with np.load(cache_path, allow_pickle=False) as cache:
+                if cache["constituents"].tolist() == list(constituents):
+                    cached_keys = set(
+                        zip(cache["lon"].tolist(), cache["lat"].tolist())
+                    )
+                    is_new = np.array([key not in cached_keys for key in keys], dtype=bool)
+                    new_lon = np.concatenate([cache["lon"], new_lon[is_new]])
+                    new_lat = np.concatenate([cache["lat"], new_lat[is_new]])
+                    new_hc = np.concatenate([cache["hc"], new_hc[is_new]])
+                    new_mask = np.concatenate([cache["mask"], new_mask[is_new]])
+
+        with tempfile.NamedTemporaryFile(
+            dir=os.path.dirname(cache_path), suffix=".npz", delete=False
+        ) as temp_file:
+            np.savez_compressed(
+                temp_file,
+                lon=new_lon,
+                lat=new_lat,
+                hc=new_hc,
+                mask=new_mask,
+                constituents=np.array(constituents, dtype=str),
+            )
+        os.replace(temp_file.name, cache_path)
+    except (OSError, KeyError, ValueError) as e:
+        logger.warning(f"Could not update the constituents cache {cache_path}: {e}")
+
+
+def get_tide_constituents(
+    lon: np.ndarray,
+    lat: np.ndarray,
+    directory: Union[str, pathlib.Path],
+    model: str = "FES2014",
+    method: str = "bilinear",
+    extrapolate: bool = True,
+    cutoff: float = 10.0,
+    use_cache: bool = True,
+) -> Tuple[np.ma.MaskedArray, list, str]:
+    """
+    Read the tide model once and interpolate the tidal constituents to every point.
+
+    If use_cache is True the constituents are first read from the constituents cache in the directory
+    and only the points missing from the cache are interpolated from the tide model files. The newly
+    interpolated constituents are then added to the cache.
+
+    Args:
+        lon (np.ndarray): The longitudes of the points.
+        lat (np.ndarray): The latitudes of the points.
+        directory (str or pathlib.Path): The directory containing the tide model data files.
+        model (str, optional): The name of the tide model. Defaults to "FES2014".
+        method (str, optional): Method used to interpolate the tidal constituents. Defaults to "bilinear".
+        extrapolate (bool, optional): Whether to extrapolate tides for locations outside of the model domain. Defaults to True.
+        cutoff (float, optional): Extrapolation cutoff in kilometers. Defaults to 10.0.
+        use_cache (bool, optional): Whether to read and update the constituents cache. Defaults to True.
+
+    Returns:
+        Tuple[np.ma.MaskedArray, list, str]:
+            - the complex harmonic constants with shape (number of points, number of constituents)
+            - the names of the constituents
+            - the model format used to apply the nodal corrections (ex. "FES")
+
+    Raises:
+        ValueError: If the tide model is not a FES model.
+    """
+    # Validate input arguments
+    assert method in ("bilinear", "spline", "linear", "nearest")
+
+    tide_model = load_tide_model(directory, model)
+    if tide_model.format != "FES":
+        raise ValueError(
+            f"Unsupported tide model format '{tide_model.format}'. Only FES models are supported."
+        )
+
+    lon = np.atleast_1d(lon)
+    lat = np.atleast_1d(lat)
+    constituents = tide_model.constituents
+    if use_cache:
+        cache_path = get_constituents_cache_path(
+            directory, model, method, extrapolate, cutoff
+        )
+        hc, found = read_constituents_cache(cache_path, lon, lat, constituents)
+    else:
+        hc = np.ma.zeros((len(lon), len(constituents)), dtype=complex)
+        found = np.zeros(len(lon), dtype=bool)
+
+    if found.all():
+        logger.info(f"Read the tide constituents for {len(lon)} points from the cache")
+        return hc, constituents, tide_model.format
+
+    missing = ~found
+    amp, ph = pyTMD.io.FES.extract_constants(
+        lon[missing],
+        lat[missing],
+        tide_model.model_file,
+        type=tide_model.type,
+        version=tide_model.version,
+        method=method,
+        extrapolate=extrapolate,
+        cutoff=cutoff,
+        scale=tide_model.scale,
+        compressed=tide_model.compressed,
+    )
+    # Calculate complex phase in radians for Euler's
+    cph = -1j * ph * np.pi / 180.0
+    # Calculate constituent oscillation
+    missing_hc = np.ma.asarray(amp * np.exp(cph))
+    hc[missing] = missing_hc
+    if use_cache:
+        update_constituents_cache(
+            cache_path, lon[missing], lat[missing], missing_hc, constituents
+        )
+    return hc, constituents, tide_model.format
+
+
+def predict_tide_heights(
+    t: np.ndarray,
+    hc: np.ma.MaskedArray,
+    constituents: list,
+    deltat: np.ndarray,
+    corrections: str = "FES",
+) -> np.ma.MaskedArray:
+    """
+    Predict the tide heights from the harmonic constants. Each row of hc is the harmonic constants
+    of the point the tide is predicted for at the time in the same position in t.
+
+    Args:
+        t (np.ndarray): The times in days since 1992-01-01T00:00:00.
+        hc (np.ma.MaskedArray): The complex harmonic constants with shape (len(t), number of constituents).
+        constituents (list): The names of the constituents.
+        deltat (np.ndarray): The difference between dynamical time and universal time for each time in t.
+        corrections (str, optional): The model format used to apply the nodal corrections. Defaults to "FES".
+
+    Returns:
+        np.ma.MaskedArray: The tide heights. Invalid values are set to NaN.
+    """
+    # Predict tidal elevations at time and infer minor corrections
+    npts = len(t)
+    tide = np.ma.zeros((npts), fill_value=np.nan)
+    tide.mask = np.any(hc.mask, axis=1)
+
+    # Predict tides
+    tide.data[:] = pyTMD.predict.drift(
+        t, hc, constituents, deltat=deltat, corrections=corrections
+    )
+    minor = pyTMD.predict.infer_minor(
+        t, hc, constituents, deltat=deltat, corrections=corrections
+    )
+    tide.data[:] += minor.data[:]
+
+    # Replace invalid values with fill value
+    tide.data[tide.mask] = tide.fill_value
+    return tide
+
+
+def model_tides_for_transects(
+    x: np.ndarray,
+    y: np.ndarray,
+    transect_ids: np.ndarray,
+    timeseries_df: pd.DataFrame,
+    directory: Union[str, pathlib.Path],
+    model: str = "FES2014",
+    method: str = "bilinear",
+    extrapolate: bool = True,
+    cutoff: float = 10.0,
+    chunk_size: int = 100_000,
+    use_cache: bool = True,
+) -> pd.DataFrame:
+    """
+    Predict the tides at the seaward point of each transect for every date the transect has a
+    shoreline position in the timeseries.
+
+    The tide model is read once for all the points and the tides for all the points and dates are
+    predicted together. This returns the same tides as calling get_tide_predictions for each transect.
+
+    Args:
+        x (np.ndarray): The longitudes of the seaward point of each transect.
+        y (np.ndarray): The latitudes of the seaward point of each transect.
+        transect_ids (np.ndarray): The ID of each transect. Transects that are not columns in the timeseries_df are skipped.
+        timeseries_df (pd.DataFrame): A DataFrame containing the dates column and a column for each transect.
+        directory (str or pathlib.Path): The path to the FES 2014 model region that will be used to compute the tide predictions
+            ex."C:/development/doodleverse/CoastSeg/tide_model/region0"
+        model (str, optional): The name of the tide model. Defaults to "FES2014".
+        method (str, optional): Method used to interpolate the tidal constituents. Defaults to "bilinear".
+        extrapolate (bool, optional): Whether to extrapolate tides for locations outside of the model domain. Defaults to True.
+        cutoff (float, optional): Extrapolation cutoff in kilometers. Defaults to 10.0.
+        chunk_size (int, optional): The maximum number of tides to predict at once. Limits the memory used for large timeseries. Defaults to 100,000.
+        use_cache (bool, optional): Whether to read the tide constituents from the constituents cache in the directory. Defaults to True.
+
+    Returns:
+        pd.DataFrame: A DataFrame containing the columns dates,x,y,tide,transect_id
+    """
+    columns = ["dates", "x", "y", "tide", "transect_id"]
+    x = np.atleast_1d(x)
+    y = np.atleast_1d(y)
+    transect_ids = np.atleast_1d(transect_ids)
+    # skip the transects without any time series data
+    in_timeseries = np.array(
+        [transect_id in timeseries_df.columns for transect_id in transect_ids], dtype=bool
+    )
+    x, y, transect_ids = x[in_timeseries], y[in_timeseries], transect_ids[in_timeseries]
+    if len(transect_ids) == 0:
+        return pd.DataFrame(columns=columns)
+
+    timeseries_df = timeseries_df[timeseries_df["dates"].notna()]
+    time = timeseries_df["dates"].values
+    # each row is a transect and each column is a date. True where the transect has a shoreline position on that date
+    has_value = timeseries_df[list(transect_ids)].notna().to_numpy().T
+    point_index, time_index = np.nonzero(has_value)
+    if len(point_index) == 0:
+        return pd.DataFrame(columns=columns)
+
+    # Convert the datetimes once for all the points
+    timescale = pyTMD.time.timescale().from_datetime(time.flatten())
+    deltat = np.atleast_1d(timescale.tt_ut1)
+    t = np.atleast_1d(timescale.tide)
+
+    hc, constituents, corrections = get_tide_constituents(
+        x,
+        y,
+        directory,
+        model=model,
+        method=method,
+        extrapolate=extrapolate,
+        cutoff=cutoff,
+        use_cache=use_cache,
+    )
+
+    tide = np.empty(len(point_index), dtype=float)
+    for start in range(0, len(point_index), chunk_size):
+        end = start + chunk_size
+        tide[start:end] = predict_tide_heights(
+            t[time_index[start:end]],
+            hc[point_index[start:end]],
+            constituents,
+            deltat[time_index[start:end]],
+            corrections=corrections,
+        ).data
+
+    df = pd.DataFrame(
+        {
+            "dates": time[time_index],
+            "x": x[point_index],
+            "y": y[point_index],
+            "tide": tide,
+            "transect_id": transect_ids[point_index],
+        }
+    )
+    df["dates"] = pd.to_datetime(df["dates"], utc=True)
+    return df
+
+
 def model_tides(
     x,
     y,
@@ -549,6 +1068,7 @@ def model_tides(
     method="bilinear",
     extrapolate=True,
     cutoff=10.0,
+    use_cache=True,
 ):
     """
     Compute tides at points and times using tidal harmonics.
@@ -622,25 +1142,15 @@ def model_tides(
     cutoff : int or float
         Extrapolation cutoff in kilometers. Set to `np.inf`
         to extrapolate for all points.
+    use_cache : bool
+        Whether to read the tidal constituents from the
+        constituents cache in the directory before reading
+        the tide model files. Defaults to True.
 
     Returns
     -------
     A pandas.DataFrame containing tide heights for all the xy points and their corresponding time
     """
-    # Check tide directory is accessible
-    if directory is not None:
-        directory = pathlib.Path(directory).expanduser()
-        if not directory.exists():
-            raise FileNotFoundError("Invalid tide directory")
-
-    # Validate input arguments
-    assert method in ("bilinear", "spline", "linear", "nearest")
-
-    # Get parameters for tide model; use custom definition file for
-    model = pyTMD.io.model(directory, format="netcdf", compressed=False).elevation(
-        model
-    )
-
     # If time passed as a single Timestamp, convert to datetime64
     if isinstance(time, pd.Timestamp):
         time = time.to_datetime64()
@@ -670,65 +1180,34 @@ def model_tides(
 
     # Convert datetime
     timescale = pyTMD.time.timescale().from_datetime(time.flatten())
-    n_points = len(x)
-    # number of time points
-    n_times = len(time)
-
-    if model.format == "FES":
-        amp, ph = pyTMD.io.FES.extract_constants(
-            lon,
-            lat,
-            model.model_file,
-            type=model.type,
-            version=model.version,
-            method=method,
-            extrapolate=extrapolate,
-            cutoff=cutoff,
-            scale=model.scale,
-            compressed=model.compressed,
-        )
-
-        # Available model constituents
-        c = model.constituents
-
-        # Delta time (TT - UT1)
-        # calculating the difference between Terrestrial Time (TT) and UT1 (Universal Time 1),
-        deltat = timescale.tt_ut1
 
-    # Calculate complex phase in radians for Euler's
-    cph = -1j * ph * np.pi / 180.0
+    hc, c, corrections = get_tide_constituents(
+        lon,
+        lat,
+        directory,
+        model=model,
+        method=method,
+        extrapolate=extrapolate,
+        cutoff=cutoff,
+        use_cache=use_cache,
+    )
 
-    # Calculate constituent oscillation
-    hc = amp * np.exp(cph)
+    # Delta time (TT - UT1)
+    # calculating the difference between Terrestrial Time (TT) and UT1 (Universal Time 1),
+    deltat = timescale.tt_ut1
 
     # Repeat constituents to length of time and number of input
     # coords before passing to `predict_tide_drift`
-
-    # deltat likely represents the time interval between successive data points or time instances.
     # t =  replicating the timescale.tide array n_points times
     # hc = creates an array with the tidal constituents repeated for each time instance
-    # Repeat constituents to length of time and number of input
-    # coords before passing to `predict_tide_drift`
     t, hc, deltat = (
         np.tile(timescale.tide, n_points),
         hc.repeat(n_times, axis=0),
         np.tile(deltat, n_points),
     )
 
-    # Predict tidal elevations at time and infer minor corrections
-    npts = len(t)
-    tide = np.ma.zeros((npts), fill_value=np.nan)
-    tide.mask = np.any(hc.mask, axis=1)
-
-    # Predict tides
-    tide.data[:] = pyTMD.predict.drift(
-        t, hc, c, deltat=deltat, corrections=model.format
-    )
-    minor = pyTMD.predict.infer_minor(t, hc, c, deltat=deltat, corrections=model.format)
-    tide.data[:] += minor.data[:]
+    tide = predict_tide_heights(t, hc, c, deltat, corrections=corrections)
 
-    # Replace invalid values with fill value
-    tide.data[tide.mask] = tide.fill_value
     if transect_id:
         df = pd.DataFrame(
             {
@@ -763,6 +1242,7 @@ def read_and_filter_geojson(
 ) -> gpd.GeoDataFrame:
     """
     Read and filter a GeoJSON file based on specified columns and feature type.
+    Files saved in any of the other output formats (ex. config_gdf.parquet) can also be read.
 
     Parameters:
     - file_path: Path to the GeoJSON file.
@@ -773,7 +1253,7 @@ def read_and_filter_geojson(
     - gpd.GeoDataFrame: A filtered GeoDataFrame.
     """
     # Read the GeoJSON file into a GeoDataFrame
-    gdf = gpd.read_file(file_path)
+    gdf = geodata_processing.read_gpd_file(file_path)
     # Drop all other columns in place
     gdf.drop(
         columns=[col for col in gdf.columns if col not in columns_to_keep], inplace=True
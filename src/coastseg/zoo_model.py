@@ -7,8 +7,11 @@ import asyncio
 import platform
 import json
 import logging
+import concurrent.futures
+import threading
+from collections import OrderedDict, deque
 from itertools import islice
-from typing import List, Set, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
 from coastseg import common
 from coastseg import downloads
@@ -17,21 +20,22 @@ from coastseg import extracted_shoreline
 from coastseg import geodata_processing
 from coastseg import file_utilities
 from coastseg import core_utilities
+from coastseg import image_utilities
 
 import geopandas as gpd
 from osgeo import gdal
 import skimage
-import aiohttp
 import tqdm
 from PIL import Image
 import numpy as np
 from glob import glob
-import tqdm.asyncio
 import nest_asyncio
 
-from skimage.io import imread
 from tensorflow.keras import mixed_precision
-from doodleverse_utils.prediction_imports import do_seg
+from doodleverse_utils.prediction_imports import get_image
+from doodleverse_utils.imports import label_to_colors
+from skimage.filters import threshold_otsu
+from skimage.transform import resize
 from doodleverse_utils.model_imports import (
     simple_resunet,
     custom_resunet,
@@ -48,19 +52,111 @@ import tensorflow as tf
 
 logger = logging.getLogger(__name__)
 
+# the maximum number of workers run_in_parallel uses when the number of workers is not given
+MAX_DEFAULT_WORKERS = 4
 
-def filter_no_data_pixels(files: list[str], percent_no_data: float = 0.50) -> list[str]:
-    def percentage_of_black_pixels(img: "PIL.Image") -> float:
+
+# name of the file in each image directory that caches the fraction of black pixels in each image
+NO_DATA_CACHE_FILENAME = "no_data_cache.json"
+NO_DATA_CACHE_VERSION = 1
+
+
+def get_black_pixel_fraction(file: str, draft_scale: int = 8) -> float:
+    """
+    Returns the fraction of the pixels in the image that are black (every band is 0).
+
+    RGB jpgs are decoded at 1/draft_scale of their resolution with PIL's draft mode, which is much faster than
+    decoding the full image, so the fraction is an estimate. Other images are decoded at full resolution.
+
+    Args:
+        file (str): The path to the .jpg, .jpeg or .png image.
+        draft_scale (int, optional): How many times smaller the jpgs are decoded. 1 decodes the full image. Defaults to 8.
+
+    Returns:
+        float: The fraction of black pixels between 0 and 1.
+    """
+    with Image.open(file) as img:
+        if img.format == "JPEG" and img.mode == "RGB" and draft_scale > 1:
+            img.draft(
+                "RGB",
+                (max(1, img.size[0] // draft_scale), max(1, img.size[1] // draft_scale)),
+            )
+        img_array = np.array(img)
         # Calculate the total number of pixels in the image
         num_total_pixels = img.size[0] * img.size[1]
-        img_array = np.array(img)
-        # Count the number of black pixels in the image
-        black_pixels = np.count_nonzero(np.all(img_array == 0, axis=-1))
-        # Calculate the percentage of black pixels
-        percentage = (black_pixels / num_total_pixels) 
-        return percentage
+    # Count the number of black pixels in the image
+    black_pixels = np.count_nonzero(np.all(img_array == 0, axis=-1))
+    return black_pixels / num_total_pixels
 
-    valid_images = []
+
+def load_no_data_cache(directory: str) -> dict:
+    """
+    Loads the fraction of black pixels of the images in the directory cached by filter_no_data_pixels.
+
+    Args:
+        directory (str): The directory containing the images.
+
+    Returns:
+        dict: The "size", "mtime", "draft_scale" and "black_fraction" of each image keyed by its filename.
+        An empty dictionary is returned if the cache does not exist or cannot be read.
+    """
+    cache_path = os.path.join(directory, NO_DATA_CACHE_FILENAME)
+    if not os.path.isfile(cache_path):
+        return {}
+    try:
+        with open(cache_path, "r") as f:
+            cache = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not read the no data cache {cache_path}: {e}")
+        return {}
+    if not isinstance(cache, dict) or cache.get("version") != NO_DATA_CACHE_VERSION:
+        return {}
+    return cache.get("files", {})
+
+
+def save_no_data_cache(cache: dict, directory: str) -> None:
+    """
+    Saves the fraction of black pixels of the images in the directory. See load_no_data_cache.
+    The cache is written to a temporary file first so an interrupted write never leaves a partial cache.
+
+    Args:
+        cache (dict): The cached fraction of black pixels of each image keyed by its filename.
+        directory (str): The directory containing the images.
+    """
+    cache_path = os.path.join(directory, NO_DATA_CACHE_FILENAME)
+    temp_path = cache_path + ".tmp"
+    try:
+        with open(temp_path, "w") as f:
+            json.dump({"version": NO_DATA_CACHE_VERSION, "files": cache}, f)
+        os.replace(temp_path, cache_path)
+    except OSError as e:
+        logger.warning(f"Could not save the no data cache {cache_path}: {e}")
+
+
+def filter_no_data_pixels(
+    files: list[str],
+    percent_no_data: float = 0.50,
+    draft_scale: int = 8,
+    num_workers: int = None,
+    use_cache: bool = True,
+) -> list[str]:
+    """
+    Returns the .jpg, .jpeg and .png files whose fraction of black pixels is less than or equal to percent_no_data.
+
+    The images are screened in a pool of threads with get_black_pixel_fraction. The fraction of black pixels of each image
+    is cached in no_data_cache.json in the directory of the image along with the size and modification time of the image,
+    so only new or modified images are screened again.
+
+    Args:
+        files (list[str]): The paths to the images. If none of them are images they are all returned.
+        percent_no_data (float, optional): The maximum fraction of black pixels allowed in an image. Defaults to 0.50.
+        draft_scale (int, optional): How many times smaller the jpgs are decoded. 1 decodes the full image. Defaults to 8.
+        num_workers (int, optional): The maximum number of threads. Defaults to None which uses the number of CPUs up to MAX_DEFAULT_WORKERS.
+        use_cache (bool, optional): Whether to read and save the cached fractions of black pixels. Defaults to True.
+
+    Returns:
+        list[str]: The images with a fraction of black pixels less than or equal to percent_no_data.
+    """
 
     def has_image_files(file_list, extensions):
         return any(file.lower().endswith(extensions) for file in file_list)
@@ -73,14 +169,57 @@ def filter_no_data_pixels(files: list[str], percent_no_data: float = 0.50) -> li
         )
         return files
 
-    for file in files:
-        if file.endswith(".jpg") or file.endswith(".jpeg") or file.endswith(".png"):
-            img = Image.open(file)
-            percentage = percentage_of_black_pixels(img)
-            if percentage <= percent_no_data:
-                valid_images.append(file)
+    image_files = [file for file in files if file.endswith(extensions)]
+    caches = {}
+    black_fractions = {}
+    files_to_screen = []
+    for file in image_files:
+        directory, filename = os.path.split(file)
+        if directory not in caches:
+            caches[directory] = load_no_data_cache(directory) if use_cache else {}
+        stat = os.stat(file)
+        entry = caches[directory].get(filename)
+        if (
+            entry
+            and entry.get("size") == stat.st_size
+            and entry.get("mtime") == stat.st_mtime_ns
+            and entry.get("draft_scale") == draft_scale
+        ):
+            black_fractions[file] = entry["black_fraction"]
+        else:
+            files_to_screen.append(file)
+            caches[directory][filename] = {
+                "size": stat.st_size,
+                "mtime": stat.st_mtime_ns,
+                "draft_scale": draft_scale,
+            }
 
-    return valid_images
+    logger.info(
+        f"Screening {len(files_to_screen)} of {len(image_files)} images for no data pixels"
+    )
+    fractions = run_in_parallel(
+        get_black_pixel_fraction,
+        [(file, draft_scale) for file in files_to_screen],
+        num_workers,
+        scheduler="threads",
+        desc="Screening images for no data",
+    )
+    for file, black_fraction in zip(files_to_screen, fractions):
+        black_fractions[file] = black_fraction
+        directory, filename = os.path.split(file)
+        caches[directory][filename]["black_fraction"] = black_fraction
+
+    if use_cache and files_to_screen:
+        for directory, cache in caches.items():
+            # forget the images that no longer exist
+            cache = {
+                filename: entry
+                for filename, entry in cache.items()
+                if os.path.isfile(os.path.join(directory, filename))
+            }
+            save_no_data_cache(cache, directory)
+
+    return [file for file in image_files if black_fractions[file] <= percent_no_data]
 
 
 def get_files_to_download(
@@ -111,6 +250,23 @@ def get_files_to_download(
     return url_dict
 
 
+def get_file_checksums(available_files: List[dict], model_path: str) -> dict:
+    """Returns the checksum zenodo lists for each of the available files by the path the file is downloaded to.
+
+    Args:
+    - available_files: A list of dictionaries representing the metadata of available files, including the file key and checksum.
+    - model_path: A string representing the path to the directory where the files will be downloaded.
+
+    Returns:
+    A dictionary with file paths as keys and checksums as values ex. {file_path: "md5:2942bf..."}
+    """
+    return {
+        os.path.join(model_path, f["key"]): f["checksum"]
+        for f in available_files
+        if f.get("checksum")
+    }
+
+
 def check_if_files_exist(files_dict: dict) -> dict:
     """Checks if each file in a given dictionary of file paths and download links already exists in the local filesystem.
 
@@ -138,7 +294,12 @@ def get_zenodo_release(zenodo_id: str) -> dict:
     return response.json()
 
 
-def get_imagery_directory(img_type: str, RGB_path: str) -> str:
+def get_imagery_directory(
+    img_type: str,
+    RGB_path: str,
+    num_workers: int = None,
+    scheduler: str = "processes",
+) -> str:
     """
     Returns directory of the newly created imagery. Available imagery conversions:
 
@@ -158,6 +319,9 @@ def get_imagery_directory(img_type: str, RGB_path: str) -> str:
     Args:
         img_type (str): The type of imagery to generate. Available options: 'RGB', 'NDWI', 'MNDWI',or 'RGB+MNDWI+NDWI'
         RGB_path (str): The path to the RGB imagery directory.
+        num_workers (int, optional): The maximum number of workers converting the imagery. Defaults to None which uses
+            the number of CPUs up to MAX_DEFAULT_WORKERS.
+        scheduler (str, optional): Whether to convert the imagery in "processes" or "threads". Defaults to "processes".
 
     Returns:
         str: The path to the output directory for the specified imagery type.
@@ -168,20 +332,28 @@ def get_imagery_directory(img_type: str, RGB_path: str) -> str:
         output_path = RGB_path
     elif img_type == "RGB+MNDWI+NDWI":
         NIR_path = os.path.join(output_path, "NIR")
-        NDWI_path = RGB_to_infrared(RGB_path, NIR_path, output_path, "NDWI")
+        NDWI_path = RGB_to_infrared(
+            RGB_path, NIR_path, output_path, "NDWI", num_workers, scheduler
+        )
         SWIR_path = os.path.join(output_path, "SWIR")
-        MNDWI_path = RGB_to_infrared(RGB_path, SWIR_path, output_path, "MNDWI")
+        MNDWI_path = RGB_to_infrared(
+            RGB_path, SWIR_path, output_path, "MNDWI", num_workers, scheduler
+        )
         five_band_path = file_utilities.create_directory(output_path, "five_band")
         output_path = get_five_band_imagery(
-            RGB_path, MNDWI_path, NDWI_path, five_band_path
+            RGB_path, MNDWI_path, NDWI_path, five_band_path, num_workers, scheduler
         )
     # default filetype is NIR and if NDWI is selected else filetype to SWIR
     elif img_type == "NDWI":
         NIR_path = os.path.join(output_path, "NIR")
-        output_path = RGB_to_infrared(RGB_path, NIR_path, output_path, "NDWI")
+        output_path = RGB_to_infrared(
+            RGB_path, NIR_path, output_path, "NDWI", num_workers, scheduler
+        )
     elif img_type == "MNDWI":
         SWIR_path = os.path.join(output_path, "SWIR")
-        output_path = RGB_to_infrared(RGB_path, SWIR_path, output_path, "MNDWI")
+        output_path = RGB_to_infrared(
+            RGB_path, SWIR_path, output_path, "MNDWI", num_workers, scheduler
+        )
     else:
         raise ValueError(
             f"{img_type} not reconigzed as one of the valid types 'RGB', 'NDWI', 'MNDWI',or 'RGB+MNDWI+NDWI'"
@@ -189,9 +361,68 @@ def get_imagery_directory(img_type: str, RGB_path: str) -> str:
     return output_path
 
 
+def run_in_parallel(
+    func,
+    work_items: List[tuple],
+    num_workers: int = None,
+    scheduler: str = "processes",
+    desc: str = "",
+) -> list:
+    """
+    Calls func with the arguments in each of the work items in a pool of workers.
+    The work items are split into chunks so each process is sent several work items at once.
+
+    Args:
+        func: A function defined at the module level so it can be sent to other processes.
+        work_items (List[tuple]): The arguments of each call to func.
+        num_workers (int, optional): The maximum number of workers. Defaults to None which uses the number of CPUs
+            up to MAX_DEFAULT_WORKERS.
+        scheduler (str, optional): Whether to use "processes" or "threads". Defaults to "processes".
+        desc (str, optional): The description of the progress bar. Defaults to "".
+
+    Returns:
+        list: The values returned by func in the same order as the work items.
+    """
+    if not work_items:
+        return []
+    num_workers = num_workers or min(MAX_DEFAULT_WORKERS, os.cpu_count() or 1)
+    chunksize = max(1, len(work_items) // (num_workers * 4))
+    with extracted_shoreline.get_executor(
+        scheduler, min(num_workers, len(work_items))
+    ) as executor:
+        return list(
+            tqdm.auto.tqdm(
+                executor.map(func, *zip(*work_items), chunksize=chunksize),
+                total=len(work_items),
+                desc=desc,
+            )
+        )
+
+
 def get_five_band_imagery(
-    RGB_path: str, MNDWI_path: str, NDWI_path: str, output_path: str
+    RGB_path: str,
+    MNDWI_path: str,
+    NDWI_path: str,
+    output_path: str,
+    num_workers: int = None,
+    scheduler: str = "processes",
 ):
+    """
+    Stacks the RGB, MNDWI and NDWI images into five band npz files in output_path.
+
+    The images are stacked in a pool of workers. Npz files that are newer than their images are not made again.
+
+    Args:
+        RGB_path (str): The path to the directory of RGB images.
+        MNDWI_path (str): The path to the directory of MNDWI images.
+        NDWI_path (str): The path to the directory of NDWI images.
+        output_path (str): The path to the directory to save the npz files to.
+        num_workers (int, optional): The maximum number of workers. Defaults to None which uses the number of CPUs up to MAX_DEFAULT_WORKERS.
+        scheduler (str, optional): Whether to use "processes" or "threads". Defaults to "processes".
+
+    Returns:
+        str: The output path.
+    """
     paths = [RGB_path, MNDWI_path, NDWI_path]
     files = []
     for data_path in paths:
@@ -202,17 +433,8 @@ def get_five_band_imagery(
 
     # number of bands x number of samples
     files = np.vstack(files).T
-    # returns path to five band imagery
+    work_items = []
     for counter, file in enumerate(files):
-        im = []  # read all images into a list
-        for k in file:
-            im.append(imread(k))
-        datadict = {}
-        # create stack which takes care of different sized inputs
-        im = np.dstack(im)
-        datadict["arr_0"] = im.astype(np.uint8)
-        datadict["num_bands"] = im.shape[-1]
-        datadict["files"] = [file_name.split(os.sep)[-1] for file_name in file]
         ROOT_STRING = file[0].split(os.sep)[-1].split(".")[0]
         segfile = (
             output_path
@@ -222,8 +444,19 @@ def get_five_band_imagery(
             + str(counter)
             + ".npz"
         )
-        np.savez_compressed(segfile, **datadict)
-        del datadict, im
+        if not image_utilities.is_output_up_to_date(segfile, list(file)):
+            work_items.append((list(file), segfile))
+    logger.info(
+        f"{len(files) - len(work_items)} of {len(files)} five band files in {output_path} are up to date"
+    )
+    # returns path to five band imagery
+    run_in_parallel(
+        image_utilities.create_five_band_file,
+        work_items,
+        num_workers,
+        scheduler,
+        desc="Creating five band imagery",
+    )
     return output_path
 
 
@@ -343,7 +576,12 @@ def get_files(RGB_dir_path: str, img_dir_path: str) -> np.ndarray:
 
 
 def RGB_to_infrared(
-    RGB_path: str, infrared_path: str, output_path: str, output_type: str
+    RGB_path: str,
+    infrared_path: str,
+    output_path: str,
+    output_type: str,
+    num_workers: int = None,
+    scheduler: str = "processes",
 ) -> None:
     """Converts two directories of RGB and (NIR/SWIR) imagery to (NDWI/MNDWI) imagery in a directory named
      'NDWI' created at output_path.
@@ -352,11 +590,15 @@ def RGB_to_infrared(
      to generate NDWI imagery set infrared_path to full path of NIR images
      to generate MNDWI imagery set infrared_path to full path of SWIR images
 
+     The images are converted in a pool of workers. Images that are newer than their RGB and (NIR/SWIR) images are not converted again.
+
     Args:
         RGB_path (str): full path to directory containing RGB images
         infrared_path (str): full path to directory containing NIR or SWIR images
         output_path (str): full path to directory to create NDWI/MNDWI directory in
         output_type (str): 'MNDWI' or 'NDWI'
+        num_workers (int, optional): maximum number of workers. Defaults to None which uses the number of CPUs up to MAX_DEFAULT_WORKERS.
+        scheduler (str, optional): whether to use "processes" or "threads". Defaults to "processes".
     Based on code from doodleverse_utils by Daniel Buscombe
     source: https://github.com/Doodleverse/doodleverse_utils
     """
@@ -375,90 +617,31 @@ def RGB_to_infrared(
     if not os.path.exists(output_path):
         os.mkdir(output_path)
 
+    work_items = []
     for file in files:
-        # Read green band from RGB image and cast to float
-        green_band = skimage.io.imread(file[0])[:, :, 1].astype("float")
-        # Read infrared(SWIR or NIR) and cast to float
-        infrared = skimage.io.imread(file[1]).astype("float")
-        # Transform 0 to np.NAN
-        green_band[green_band == 0] = np.nan
-        infrared[infrared == 0] = np.nan
-        # Mask out NaNs
-        green_band = np.ma.filled(green_band)
-        infrared = np.ma.filled(infrared)
-
-        # ensure both matrices have equivalent size
-        if not np.shape(green_band) == np.shape(infrared):
-            gx, gy = np.shape(green_band)
-            nx, ny = np.shape(infrared)
-            # resize both matrices to have equivalent size
-            green_band = common.scale(
-                green_band, np.maximum(gx, nx), np.maximum(gy, ny)
-            )
-            infrared = common.scale(infrared, np.maximum(gx, nx), np.maximum(gy, ny))
-
-        # output_img(MNDWI/NDWI) imagery formula (Green - SWIR) / (Green + SWIR)
-        output_img = np.divide(infrared - green_band, infrared + green_band)
-        # Convert the NaNs to -1
-        output_img[np.isnan(output_img)] = -1
-        # Rescale to be between 0 - 255
-        output_img = common.rescale_array(output_img, 0, 255)
         # create new filenames by replacing image type(SWIR/NIR) with output_type
         if output_type.upper() == "MNDWI":
             new_filename = file[1].split(os.sep)[-1].replace("SWIR", output_type)
         if output_type.upper() == "NDWI":
             new_filename = file[1].split(os.sep)[-1].replace("NIR", output_type)
-
-        # save output_img(MNDWI/NDWI) as .jpg in output directory
-        skimage.io.imsave(
-            output_path + os.sep + new_filename,
-            output_img.astype("uint8"),
-            check_contrast=False,
-            quality=100,
-        )
-
+        output_file = output_path + os.sep + new_filename
+        if not image_utilities.is_output_up_to_date(output_file, list(file)):
+            work_items.append((file[0], file[1], output_file))
+    logger.info(
+        f"{len(files) - len(work_items)} of {len(files)} {output_type.upper()} images in {output_path} are up to date"
+    )
+    run_in_parallel(
+        image_utilities.create_infrared_index_image,
+        work_items,
+        num_workers,
+        scheduler,
+        desc=f"Creating {output_type.upper()} imagery",
+    )
     return output_path
 
 
-async def fetch(session, url: str, save_path: str):
-    model_name = url.split("/")[-1]
-    # chunk_size: int = 128
-    chunk_size: int = 2048
-    async with session.get(url, raise_for_status=True) as r:
-        content_length = r.headers.get("Content-Length")
-        if content_length is not None:
-            content_length = int(content_length)
-            with open(save_path, "wb") as fd:
-                with tqdm.auto.tqdm(
-                    total=content_length,
-                    unit="B",
-                    unit_scale=True,
-                    unit_divisor=1024,
-                    desc=f"Downloading {model_name}",
-                    initial=0,
-                    ascii=False,
-                    position=0,
-                ) as pbar:
-                    async for chunk in r.content.iter_chunked(chunk_size):
-                        fd.write(chunk)
-                        pbar.update(len(chunk))
-        else:
-            with open(save_path, "wb") as fd:
-                async for chunk in r.content.iter_chunked(chunk_size):
-                    fd.write(chunk)
-
-
-async def fetch_all(session, url_dict):
-    tasks = []
-    for save_path, url in url_dict.items():
-        task = asyncio.create_task(fetch(session, url, save_path))
-        tasks.append(task)
-    await tqdm.asyncio.tqdm.gather(*tasks)
-
-
 async def async_download_urls(url_dict: dict) -> None:
-    async with aiohttp.ClientSession() as session:
-        await fetch_all(session, url_dict)
+    await downloads.download_urls(url_dict)
 
 
 def run_async_download(url_dict: dict):
@@ -475,6 +658,288 @@ def run_async_download(url_dict: dict):
     logger.info(f"result: {result}")
 
 
+# colors of the classes in the color segmentation outputs, the same colors do_seg uses
+CLASS_LABEL_COLORMAP = [
+    "#3366CC",
+    "#DC3912",
+    "#FF9900",
+    "#109618",
+    "#990099",
+    "#0099C6",
+    "#DD4477",
+    "#66AA00",
+    "#B82E2E",
+    "#316395",
+    "#ffe4e1",
+    "#ff7373",
+    "#666666",
+    "#c0c0c0",
+    "#66cdaa",
+    "#afeeee",
+    "#0e2f44",
+    "#420420",
+    "#794044",
+    "#3399ff",
+]
+
+
+def read_image_for_seg(
+    file: str, N_DATA_BANDS: int, TARGET_SIZE: list, model_type: str
+) -> dict:
+    """
+    Reads an image and resizes it to TARGET_SIZE the same way do_seg does.
+
+    Args:
+        file (str): The path to the .jpg, .png or .npz file.
+        N_DATA_BANDS (int): The number of bands the model expects.
+        TARGET_SIZE (list): The height and width the model expects.
+        model_type (str): The type of the model ex. 'segformer' or 'resunet'.
+
+    Returns:
+        dict: The standardized image resized to TARGET_SIZE ("image"), the height ("w") and width ("h") of the original image
+        and the original image ("bigimage").
+    """
+    image, w, h, bigimage = get_image(file, N_DATA_BANDS, TARGET_SIZE, model_type)
+    return {
+        "file": file,
+        "image": np.asarray(image),
+        "w": int(w),
+        "h": int(h),
+        "bigimage": np.asarray(bigimage),
+    }
+
+
+def predict_batch(model, batch: np.ndarray, model_type: str) -> np.ndarray:
+    """
+    Returns the scores the model predicts for a batch of images.
+
+    Like do_seg, a model that rejects images with more than 3 bands is given the first 3 bands instead.
+    Any other error is raised.
+
+    Args:
+        model: The model to predict with.
+        batch (np.ndarray): The images stacked along the first axis.
+        model_type (str): The type of the model ex. 'segformer' or 'resunet'.
+
+    Returns:
+        np.ndarray: The scores of the images stacked along the first axis.
+    """
+
+    def predict(images):
+        if model_type == "segformer":
+            return np.asarray(model(images).logits)
+        return model.predict(images, batch_size=len(images), verbose=0)
+
+    # segformer images are channels first
+    bands_axis = 1 if model_type == "segformer" else -1
+    try:
+        return predict(batch)
+    except (ValueError, tf.errors.InvalidArgumentError) as error:
+        if batch.shape[bands_axis] <= 3:
+            raise
+        logger.warning(
+            f"The model could not predict images with {batch.shape[bands_axis]} bands, using the first 3 bands: {error}"
+        )
+        return predict(np.take(batch, range(3), axis=bands_axis))
+
+
+def predict_batch_with_tta(
+    model, batch: np.ndarray, model_type: str, use_tta: bool, binary: bool
+) -> List[np.ndarray]:
+    """
+    Returns the scores the model predicts for each image in the batch.
+
+    With test time augmentation the scores of the image flipped up/down, left/right and both are added to the scores of the image.
+    The flips are made and undone on the same axes as doodleverse's est_label_binary and est_label_multiclass.
+
+    Args:
+        model: The model to predict with.
+        batch (np.ndarray): The images stacked along the first axis.
+        model_type (str): The type of the model ex. 'segformer' or 'resunet'.
+        use_tta (bool): Whether to use test time augmentation.
+        binary (bool): Whether the model has 2 classes.
+
+    Returns:
+        List[np.ndarray]: The scores of each image.
+    """
+    outputs = [predict_batch(model, batch, model_type)]
+    if use_tta:
+        # np.flipud and np.fliplr of a single image flip the first and second axes of the image
+        outputs.append(predict_batch(model, np.flip(batch, axis=1), model_type))
+        outputs.append(predict_batch(model, np.flip(batch, axis=2), model_type))
+        outputs.append(predict_batch(model, np.flip(batch, axis=(1, 2)), model_type))
+
+    scores = []
+    for index in range(len(batch)):
+        # keep the batch axis of the outputs of each image like the single image batches of do_seg
+        image_outputs = [output[index : index + 1] for output in outputs]
+        if model_type != "segformer":
+            image_outputs = [np.squeeze(output) for output in image_outputs]
+        elif use_tta and not binary:
+            image_outputs[3] = np.squeeze(image_outputs[3])
+        if use_tta:
+            scores.append(
+                image_outputs[0]
+                + np.flipud(image_outputs[1])
+                + np.fliplr(image_outputs[2])
+                + np.flipud(np.fliplr(image_outputs[3]))
+            )
+        else:
+            scores.append(image_outputs[0])
+    return scores
+
+
+def segment_images(
+    images: List[dict],
+    models: list,
+    model_type: str,
+    NCLASSES: int,
+    TARGET_SIZE: list,
+    use_tta: bool,
+) -> None:
+    """
+    Predicts the scores of each class for a batch of images read by read_image_for_seg with all the models at once.
+
+    The scores are computed the same way as do_seg and saved to each image dictionary.
+    For 2 class models the scores of each class are saved to "e0" and "e1" otherwise the scores are saved to "est_label".
+    Images with no variation are marked as "empty" and are not predicted.
+
+    Args:
+        images (List[dict]): The images read by read_image_for_seg.
+        models (list): The models to predict with.
+        model_type (str): The type of the models ex. 'segformer' or 'resunet'.
+        NCLASSES (int): The number of classes the models predict.
+        TARGET_SIZE (list): The height and width the models expect.
+        use_tta (bool): Whether to use test time augmentation.
+    """
+    binary = NCLASSES == 2
+    images_to_predict = []
+    for image in images:
+        image["empty"] = np.std(image["image"]) == 0
+        if image["empty"]:
+            print("Image {} is empty".format(image["file"]))
+            if binary:
+                image["e0"] = np.zeros((image["w"], image["h"]))
+                image["e1"] = np.zeros((image["w"], image["h"]))
+            else:
+                image["est_label"] = np.zeros((image["w"], image["h"]))
+        else:
+            images_to_predict.append(image)
+
+    # images of the same shape are stacked into a single batch
+    groups = {}
+    for image in images_to_predict:
+        groups.setdefault(image["image"].shape, []).append(image)
+
+    for group in groups.values():
+        batch = np.stack([image["image"] for image in group])
+        if binary:
+            E0 = [[] for _ in group]
+            E1 = [[] for _ in group]
+            for model in models:
+                scores = predict_batch_with_tta(model, batch, model_type, use_tta, binary)
+                for index, (image, est_label) in enumerate(zip(group, scores)):
+                    est_label = est_label.astype("float32")
+                    if model_type == "segformer":
+                        est_label = resize(est_label, (1, NCLASSES, TARGET_SIZE[0], TARGET_SIZE[1]), preserve_range=True, clip=True).squeeze()
+                        est_label = np.transpose(est_label, (1, 2, 0))
+                    w, h = image["w"], image["h"]
+                    E0[index].append(resize(est_label[:, :, 0], (w, h), preserve_range=True, clip=True))
+                    E1[index].append(resize(est_label[:, :, 1], (w, h), preserve_range=True, clip=True))
+            for index, image in enumerate(group):
+                image["e0"] = np.average(np.dstack(E0[index]), axis=-1)
+                image["e1"] = np.average(np.dstack(E1[index]), axis=-1)
+        else:
+            # do_seg's est_label_multiclass keeps the scores of the last model and divides them by the number of models
+            scores = predict_batch_with_tta(models[-1], batch, model_type, use_tta, binary)
+            for image, est_label in zip(group, scores):
+                est_label = est_label / len(models)
+                est_label = est_label.astype("float32")
+                if model_type == "segformer":
+                    est_label = resize(est_label, (1, NCLASSES, TARGET_SIZE[0], TARGET_SIZE[1]), preserve_range=True, clip=True).squeeze()
+                    est_label = np.transpose(est_label, (1, 2, 0))
+                image["est_label"] = resize(est_label, (image["w"], image["h"]))
+
+
+def save_segmentation(
+    image: dict,
+    sample_direc: str,
+    metadata_dict: dict,
+    NCLASSES: int,
+    N_DATA_BANDS: int,
+    use_otsu: bool,
+    out_dir_name: str = "out",
+) -> str:
+    """
+    Saves the color segmentation (_predseg.png) and the model outputs (_res.npz) of an image segmented by segment_images.
+    The outputs are the same as the outputs do_seg saves with profile="meta".
+
+    Args:
+        image (dict): The image segmented by segment_images.
+        sample_direc (str): The directory containing the images. The outputs are saved to the out_dir_name directory inside it.
+        metadata_dict (dict): The model metadata saved to each _res.npz file. It is not modified.
+        NCLASSES (int): The number of classes the model predicts.
+        N_DATA_BANDS (int): The number of bands the model expects.
+        use_otsu (bool): Whether to threshold 2 class outputs with otsu's threshold instead of 0.5.
+        out_dir_name (str, optional): The name of the directory to save the outputs to. Defaults to "out".
+
+    Returns:
+        str: The path to the _res.npz file.
+    """
+    file = image["file"]
+    segfile = os.path.splitext(file)[0] + "_predseg.png"
+    out_dir_path = os.path.normpath(sample_direc + os.sep + out_dir_name)
+    os.makedirs(out_dir_path, exist_ok=True)
+    segfile = os.path.normpath(segfile).replace(
+        os.path.normpath(sample_direc), out_dir_path
+    )
+
+    metadatadict = dict(metadata_dict)
+    metadatadict["input_file"] = file
+    metadatadict["nclasses"] = NCLASSES
+    metadatadict["n_data_bands"] = N_DATA_BANDS
+
+    if NCLASSES == 2:
+        e0, e1 = image["e0"], image["e1"]
+        est_label = (e1 + (1 - e0)) / 2
+        metadatadict["av_prob_stack"] = est_label
+        metadatadict["av_softmax_scores"] = np.dstack((e0, e1))
+        if use_otsu:
+            thres = threshold_otsu(est_label)
+            est_label = (est_label > thres).astype("uint8")
+            metadatadict["otsu_threshold"] = thres
+        else:
+            est_label = (est_label > 0.5).astype("uint8")
+            metadatadict["otsu_threshold"] = 0.5
+    else:
+        est_label = image["est_label"]
+        metadatadict["av_prob_stack"] = est_label
+        softmax_scores = est_label.copy()
+        metadatadict["av_softmax_scores"] = softmax_scores
+        if not image["empty"]:
+            est_label = np.argmax(softmax_scores, -1)
+        else:
+            est_label = est_label.astype("uint8")
+
+    bigimage = image["bigimage"]
+    mask = bigimage[:, :, 0] == 0 if bigimage.ndim == 3 else bigimage == 0
+    color_label = label_to_colors(
+        est_label,
+        mask,
+        alpha=128,
+        colormap=CLASS_LABEL_COLORMAP[:NCLASSES],
+        color_class_offset=0,
+        do_alpha=False,
+    )
+    skimage.io.imsave(segfile, color_label.astype(np.uint8), check_contrast=False)
+    metadatadict["color_segmentation_output"] = segfile
+
+    segfile = segfile.replace("_predseg.png", "_res.npz")
+    metadatadict["grey_label"] = est_label
+    np.savez_compressed(segfile, **metadatadict)
+    return segfile
+
+
 def get_GPU(num_GPU: str) -> None:
     num_GPU = str(num_GPU)
     if num_GPU == "0":
@@ -570,6 +1035,109 @@ def get_sorted_files_with_extension(
     return sample_filenames
 
 
+def extract_shorelines_for_session(
+    settings: dict,
+    session_path: str,
+    session_name: str,
+    shoreline_path: str = "",
+    transects_path: str = "",
+    shoreline_extraction_area_path: str = "",
+) -> None:
+    """
+    Extracts the shorelines from the model outputs of a single ROI with a new Zoo_Model so it can be run in a separate process or thread.
+    See Zoo_Model.extract_shorelines_with_unet.
+
+    Args:
+        settings (dict): The settings for shoreline extraction.
+        session_path (str): The path to the model session directory of the ROI.
+        session_name (str): The name of the session to save the extracted shorelines to.
+        shoreline_path (str, optional): The path to the reference shorelines. Defaults to "".
+        transects_path (str, optional): The path to the transects. Defaults to "".
+        shoreline_extraction_area_path (str, optional): The path to the shoreline extraction area. Defaults to "".
+    """
+    zoo_model_instance = Zoo_Model()
+    zoo_model_instance.set_settings(**settings)
+    zoo_model_instance.extract_shorelines_with_unet(
+        dict(settings),
+        session_path,
+        session_name,
+        shoreline_path,
+        transects_path,
+        shoreline_extraction_area_path,
+    )
+
+
+class ModelCache:
+    """
+    A least recently used cache of the models loaded by Zoo_Model.prepare_model.
+
+    Models are cached by (model_id, implementation, weights files) where the weights files are the name and modification time
+    of each weights file, so a model is loaded again when its weights are downloaded again.
+    Reusing the loaded models also reuses the predict functions tensorflow compiled for them.
+    """
+
+    def __init__(self, max_size: int = 2):
+        """
+        Args:
+            max_size (int, optional): The maximum number of models kept in memory. 0 disables the cache. Defaults to 2.
+        """
+        self.max_size = max_size
+        self._models = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_key(model_id: str, implementation: str, weights_list: List[str]) -> tuple:
+        """Returns the key of the model loaded from the weights files."""
+        weights_files = tuple(
+            sorted(
+                (os.path.basename(weights), os.stat(weights).st_mtime_ns)
+                for weights in weights_list
+            )
+        )
+        return (model_id, implementation.upper(), weights_files)
+
+    def get(self, key: tuple) -> Optional[dict]:
+        """Returns the cached model for the key and marks it as the most recently used or None if it is not cached."""
+        with self._lock:
+            if key not in self._models:
+                return None
+            self._models.move_to_end(key)
+            return self._models[key]
+
+    def put(self, key: tuple, model: dict) -> None:
+        """Caches the model and evicts the least recently used models if the cache is full."""
+        with self._lock:
+            self._models[key] = model
+            self._models.move_to_end(key)
+            self._evict()
+
+    def set_max_size(self, max_size: int) -> None:
+        """Sets the maximum number of models kept in memory and evicts the least recently used models that no longer fit."""
+        with self._lock:
+            self.max_size = max_size
+            self._evict()
+
+    def clear(self) -> None:
+        """Removes all the models from the cache."""
+        with self._lock:
+            self._models.clear()
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+    def __contains__(self, key: tuple) -> bool:
+        return key in self._models
+
+    def _evict(self) -> None:
+        while len(self._models) > max(self.max_size, 0):
+            key, _ = self._models.popitem(last=False)
+            logger.info(f"Removed model {key[0]} {key[1]} from the model cache")
+
+
+# the models loaded by all the Zoo_Model instances in this process
+MODEL_CACHE = ModelCache()
+
+
 class Zoo_Model:
     def __init__(self):
         gdal.UseExceptions()
@@ -614,6 +1182,8 @@ class Zoo_Model:
             "dist_clouds": 300,  # ditance around clouds where shoreline can't be mapped
             "output_epsg": 4326,  # epsg code of spatial reference system desired for the output
             "save_figure": True,  # if True, saves a figure showing the mapped shoreline for each image
+            "figure_mode": "inline",  # 'inline' saves the figures during extraction, 'deferred' saves the data to render them later, 'off' skips them
+            "output_format": "geojson",  # format of the session files: 'geojson', 'geoparquet' or 'flatgeobuf'
             # minimum area (in metres^2) for an object to be labelled as a beach
             "min_beach_area": 4500,
             # minimum length (in metres) of shoreline perimeter to be valid
@@ -655,7 +1225,12 @@ class Zoo_Model:
         return self.settings
 
     def preprocess_data(
-        self, src_directory: str, model_dict: dict, img_type: str
+        self,
+        src_directory: str,
+        model_dict: dict,
+        img_type: str,
+        num_workers: int = None,
+        scheduler: str = "processes",
     ) -> dict:
         """
         Preprocesses the data in the source directory and updates the model dictionary with the processed data.
@@ -664,6 +1239,9 @@ class Zoo_Model:
             src_directory (str): The path to the source directory containing the ROI's data
             model_dict (dict): The dictionary containing the model configuration and parameters.
             img_type (str): The type of imagery to generate. Must be one of "RGB", "NDWI", "MNDWI", or "RGB+MNDWI+NDWI".
+            num_workers (int, optional): The maximum number of workers converting the imagery. Defaults to None which uses
+                the number of CPUs up to MAX_DEFAULT_WORKERS.
+            scheduler (str, optional): Whether to convert the imagery in "processes" or "threads". Defaults to "processes".
 
         Returns:
             dict: The updated model dictionary containing the paths to the processed data.
@@ -679,7 +1257,9 @@ class Zoo_Model:
         # get full path to directory named 'RGB' containing RGBs
         RGB_path = file_utilities.find_directory_recursively(src_directory, name="RGB")
         # convert RGB to MNDWI, NDWI,or 5 band
-        model_dict["sample_direc"] = get_imagery_directory(img_type, RGB_path)
+        model_dict["sample_direc"] = get_imagery_directory(
+            img_type, RGB_path, num_workers, scheduler
+        )
         return model_dict
 
     def run_model_and_extract_shorelines(self,
@@ -763,6 +1343,96 @@ class Zoo_Model:
         )
 
 
+    def run_model_and_extract_shorelines_on_rois(
+        self,
+        roi_directories: List[str],
+        session_name: str,
+        shoreline_path: str = "",
+        transects_path: str = "",
+        shoreline_extraction_area_path: str = "",
+        batch_size: int = 8,
+        max_workers: int = 2,
+        scheduler: str = "threads",
+    ) -> Dict[str, str]:
+        """
+        Runs the model on the imagery of several ROIs and extracts the shorelines of each ROI.
+
+        The model is loaded once and segments the imagery of every ROI in a single pipeline (see run_model_on_rois).
+        The shorelines of the ROIs are then extracted in parallel. The model outputs of each ROI are saved to a session
+        subfolder named after the ROI ID ex. sessions/session_name/ID_1 and the extracted shorelines to a subfolder of
+        a separate session ex. sessions/session_name_extracted/ID_1, so the model session is not overwritten.
+
+        Args:
+            roi_directories (List[str]): The directories in data of each ROI.
+            session_name (str): The name of the session.
+            shoreline_path (str, optional): The path to the reference shorelines. Defaults to "".
+            transects_path (str, optional): The path to the transects. Defaults to "".
+            shoreline_extraction_area_path (str, optional): The path to the shoreline extraction area. Defaults to "".
+            batch_size (int, optional): The number of images the models predict at once. Defaults to 8.
+            max_workers (int, optional): The maximum number of ROIs whose shorelines are extracted at once. Defaults to 2.
+            scheduler (str, optional): Whether to extract the shorelines in "threads" or "processes". Defaults to "threads"
+                because each process has to import tensorflow again.
+
+        Returns:
+            Dict[str, str]: The ROI IDs whose model run or shoreline extraction failed mapped to the error.
+        """
+        settings = self.get_settings()
+        model_name = settings.get('model_type', None)
+        if model_name is None:
+            raise ValueError("Please select a model type.")
+        img_type = settings.get('img_type', None)
+        if img_type is None:
+            raise ValueError("Please select an input image type.")
+
+        roi_session_paths = self.run_model_on_rois(
+            img_type,
+            settings.get('implementation', "BEST"),
+            session_name,
+            roi_directories,
+            model_name=model_name,
+            use_GPU=settings.get('use_GPU', "0"),
+            use_otsu=settings.get('otsu', False),
+            use_tta=settings.get('tta', False),
+            percent_no_data=settings.get('percent_no_data', 0.5),
+            batch_size=batch_size,
+        )
+        failed_rois = {
+            file_utilities.extract_roi_id(roi_directory): "The model could not be run on the ROI"
+            for roi_directory in roi_directories
+            if file_utilities.extract_roi_id(roi_directory) not in roi_session_paths
+        }
+        if not roi_session_paths:
+            return failed_rois
+
+        with extracted_shoreline.get_executor(
+            scheduler, min(max_workers, len(roi_session_paths))
+        ) as executor:
+            futures = {
+                executor.submit(
+                    extract_shorelines_for_session,
+                    settings,
+                    roi_session_path,
+                    os.path.join(f"{session_name}_extracted", roi_id),
+                    shoreline_path,
+                    transects_path,
+                    shoreline_extraction_area_path,
+                ): roi_id
+                for roi_id, roi_session_path in roi_session_paths.items()
+            }
+            for future in tqdm.auto.tqdm(
+                concurrent.futures.as_completed(futures),
+                total=len(futures),
+                desc="Extracting shorelines",
+            ):
+                roi_id = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.error(f"{roi_id}: shorelines could not be extracted. {e}")
+                    print(f"{roi_id}: shorelines could not be extracted. {e}")
+                    failed_rois[roi_id] = str(e)
+        return failed_rois
+
     def extract_shorelines_with_unet(
         self,
         settings: dict,
@@ -771,6 +1441,7 @@ class Zoo_Model:
         shoreline_path: str = "",
         transects_path: str = "",
         shoreline_extraction_area_path: str = "",
+        incremental: bool = False,
         **kwargs: dict,
     ) -> None:
         """
@@ -786,6 +1457,8 @@ class Zoo_Model:
             - If a geojson file is not provided, the program will attempt to load default transects and if that fails it will raise an error.
             **kwargs (dict): Additional keyword arguments.
             shoreline_extraction_area_path (str, optional): The path to the shoreline extraction area. Defaults to "".
+            incremental (bool, optional): If True, the images that were already processed with the same settings in the session
+                are skipped and only the shorelines and transect intersections of the new images are computed. Defaults to False.
         Returns:
             None
         """
@@ -808,7 +1481,7 @@ class Zoo_Model:
             config = file_utilities.load_json_data_from_file(
                 session_path, "config.json"
             )
-            # get the roi_id from the config file @todo this won't work for multiple ROIs
+            # get the roi_id from the config file, each model session holds a single ROI (see run_model_on_rois for several ROIs)
             if config.get("roi_ids"):
                 roi_id = config["roi_ids"][0]
             roi_settings = {roi_id:config[roi_id]}
@@ -881,6 +1554,7 @@ class Zoo_Model:
             roi_gdf=roi_gdf,
             epsg_code="epsg:4326",
             shoreline_extraction_area_gdf = shoreline_extraction_area_gdf,
+            output_format=file_utilities.get_output_format(settings),
         )
 
         # extract shorelines
@@ -894,12 +1568,17 @@ class Zoo_Model:
                 session_path,
                 new_session_path,
                 shoreline_extraction_area=shoreline_extraction_area_gdf,
+                incremental=incremental,
                 **kwargs,
             )
         )
 
         # save extracted shorelines, detection jpgs, configs, model settings files to the session directory
-        common.save_extracted_shorelines(extracted_shorelines, new_session_path)
+        common.save_extracted_shorelines(
+            extracted_shorelines,
+            new_session_path,
+            file_utilities.get_output_format(settings),
+        )
 
         # common.save_extracted_shoreline_figures(extracted_shorelines, new_session_path)
         print(f"Saved extracted shorelines to {new_session_path}")
@@ -909,9 +1588,20 @@ class Zoo_Model:
             transects_gdf = transects_gdf.to_crs(new_espg)
 
         # compute intersection between extracted shorelines and transects
-        cross_distance_transects = extracted_shoreline.compute_transects_from_roi(
-            extracted_shorelines.dictionary, transects_gdf, settings
-        )
+        transect_settings = self.get_settings()
+        transect_settings["output_epsg"] = new_espg
+        if extracted_shorelines.previous_dates:
+            cross_distance_transects = extracted_shoreline.compute_transects_incrementally(
+                extracted_shorelines.dictionary,
+                transects_gdf,
+                transect_settings,
+                extracted_shorelines.previous_dates,
+                new_session_path,
+            )
+        else:
+            cross_distance_transects = extracted_shoreline.compute_transects_from_roi(
+                extracted_shorelines.dictionary, transects_gdf, settings
+            )
 
         first_key = next(iter(cross_distance_transects))
         logger.info(
@@ -926,8 +1616,6 @@ class Zoo_Model:
             logger.warning("No transect shoreline intersections.")
             print("No transect shoreline intersections.")
         else:
-            transect_settings = self.get_settings()
-            transect_settings["output_epsg"] = new_espg
             drop_intersection_pts=self.get_settings().get('drop_intersection_pts', False)
             common.save_transects(
                 new_session_path,
@@ -935,7 +1623,8 @@ class Zoo_Model:
                 extracted_shorelines.dictionary,
                 transect_settings,
                 transects_gdf,
-                drop_intersection_pts
+                drop_intersection_pts,
+                file_utilities.get_output_format(settings),
             )
 
     def postprocess_data(
@@ -995,24 +1684,61 @@ class Zoo_Model:
         file_utilities.move_files(outputs_path, session_path, delete_src=True)
         session.save(session.path)
 
-    def prepare_model(self, model_implementation: str, model_id: str):
+    def prepare_model(
+        self, model_implementation: str, model_id: str, use_cache: bool = True
+    ):
         """
         Prepares the model for use by downloading the required files and loading the model.
 
+        The loaded model is kept in MODEL_CACHE so the next run with the same model and weights files
+        skips the download check and reuses the loaded model.
+
         Args:
             model_implementation (str): The model implementation either 'BEST' or 'ENSEMBLE'
             model_id (str): The ID of the model.
+            use_cache (bool, optional): Whether to reuse a model loaded by an earlier run. Defaults to True.
         """
         self.clear_zoo_model()
         # create the model directory
         self.weights_directory = self.get_model_directory(model_id)
         logger.info(f"self.weights_directory:{self.weights_directory}")
 
-        self.download_model(model_implementation, model_id, self.weights_directory)
-        weights_list = self.get_weights_list(model_implementation)
+        cached_model = None
+        if use_cache:
+            weights_list = self.get_local_weights_list(model_implementation)
+            if weights_list:
+                cached_model = MODEL_CACHE.get(
+                    ModelCache.get_key(model_id, model_implementation, weights_list)
+                )
 
-        # Load the model from the config files
-        model, model_list, config_files, model_types = self.get_model(weights_list)
+        if cached_model is not None:
+            logger.info(f"Using the cached model {model_id} {model_implementation}")
+            weights_list = cached_model["weights_list"]
+            config_files = cached_model["config_files"]
+            model_types = list(cached_model["model_types"])
+            model_list = list(cached_model["model_list"])
+            self.TARGET_SIZE = cached_model["TARGET_SIZE"]
+            self.NCLASSES = cached_model["NCLASSES"]
+            self.N_DATA_BANDS = cached_model["N_DATA_BANDS"]
+        else:
+            self.download_model(model_implementation, model_id, self.weights_directory)
+            weights_list = self.get_weights_list(model_implementation)
+
+            # Load the model from the config files
+            model, model_list, config_files, model_types = self.get_model(weights_list)
+            if use_cache:
+                MODEL_CACHE.put(
+                    ModelCache.get_key(model_id, model_implementation, weights_list),
+                    {
+                        "weights_list": weights_list,
+                        "config_files": config_files,
+                        "model_types": list(model_types),
+                        "model_list": list(model_list),
+                        "TARGET_SIZE": self.TARGET_SIZE,
+                        "NCLASSES": self.NCLASSES,
+                        "N_DATA_BANDS": self.N_DATA_BANDS,
+                    },
+                )
         logger.info(f"self.TARGET_SIZE: {self.TARGET_SIZE}")
         logger.info(f"self.N_DATA_BANDS: {self.N_DATA_BANDS}")
         logger.info(f"self.TARGET_SIZE: {self.TARGET_SIZE}")
@@ -1024,6 +1750,24 @@ class Zoo_Model:
         )
         logger.info(f"self.metadatadict: {self.metadata_dict}")
 
+    def get_local_weights_list(self, model_choice: str) -> List[str]:
+        """
+        Returns the weights files of the model that were already downloaded to the weights directory.
+
+        Args:
+            model_choice (str): 'BEST' or 'ENSEMBLE'
+
+        Returns:
+            List[str]: The paths to the weights files. Empty if the weights have not been downloaded.
+        """
+        try:
+            weights_list = self.get_weights_list(model_choice.upper())
+        except (FileNotFoundError, ValueError):
+            return []
+        if not all(os.path.isfile(weights) for weights in weights_list):
+            return []
+        return weights_list
+
     def get_metadatadict(
             self, weights_list: list, config_files: list, model_types: list
         ) -> dict:
@@ -1128,6 +1872,110 @@ class Zoo_Model:
             session.add_roi_ids([file_utilities.extract_roi_id(roi_directory)])
             print(f"\n Model results saved to {session.path}")
 
+    def run_model_on_rois(
+        self,
+        img_type: str,
+        model_implementation: str,
+        session_name: str,
+        roi_directories: List[str],
+        model_name: str,
+        use_GPU: str,
+        use_otsu: bool,
+        use_tta: bool,
+        percent_no_data: float,
+        batch_size: int = 8,
+        num_workers: int = 4,
+    ) -> Dict[str, str]:
+        """
+        Runs the model on the imagery of several ROIs.
+
+        The model is loaded once and the imagery of every ROI is segmented in a single pipeline (see segment_files).
+        The outputs of each ROI are saved to a session subfolder named after the ROI ID ex. sessions/session_name/ID_1.
+        ROIs that can't be preprocessed or have no imagery to segment are skipped.
+
+        Args:
+            img_type (str): The type of image.
+            model_implementation (str): The implementation of the model.
+            session_name (str): The name of the session.
+            roi_directories (List[str]): The directories in data of each ROI. ex. ['data/ID_1_datetime06-05-23__04_16_45']
+            model_name (str): The name of the model.
+            use_GPU (str): Whether to use GPU or not.
+            use_otsu (bool): Whether to use Otsu thresholding or not.
+            use_tta (bool): Whether to use test-time augmentation or not.
+            percent_no_data (float): The percentage of no data.
+            batch_size (int, optional): The number of images the models predict at once. Defaults to 8.
+            num_workers (int, optional): The number of threads reading images and the number of threads saving outputs. Defaults to 4.
+
+        Returns:
+            Dict[str, str]: The path to the session subfolder of each ROI that was segmented by its ROI ID.
+        """
+        logger.info(f"Selected ROI directories: {roi_directories}")
+        print(f"Running model {model_name} on {len(roi_directories)} ROIs")
+        self.prepare_model(model_implementation, model_name)
+
+        sessions_path = file_utilities.create_directory(
+            core_utilities.get_base_dir(), "sessions"
+        )
+        session_path = file_utilities.create_directory(sessions_path, session_name)
+
+        model_dicts = {}
+        files_to_segment = []
+        for roi_directory in roi_directories:
+            roi_id = file_utilities.extract_roi_id(roi_directory)
+            model_dict = {
+                "use_GPU": use_GPU,
+                "sample_direc": "",
+                "implementation": model_implementation,
+                "model_type": model_name,
+                "otsu": use_otsu,
+                "tta": use_tta,
+                "percent_no_data": percent_no_data,
+            }
+            try:
+                print(f"Preprocessing the data at {roi_directory}")
+                model_dict = self.preprocess_data(roi_directory, model_dict, img_type)
+            except Exception as e:
+                logger.error(f"{roi_id}: could not preprocess {roi_directory}. {e}")
+                print(f"{roi_id}: could not preprocess {roi_directory}. {e}")
+                continue
+            logger.info(f"model_dict: {model_dict}")
+            roi_files = self.get_files_for_seg(
+                model_dict["sample_direc"], avoid_patterns=[], percent_no_data=percent_no_data
+            )
+            files_to_segment.extend(
+                (model_dict["sample_direc"], file) for file in roi_files
+            )
+            model_dicts[roi_directory] = model_dict
+
+        print(f"Found {len(files_to_segment)} files to run on model on")
+        self.segment_files(
+            files_to_segment,
+            use_tta,
+            use_otsu,
+            batch_size=batch_size,
+            num_workers=num_workers,
+        )
+
+        roi_session_paths = {}
+        for roi_directory, model_dict in model_dicts.items():
+            roi_id = file_utilities.extract_roi_id(roi_directory)
+            session = sessions.Session(
+                name=os.path.join(session_name, roi_id),
+                path=file_utilities.create_directory(session_path, roi_id),
+            )
+            session.add_roi_ids([roi_id])
+            try:
+                self.postprocess_data(model_dict, session, roi_directory)
+            except Exception as e:
+                logger.error(f"{roi_id}: {e}")
+                print(f"{roi_id}: {e}")
+                if not os.listdir(session.path):
+                    os.rmdir(session.path)
+                continue
+            roi_session_paths[roi_id] = session.path
+        print(f"\n Model results saved to {session_path}")
+        return roi_session_paths
+
     def get_model_directory(self, model_id: str):
         # Create a directory to hold the downloaded models
         downloaded_models_path = common.get_downloaded_models_dir()
@@ -1175,10 +2023,14 @@ class Zoo_Model:
             self,
             preprocessed_data: dict,
             percent_no_data: float = 0.50,
+            batch_size: int = 8,
+            num_workers: int = 4,
         ):
             """
             Compute the segmentation for a given set of preprocessed data.
 
+            The images are segmented in batches by segment_files. The outputs are the same as the outputs of doodleverse's do_seg.
+
             Args:
                 preprocessed_data (dict): A dictionary containing preprocessed data.
                     This dictionary should contain the following keys:
@@ -1187,6 +2039,8 @@ class Zoo_Model:
                     - otsu (bool): Whether to use Otsu thresholding.
                     
                 percent_no_data (float, optional): The max ercentage of no data pixels allowed in the image. Defaults to 0.50.
+                batch_size (int, optional): The number of images the models predict at once. Defaults to 8.
+                num_workers (int, optional): The number of threads reading images and the number of threads saving outputs. Defaults to 4.
 
             Returns:
                 None
@@ -1199,28 +2053,101 @@ class Zoo_Model:
                 sample_direc, avoid_patterns=[], percent_no_data=percent_no_data
             )
             logger.info(f"files_to_segment: {files_to_segment}")
-            if self.model_types[0] != "segformer":
-                ### mixed precision
-                from tensorflow.keras import mixed_precision
-
-                mixed_precision.set_global_policy("mixed_float16")
             # Compute the segmentation for each of the files
             print(f"Found {len(files_to_segment)} files to run on model on")
-            for file_to_seg in tqdm.auto.tqdm(files_to_segment, desc="Applying Model"):
-                do_seg(
-                    file_to_seg,
+            self.segment_files(
+                [(sample_direc, file) for file in files_to_segment],
+                use_tta,
+                use_otsu,
+                batch_size=batch_size,
+                num_workers=num_workers,
+            )
+
+    def segment_files(
+        self,
+        files_to_segment: List[Tuple[str, str]],
+        use_tta: bool,
+        use_otsu: bool,
+        batch_size: int = 8,
+        num_workers: int = 4,
+    ) -> None:
+        """
+        Segments the files with the loaded model in a single pipeline. The files can come from several directories.
+
+        A pool of reader threads reads and resizes the next batches of images while the models predict the current
+        batch all at once and a pool of writer threads saves the outputs of the previous batches to the 'out'
+        directory inside the directory of each file.
+
+        Args:
+            files_to_segment (List[Tuple[str, str]]): The directory containing each file and the path to the file.
+            use_tta (bool): Whether to use test-time augmentation.
+            use_otsu (bool): Whether to use Otsu thresholding.
+            batch_size (int, optional): The number of images the models predict at once. Defaults to 8.
+            num_workers (int, optional): The number of threads reading images and the number of threads saving outputs. Defaults to 4.
+        """
+        model_type = self.model_types[0]
+        if model_type != "segformer":
+            ### mixed precision
+            from tensorflow.keras import mixed_precision
+
+            mixed_precision.set_global_policy("mixed_float16")
+        batches = [
+            files_to_segment[start : start + batch_size]
+            for start in range(0, len(files_to_segment), batch_size)
+        ]
+
+        def read(sample_direc: str, file: str) -> dict:
+            image = read_image_for_seg(
+                file, self.N_DATA_BANDS, self.TARGET_SIZE, model_type
+            )
+            image["sample_direc"] = sample_direc
+            return image
+
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=num_workers
+        ) as reader, concurrent.futures.ThreadPoolExecutor(
+            max_workers=num_workers
+        ) as writer, tqdm.auto.tqdm(
+            total=len(files_to_segment), desc="Applying Model"
+        ) as progress_bar:
+            # read up to 2 batches ahead of the batch being predicted
+            pending_reads = deque(
+                [reader.submit(read, *item) for item in batch] for batch in batches[:2]
+            )
+            pending_writes = deque()
+            for batch_index in range(len(batches)):
+                images = [future.result() for future in pending_reads.popleft()]
+                if batch_index + 2 < len(batches):
+                    pending_reads.append(
+                        [reader.submit(read, *item) for item in batches[batch_index + 2]]
+                    )
+                segment_images(
+                    images,
                     self.model_list,
-                    self.metadata_dict,
-                    self.model_types[0],
-                    sample_direc=sample_direc,
-                    NCLASSES=self.NCLASSES,
-                    N_DATA_BANDS=self.N_DATA_BANDS,
-                    TARGET_SIZE=self.TARGET_SIZE,
-                    TESTTIMEAUG=use_tta,
-                    WRITE_MODELMETADATA=False,
-                    OTSU_THRESHOLD=use_otsu,
-                    profile="meta",
+                    model_type,
+                    self.NCLASSES,
+                    self.TARGET_SIZE,
+                    use_tta,
                 )
+                pending_writes.extend(
+                    writer.submit(
+                        save_segmentation,
+                        image,
+                        image["sample_direc"],
+                        self.metadata_dict,
+                        self.NCLASSES,
+                        self.N_DATA_BANDS,
+                        use_otsu,
+                    )
+                    for image in images
+                )
+                # limit the number of outputs waiting to be saved so they don't fill up the memory
+                while len(pending_writes) > 2 * batch_size:
+                    pending_writes.popleft().result()
+                    progress_bar.update(1)
+            while pending_writes:
+                pending_writes.popleft().result()
+                progress_bar.update(1)
 
     def get_model(self, weights_list: list):
         model_list = []
@@ -1490,10 +2417,11 @@ class Zoo_Model:
         logger.info(f"model_path for BEST_MODEL.txt: {BEST_MODEL_txt_path}")
         # if best BEST_MODEL.txt file not exist then download it
         if not os.path.isfile(BEST_MODEL_txt_path):
-            common.download_url(
+            downloads.download_url_to_file(
                 best_model_json["links"]["self"],
                 BEST_MODEL_txt_path,
-                "Downloading best_model.txt",
+                "best_model.txt",
+                checksum=best_model_json.get("checksum"),
             )
 
         with open(BEST_MODEL_txt_path, "r") as f:
@@ -1522,9 +2450,11 @@ class Zoo_Model:
         logger.info(f"URLs to download: {download_dict}")
         # if any files are not found locally download them asynchronous
         if download_dict != {}:
-            download_status = downloads.download_url_dict(download_dict)
-            if download_status == False:
-                raise Exception("Download failed")
+            downloads.download_files(
+                download_dict,
+                checksums=get_file_checksums(available_files, model_path),
+                desc=f"Downloading {model_id}",
+            )
 
     def download_ensemble(
         self, available_files: List[dict], model_path: str, model_id: str
@@ -1587,9 +2517,11 @@ class Zoo_Model:
         logger.info(f"download_dict: {download_dict}")
         # if any files are not found locally download them asynchronous
         if download_dict != {}:
-            download_status = downloads.download_url_dict(download_dict)
-            if download_status == False:
-                raise Exception("Download failed")
+            downloads.download_files(
+                download_dict,
+                checksums=get_file_checksums(available_files, model_path),
+                desc=f"Downloading {model_id}",
+            )
 
     def download_model(
         self, model_choice: str, model_id: str, model_path: str = None
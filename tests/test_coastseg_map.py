@@ -166,6 +166,15 @@ def test_save_config(coastseg_map_with_selected_roi_layer, tmp_path):
     expected_config_geojson_path = tmp_path / "config_gdf.geojson"
     assert expected_config_geojson_path.exists()
 
+def test_save_config_output_format(coastseg_map_with_selected_roi_layer, tmp_path):
+    """tests if save_config saves config_gdf in the output format set in the settings"""
+    actual_coastsegmap = coastseg_map_with_selected_roi_layer
+    actual_coastsegmap.set_settings(output_format="flatgeobuf")
+    actual_coastsegmap.save_config(str(tmp_path))
+    assert (tmp_path / "config.json").exists()
+    assert (tmp_path / "config_gdf.fgb").exists()
+    assert not (tmp_path / "config_gdf.geojson").exists()
+
 @pytest.mark.parametrize('named_temp_dir', [('CoastSeg',None)], indirect=True)
 def test_save_config_empty_roi_settings(coastseg_map_with_selected_roi_layer, named_temp_dir):
     """test_save_config_empty_roi_settings tests if save configs will save both a config.json and
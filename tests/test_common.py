@@ -2236,4 +2236,172 @@ def test_convert_points_to_linestrings_not_enough_pts():
     linestrings_gdf = convert_points_to_linestrings(gdf, output_crs=output_crs)
 
     # Check the result
-    assert len(linestrings_gdf) == 0
\ No newline at end of file
+    assert len(linestrings_gdf) == 0
+
+def test_get_transect_points_dict_multilinestrings():
+    transects = gpd.GeoDataFrame(
+        {"id": ["a", "b", 3]},
+        geometry=[
+            LineString([(0, 0), (1, 1)]),
+            MultiLineString([[(0, 0), (2, 2)], [(5, 5), (6, 6), (7, 7)]]),
+            LineString([(3, 3), (4, 4)]),
+        ],
+    )
+    transects_dict = common.get_transect_points_dict(transects)
+    assert list(transects_dict.keys()) == ["a", "b", "3"]
+    np.testing.assert_array_equal(transects_dict["a"], [[0, 0], [1, 1]])
+    # the last linestring of an exploded multilinestring is kept
+    np.testing.assert_array_equal(transects_dict["b"], [[5, 5], [6, 6], [7, 7]])
+    np.testing.assert_array_equal(transects_dict["3"], [[3, 3], [4, 4]])
+    assert common.get_transect_points_dict(transects.iloc[:0]) == {}
+
+
+def test_add_shore_points_to_timeseries():
+    transects = gpd.GeoDataFrame(
+        {"id": ["1", "11"]},
+        geometry=[
+            LineString([(-117.45, 33.25), (-117.44, 33.25)]),
+            LineString([(-117.45, 33.26), (-117.45, 33.27)]),
+        ],
+        crs="EPSG:4326",
+    )
+    timeseries_data = pd.DataFrame(
+        {
+            "dates": ["2020-01-01", "2020-01-01", "2020-02-01", "2020-02-01"],
+            "transect_id": ["1", "11", "1", "missing"],
+            "cross_distance": [100.0, 50.0, 0.0, 10.0],
+        }
+    )
+    result = common.add_shore_points_to_timeseries(timeseries_data, transects)
+
+    # compute the expected points by moving along each transect in UTM
+    utm_crs = transects.estimate_utm_crs()
+    transects_utm = transects.to_crs(utm_crs)
+    expected = []
+    for transect_id, distance in [("1", 100.0), ("11", 50.0), ("1", 0.0)]:
+        line = transects_utm[transects_utm["id"] == transect_id].geometry.iloc[0]
+        expected.append(line.interpolate(distance))
+    expected = gpd.GeoSeries(expected, crs=utm_crs).to_crs("EPSG:4326")
+
+    np.testing.assert_allclose(result["shore_x"][:3], expected.x, atol=1e-9)
+    np.testing.assert_allclose(result["shore_y"][:3], expected.y, atol=1e-9)
+    # transect ids are matched exactly and rows without a transect are NaN
+    assert np.isnan(result["shore_x"].iloc[3])
+    assert np.isnan(result["shore_y"].iloc[3])
+
+
+def test_create_complete_line_string_orders_nearest_points():
+    points = np.array([[0, 0], [3, 0], [1, 0], [2, 0], [1, 0], [10, 0], [-1, 0]])
+    line = common.create_complete_line_string(points)
+    # starts at the smallest unique point and always moves to the nearest unvisited point
+    assert list(line.coords) == [(-1, 0), (0, 0), (1, 0), (2, 0), (3, 0), (10, 0)]
+    assert common.create_complete_line_string(np.empty((0, 2))) is None
+
+
+def test_order_linestrings_gdf():
+    gdf = gpd.GeoDataFrame(
+        {"date": ["2020-01-01", "2020-02-01", "2020-03-01"]},
+        geometry=[
+            LineString([(0, 0), (2, 0), (1, 0)]),
+            LineString([(5, 5), (5, 5)]),
+            LineString([(0, 1), (0, 3), (0, 2)]),
+        ],
+        crs="epsg:4326",
+    )
+    result = common.order_linestrings_gdf(gdf, gdf["date"])
+    assert list(result.geometry.iloc[0].coords) == [(0, 0), (1, 0), (2, 0)]
+    # a line with a single unique point can't be made into a LineString
+    assert result.geometry.iloc[1] is None
+    assert list(result.geometry.iloc[2].coords) == [(0, 1), (0, 2), (0, 3)]
+    assert list(result["date"]) == list(gdf["date"])
+
+
+def test_intersect_with_buffered_transects():
+    transects = gpd.GeoDataFrame(
+        {"id": ["1", "2"]},
+        geometry=[LineString([(0, 0), (0, 10)]), LineString([(5, 0), (5, 10)])],
+        crs="epsg:32610",
+    )
+    points = gpd.GeoDataFrame(
+        {"transect_id": ["1", "1", "2", "2", "3"]},
+        geometry=[Point(0, 5), Point(1, 5), Point(5, 2), Point(0, 2), Point(0, 1)],
+        crs="epsg:32610",
+    )
+    filtered, dropped_rows = common.intersect_with_buffered_transects(
+        points, transects
+    )
+    assert list(filtered.index) == [0, 2]
+    # points off their own transect or without a transect are dropped
+    assert list(dropped_rows.index) == [1, 3, 4]
+
+
+def test_filter_dropped_points_out_of_timeseries():
+    timeseries_df = pd.DataFrame(
+        {
+            "dates": pd.to_datetime(["2020-01-01", "2020-02-01", "2020-03-01"], utc=True),
+            "1": [1.0, 2.0, 3.0],
+            "2": [4.0, 5.0, 6.0],
+        }
+    )
+    dropped_points_df = pd.DataFrame(
+        {
+            "dates": pd.to_datetime(
+                ["2020-01-01", "2020-03-01", "2020-03-01", "2020-02-01"], utc=True
+            ),
+            "transect_id": ["1", "1", "2", "missing"],
+        }
+    )
+    result = common.filter_dropped_points_out_of_timeseries(
+        timeseries_df, dropped_points_df
+    )
+    assert list(result.columns) == ["dates", "1", "2"]
+    pd.testing.assert_series_equal(result["dates"], timeseries_df["dates"])
+    np.testing.assert_array_equal(result["1"], [np.nan, 2.0, np.nan])
+    np.testing.assert_array_equal(result["2"], [4.0, 5.0, np.nan])
+
+
+def test_get_cached_metadata(tmp_path):
+    from coastsat import SDS_download
+
+    sitename = "ID_1_datetime01-01-24__12_00_00"
+    filenames = {
+        "L8": ["2020-01-01-10-00-00_L8_ID_1_ms.tif", "2021-06-01-10-00-00_L8_ID_1_ms.tif"],
+        "S2": ["2020-03-01-10-00-00_S2_ID_1_ms.tif"],
+    }
+    for satname, sat_filenames in filenames.items():
+        meta_dir = tmp_path / sitename / satname / "meta"
+        meta_dir.mkdir(parents=True)
+        for filename in sat_filenames:
+            (meta_dir / (filename[:19] + f"_{satname}_ID_1.txt")).write_text(
+                f"filename\t{filename}\nepsg\t32618\nacc_georef\t5.5\n"
+                "image_quality\tPASSED\nim_width\t100\nim_height\t200\n"
+            )
+    inputs = {
+        "sitename": sitename,
+        "filepath": str(tmp_path),
+        "dates": ["2019-01-01", "2021-01-01"],
+        "sat_list": ["L8", "S2", "L9"],
+    }
+
+    expected = SDS_download.get_metadata(inputs)
+    with patch(
+        "coastseg.common.read_metadata_file", wraps=common.read_metadata_file
+    ) as mock_read:
+        assert common.get_cached_metadata(inputs) == expected
+        # only the metadata files within the dates are read
+        assert mock_read.call_count == 2
+        assert expected["L8"]["filenames"] == ["2020-01-01-10-00-00_L8_ID_1_ms.tif"]
+        assert expected["L8"]["im_dimensions"] == [[200, 100]]
+
+        # the cached metadata is used when the files did not change
+        mock_read.reset_mock()
+        assert common.get_cached_metadata(inputs) == expected
+        assert mock_read.call_count == 0
+
+        # only the modified metadata file is read again
+        modified = tmp_path / sitename / "L8" / "meta" / "2020-01-01-10-00-00_L8_ID_1.txt"
+        modified.write_text(modified.read_text().replace("32618", "32619"))
+        os.utime(modified, ns=(0, 0))
+        metadata = common.get_cached_metadata(inputs)
+        assert mock_read.call_count == 1
+        assert metadata["L8"]["epsg"] == [32619]
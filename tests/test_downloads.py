@@ -0,0 +1,423 @@
+import asyncio
+import datetime
+import gzip
+import hashlib
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import aiohttp
+import pytest
+
+from coastseg import downloads
+
+
+def make_inputs(tmp_path, dates, sat_list=("L8", "S2")):
+    return {
+        "sitename": "ID_1_datetime01-01-24__12_00_00",
+        "filepath": str(tmp_path),
+        "dates": list(dates),
+        "sat_list": list(sat_list),
+        "landsat_collection": "C02",
+    }
+
+
+def fake_retrieve_images(filenames):
+    """Returns a replacement for SDS_download.retrieve_images that writes a metadata file for each of the filenames
+    within the dates of the inputs"""
+
+    def retrieve_images(inputs, **kwargs):
+        for filename in filenames:
+            satname = filename.split("_")[1]
+            date = filename[:10]
+            if satname not in inputs["sat_list"] or not (
+                inputs["dates"][0] <= date < inputs["dates"][1]
+            ):
+                continue
+            meta_dir = os.path.join(inputs["filepath"], inputs["sitename"], satname, "meta")
+            os.makedirs(meta_dir, exist_ok=True)
+            with open(os.path.join(meta_dir, filename[:19] + ".txt"), "w") as f:
+                f.write(f"filename\t{filename}\nepsg\t32618\nacc_georef\t5\n")
+
+    return retrieve_images
+
+
+def test_get_uncovered_date_ranges():
+    dates = [
+        datetime.datetime(2020, month, 1, tzinfo=datetime.timezone.utc)
+        for month in range(1, 8)
+    ]
+    covered = [(dates[1], dates[3]), (dates[2], dates[4])]
+    assert downloads.get_uncovered_date_ranges(covered, dates[0], dates[6]) == [
+        (dates[0], dates[1]),
+        (dates[4], dates[6]),
+    ]
+    assert downloads.get_uncovered_date_ranges(covered, dates[1], dates[4]) == []
+
+
+def test_retrieve_new_images_narrows_dates(tmp_path):
+    filenames = [
+        "2020-01-05-10-00-00_L8_ID_1_ms.tif",
+        "2020-02-05-10-00-00_S2_ID_1_ms.tif",
+        "2020-03-05-10-00-00_L8_ID_1_ms.tif",
+    ]
+    kwargs = {"cloud_threshold": 0.8, "months_list": [1, 2, 3]}
+    inputs = make_inputs(tmp_path, ["2020-01-01", "2020-03-01"])
+    with patch.object(
+        downloads.SDS_download,
+        "retrieve_images",
+        side_effect=fake_retrieve_images(filenames),
+    ) as mock_retrieve:
+        downloads.retrieve_new_images(inputs, **kwargs)
+        assert mock_retrieve.call_args[0][0]["dates"] == ["2020-01-01", "2020-03-01"]
+
+        # the same request is skipped
+        mock_retrieve.reset_mock()
+        downloads.retrieve_new_images(inputs, **kwargs)
+        mock_retrieve.assert_not_called()
+
+        # only the new dates are requested when the date range is extended
+        extended_inputs = make_inputs(tmp_path, ["2020-01-01", "2020-04-01"])
+        downloads.retrieve_new_images(extended_inputs, **kwargs)
+        assert mock_retrieve.call_args[0][0]["dates"] == ["2020-03-01", "2020-04-01"]
+        assert mock_retrieve.call_args[0][0]["sat_list"] == ["L8", "S2"]
+
+        # imagery retrieved with other download settings is retrieved again
+        mock_retrieve.reset_mock()
+        downloads.retrieve_new_images(extended_inputs, cloud_threshold=0.5, months_list=[1, 2, 3])
+        assert mock_retrieve.call_args[0][0]["dates"] == ["2020-01-01", "2020-04-01"]
+
+    manifest = downloads.load_download_manifest(
+        os.path.join(tmp_path, inputs["sitename"])
+    )
+    assert sorted(manifest["images"]["L8"]) == [filenames[0], filenames[2]]
+    assert list(manifest["images"]["S2"]) == [filenames[1]]
+
+
+def test_retrieve_new_images_retries_failed_downloads(tmp_path):
+    filenames = [
+        "2020-01-05-10-00-00_L8_ID_1_ms.tif",
+        "2020-01-06-10-00-00_S2_ID_1_ms.tif",
+        "2020-02-05-10-00-00_S2_ID_1_ms.tif",
+    ]
+    failed_filename = filenames[2]
+    write_metadata = fake_retrieve_images(filenames)
+    write_metadata_after_failure = fake_retrieve_images(
+        [filename for filename in filenames if filename != failed_filename]
+    )
+
+    def retrieve_images(inputs, **kwargs):
+        if mock_retrieve.call_count == 1:
+            # coastsat logs the image that failed and carries on with the other images
+            logging.getLogger(downloads.COASTSAT_DOWNLOAD_LOGGER).error(
+                f"The download for satellite S2 {failed_filename} failed due to \n HttpError 503"
+            )
+            return write_metadata_after_failure(inputs, **kwargs)
+        return write_metadata(inputs, **kwargs)
+
+    kwargs = {"cloud_threshold": 0.8, "months_list": [1, 2, 3]}
+    inputs = make_inputs(tmp_path, ["2020-01-01", "2020-03-01"])
+    with patch.object(
+        downloads.SDS_download, "retrieve_images", side_effect=retrieve_images
+    ) as mock_retrieve:
+        downloads.retrieve_new_images(inputs, **kwargs)
+        # the satellite whose image failed is retrieved again
+        downloads.retrieve_new_images(inputs, **kwargs)
+        assert mock_retrieve.call_count == 2
+        assert mock_retrieve.call_args[0][0]["sat_list"] == ["S2"]
+        assert mock_retrieve.call_args[0][0]["dates"] == ["2020-01-01", "2020-03-01"]
+        # once every image was downloaded the request is skipped
+        downloads.retrieve_new_images(inputs, **kwargs)
+        assert mock_retrieve.call_count == 2
+
+    manifest = downloads.load_download_manifest(
+        os.path.join(tmp_path, inputs["sitename"])
+    )
+    assert sorted(manifest["images"]["S2"]) == filenames[1:]
+
+
+def test_download_failure_recorder_ignores_other_threads():
+    recorder = downloads.DownloadFailureRecorder(["L8", "S2"])
+    download_logger = logging.getLogger(downloads.COASTSAT_DOWNLOAD_LOGGER)
+    download_logger.addHandler(recorder)
+    try:
+        # another ROI being retrieved in another thread
+        thread = threading.Thread(
+            target=download_logger.error, args=("The download for satellite L8 id failed due to timeout",)
+        )
+        thread.start()
+        thread.join()
+        assert recorder.failed_satellites == set()
+        download_logger.error("The download for satellite S2 id failed due to timeout")
+        assert recorder.failed_satellites == {"S2"}
+        # an error that doesn't name the satellite
+        download_logger.error("Could not save metadata for id")
+        assert recorder.failed_satellites == {"L8", "S2"}
+    finally:
+        download_logger.removeHandler(recorder)
+
+
+def test_update_download_manifest_skips_recent_dates(tmp_path):
+    inputs = make_inputs(tmp_path, ["2020-01-01", "2020-03-01"], sat_list=["L9"])
+    manifest = downloads.load_download_manifest(str(tmp_path))
+    now = datetime.datetime(2020, 2, 8, 12, tzinfo=datetime.timezone.utc)
+    manifest = downloads.update_download_manifest(manifest, inputs, {}, {}, now=now)
+    # imagery acquired in the last days may not be in Earth Engine yet
+    inputs_to_retrieve = downloads.get_inputs_to_retrieve(manifest, inputs, {})
+    assert inputs_to_retrieve["dates"] == ["2020-02-01", "2020-03-01"]
+    assert inputs["dates"] == ["2020-01-01", "2020-03-01"]
+
+
+@pytest.fixture
+def stand_in_server():
+    """A local HTTP server standing in for the servers files are downloaded from.
+    /file<n> returns a file, /flaky fails twice with a 503 before returning the file and /missing returns a 404.
+    Range requests are answered with the rest of the file. /dropped closes the connection halfway through the file the first time.
+    /gzip returns the file compressed with Content-Encoding: gzip."""
+    state = {"in_flight": 0, "max_in_flight": 0, "requests": [], "flaky_failures": 0, "ranges": [], "dropped": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            with lock:
+                state["requests"].append((self.path, time.monotonic()))
+                state["in_flight"] += 1
+                state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+            try:
+                time.sleep(0.05)
+                if self.path == "/missing":
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                if self.path == "/flaky" and state["flaky_failures"] < 2:
+                    state["flaky_failures"] += 1
+                    self.send_response(503)
+                    self.send_header("Retry-After", "0")
+                    self.end_headers()
+                    return
+                body = self.path.encode() * 1000
+                if self.path == "/gzip":
+                    body = gzip.compress(body)
+                total_size = len(body)
+                range_header = self.headers.get("Range")
+                state["ranges"].append(range_header)
+                if range_header:
+                    start = int(range_header[len("bytes="):].rstrip("-"))
+                    if start >= total_size:
+                        self.send_response(416)
+                        self.send_header("Content-Range", f"bytes */{total_size}")
+                        self.end_headers()
+                        return
+                    self.send_response(206)
+                    self.send_header("Content-Range", f"bytes {start}-{total_size - 1}/{total_size}")
+                    body = body[start:]
+                else:
+                    self.send_response(200)
+                if self.path == "/gzip":
+                    self.send_header("Content-Encoding", "gzip")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if self.path == "/dropped" and state["dropped"] == 0:
+                    state["dropped"] += 1
+                    self.wfile.write(body[: len(body) // 2])
+                    self.close_connection = True
+                    return
+                self.wfile.write(body)
+            finally:
+                with lock:
+                    state["in_flight"] -= 1
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}", state
+    server.shutdown()
+    server.server_close()
+
+
+def test_download_urls_limits_concurrency_and_retries(tmp_path, stand_in_server):
+    base_url, state = stand_in_server
+    url_dict = {str(tmp_path / f"file{i}"): f"{base_url}/file{i}" for i in range(6)}
+    url_dict[str(tmp_path / "flaky")] = f"{base_url}/flaky"
+
+    asyncio.run(downloads.download_urls(url_dict, max_concurrent=2, backoff_factor=0))
+
+    assert state["max_in_flight"] <= 2
+    # the flaky file was retried until it was downloaded
+    assert state["flaky_failures"] == 2
+    for save_path, url in url_dict.items():
+        with open(save_path, "rb") as f:
+            assert f.read() == url[len(base_url):].encode() * 1000
+    assert not any(name.endswith(".part") for name in os.listdir(tmp_path))
+
+
+def test_download_urls_rate_limits_each_host(tmp_path, stand_in_server):
+    base_url, state = stand_in_server
+    url_dict = {str(tmp_path / f"file{i}"): f"{base_url}/file{i}" for i in range(4)}
+
+    asyncio.run(
+        downloads.download_urls(url_dict, max_concurrent=4, requests_per_second=10)
+    )
+
+    request_times = sorted(request_time for _, request_time in state["requests"])
+    intervals = [b - a for a, b in zip(request_times, request_times[1:])]
+    assert min(intervals) >= 0.08
+
+
+def test_download_urls_reports_failures(tmp_path, stand_in_server):
+    base_url, state = stand_in_server
+    url_dict = {
+        str(tmp_path / "file0"): f"{base_url}/file0",
+        str(tmp_path / "missing"): f"{base_url}/missing",
+    }
+    with pytest.raises(Exception, match="1 of 2 downloads failed"):
+        asyncio.run(downloads.download_urls(url_dict, backoff_factor=0))
+    # the missing file is not retried and the other file is still downloaded
+    assert [path for path, _ in state["requests"]].count("/missing") == 1
+    assert os.path.isfile(tmp_path / "file0")
+
+
+def test_retrieve_images_for_rois(tmp_path):
+    inputs_list = [make_inputs(tmp_path / f"roi{i}", ["2020-01-01", "2020-02-01"]) for i in range(3)]
+    for i, inputs in enumerate(inputs_list):
+        inputs["sitename"] = f"ID_{i}"
+    attempts = {}
+
+    def retrieve_new_images(inputs, use_manifest=True, **kwargs):
+        attempts[inputs["sitename"]] = attempts.get(inputs["sitename"], 0) + 1
+        # ID_1 fails the first time and ID_2 always fails
+        if inputs["sitename"] == "ID_2" or (
+            inputs["sitename"] == "ID_1" and attempts["ID_1"] == 1
+        ):
+            raise Exception("Too many concurrent aggregations")
+
+    with patch.object(downloads, "retrieve_new_images", side_effect=retrieve_new_images):
+        failures = downloads.retrieve_images_for_rois(
+            inputs_list, max_concurrent=2, requests_per_second=None, max_retries=1, backoff_factor=0
+        )
+    assert attempts == {"ID_0": 1, "ID_1": 2, "ID_2": 2}
+    assert list(failures.keys()) == ["ID_2"]
+
+
+def test_get_backoff_delay():
+    assert [downloads.get_backoff_delay(attempt, 2) for attempt in range(1, 5)] == [2, 4, 8, 16]
+    assert downloads.get_backoff_delay(10, 2, max_delay=60) == 60
+    assert downloads.get_backoff_delay(1, 2, retry_after=5) == 5
+
+
+def test_download_files_resumes_interrupted_download(tmp_path, stand_in_server):
+    base_url, state = stand_in_server
+    save_path = str(tmp_path / "dropped")
+    expected = b"/dropped" * 1000
+    checksum = "md5:" + hashlib.md5(expected).hexdigest()
+
+    downloads.download_files(
+        {save_path: f"{base_url}/dropped"},
+        checksums={save_path: checksum},
+        backoff_factor=0,
+    )
+
+    with open(save_path, "rb") as f:
+        assert f.read() == expected
+    # the second request only asked for the part of the file that was missing
+    assert state["ranges"] == [None, f"bytes={len(expected) // 2}-"]
+    assert not os.path.exists(save_path + ".part")
+
+
+def test_download_files_completes_existing_part_file(tmp_path, stand_in_server):
+    base_url, state = stand_in_server
+    save_path = str(tmp_path / "file0")
+    expected = b"/file0" * 1000
+    # a complete .part file left behind by an interrupted run
+    with open(save_path + ".part", "wb") as f:
+        f.write(expected)
+
+    downloads.download_url_to_file(f"{base_url}/file0", save_path)
+
+    with open(save_path, "rb") as f:
+        assert f.read() == expected
+    assert state["ranges"] == [f"bytes={len(expected)}-"]
+
+
+def test_download_files_verifies_checksum(tmp_path, stand_in_server):
+    base_url, state = stand_in_server
+    save_path = str(tmp_path / "file0")
+    with pytest.raises(Exception, match="checksum"):
+        downloads.download_files(
+            {save_path: f"{base_url}/file0"},
+            checksums={save_path: "md5:" + hashlib.md5(b"other").hexdigest()},
+            max_retries=1,
+            backoff_factor=0,
+        )
+    # the corrupt file is downloaded again from the start and never saved
+    assert state["ranges"] == [None, None]
+    assert os.listdir(tmp_path) == []
+
+
+def test_parse_checksum():
+    assert downloads.parse_checksum("md5:ABC123") == ("md5", "abc123")
+    assert downloads.parse_checksum("abc123") == ("md5", "abc123")
+    assert downloads.parse_checksum(None) == (None, None)
+
+
+def test_download_files_decompresses_content_encoding(tmp_path, stand_in_server):
+    base_url, state = stand_in_server
+    save_path = str(tmp_path / "gzip")
+    expected = b"/gzip" * 1000
+    checksum = "md5:" + hashlib.md5(expected).hexdigest()
+
+    downloads.download_files(
+        {save_path: f"{base_url}/gzip"},
+        checksums={save_path: checksum},
+        max_retries=0,
+    )
+
+    # the decompressed file is larger than the Content-Length but is not an error
+    with open(save_path, "rb") as f:
+        assert f.read() == expected
+
+
+class ByteCounter:
+    """Stands in for the tqdm progress bar and counts the bytes it is updated with"""
+
+    def __init__(self):
+        self.n = 0
+
+    def update(self, n):
+        self.n += n
+
+
+def test_download_url_counts_each_byte_once(tmp_path, stand_in_server):
+    base_url, state = stand_in_server
+    save_path = str(tmp_path / "dropped")
+    expected = b"/dropped" * 1000
+    # the first quarter of the file was downloaded by an earlier run
+    with open(save_path + ".part", "wb") as f:
+        f.write(expected[: len(expected) // 4])
+    progress_bar = ByteCounter()
+
+    async def download():
+        async with aiohttp.ClientSession() as session:
+            await downloads.download_url(
+                session,
+                f"{base_url}/dropped",
+                save_path,
+                asyncio.Semaphore(1),
+                downloads.HostRateLimiter(),
+                backoff_factor=0,
+                progress_bar=progress_bar,
+            )
+
+    asyncio.run(download())
+
+    with open(save_path, "rb") as f:
+        assert f.read() == expected
+    # the connection was dropped once so the download was resumed twice
+    assert len(state["ranges"]) == 2
+    assert progress_bar.n == len(expected)
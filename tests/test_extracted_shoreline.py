@@ -1,3 +1,4 @@
+import os
 import pytest
 from coastseg import extracted_shoreline
 import geopandas as gpd
@@ -79,3 +80,323 @@ def test_init_invalid_inputs(valid_roi_settings, valid_shoreline_gdf, valid_sett
         extracted_shorelines.create_extracted_shorelines(
             roi_id, shoreline, roi_settings, {}
         )
+
+
+def test_process_satellites_keeps_image_order(monkeypatch):
+    import time
+
+    metadata = {
+        "L8": {
+            "filenames": ["2020-01-01-00-00-00_L8_ID_1.tif", "2020-01-02-00-00-00_L8_ID_1.tif", "2020-01-03-00-00-00_L8_ID_1.tif"],
+            "dates": ["2020-01-01", "2020-01-02", "2020-01-03"],
+            "epsg": [32618, 32618, 32618],
+            "acc_georef": [5.0, 6.0, 7.0],
+        },
+        "S2": {
+            "filenames": ["2020-01-04-00-00-00_S2_ID_1.tif", "2020-01-05-00-00-00_S2_ID_1.tif"],
+            "dates": ["2020-01-04", "2020-01-05"],
+            "epsg": [32618, 32618],
+            "acc_georef": ["PASSED", "PASSED"],
+        },
+        "L9": {"filenames": [], "dates": [], "epsg": [], "acc_georef": []},
+    }
+    settings = {"inputs": {"landsat_collection": "C02", "sitename": "ID_1", "filepath": "data"}, "min_length_sl": 100}
+
+    def mock_process_satellite_image(filename, *args):
+        # the first images finish last
+        time.sleep(0.05 if filename.startswith("2020-01-01") else 0.0)
+        if filename.startswith("2020-01-02"):
+            return None
+        return {"shorelines": np.array([[float(filename[8:10]), 0.0]]), "cloud_cover": 0.1}
+
+    monkeypatch.setattr(extracted_shoreline, "get_filepath", lambda inputs, satname: "data")
+    monkeypatch.setattr(extracted_shoreline, "process_satellite_image", mock_process_satellite_image)
+
+    output = extracted_shoreline.process_satellites(
+        ["L8", "S2", "L9"], settings, metadata, "session", num_workers=3, scheduler="threads"
+    )
+
+    assert output["L8"]["idx"] == [0, 2]
+    assert output["L8"]["dates"] == ["2020-01-01", "2020-01-03"]
+    assert output["L8"]["geoaccuracy"] == [5.0, 7.0]
+    assert output["L8"]["filename"] == ["2020-01-01-00-00-00_L8_ID_1.tif", "2020-01-03-00-00-00_L8_ID_1.tif"]
+    assert [shoreline[0, 0] for shoreline in output["L8"]["shorelines"]] == [1.0, 3.0]
+    assert output["S2"]["idx"] == [0, 1]
+    assert output["L9"]["idx"] == []
+
+
+def test_get_executor_invalid_scheduler():
+    with pytest.raises(ValueError):
+        extracted_shoreline.get_executor("invalid")
+
+
+def test_create_npz_index_matches_find_matching_npz(tmp_path):
+    good_folder = tmp_path / "good"
+    good_folder.mkdir()
+    for name in ["2020-01-01-00-00-00_RGB_L8.npz", "2020-01-02-00-00-00_RGB_S2.npz"]:
+        (good_folder / name).touch()
+    for name in [
+        "2020-01-01-00-00-00_RGB_L8.npz",
+        "2020-01-03-00-00-00_RGB_L9.npz",
+        "2020-01-03-00-00-00_RGB_L9.jpg",
+    ]:
+        (tmp_path / name).touch()
+
+    npz_index = extracted_shoreline.create_npz_index(
+        [str(good_folder), str(tmp_path), str(tmp_path / "missing")]
+    )
+    assert len(npz_index) == 3
+
+    for filename in [
+        "2020-01-01-00-00-00_L8_ID_1_ms.tif",
+        "2020-01-02-00-00-00_S2_ID_1_ms.tif",
+        "2020-01-03-00-00-00_L9_ID_1_ms.tif",
+        "2020-01-04-00-00-00_L8_ID_1_ms.tif",
+    ]:
+        expected = extracted_shoreline.find_matching_npz(filename, str(good_folder))
+        if expected is None:
+            expected = extracted_shoreline.find_matching_npz(filename, str(tmp_path))
+        assert extracted_shoreline.find_npz_in_index(filename, npz_index) == expected
+
+    # the npz files in the good folder take precedence
+    assert extracted_shoreline.find_npz_in_index(
+        "2020-01-01-00-00-00_L8_ID_1_ms.tif", npz_index
+    ) == str(good_folder / "2020-01-01-00-00-00_RGB_L8.npz")
+
+
+def test_load_image_labels_and_merged_labels(tmp_path):
+    grey_label = np.array([[0, 1, 2, 3], [3, 2, 1, 0]])
+    npz_file = str(tmp_path / "2020-01-01-00-00-00_RGB_L8.npz")
+    np.savez_compressed(npz_file, grey_label=grey_label)
+
+    all_labels, merged_labels = extracted_shoreline.load_image_labels_and_merged_labels(
+        npz_file, class_indices=[0, 1]
+    )
+    np.testing.assert_array_equal(all_labels, extracted_shoreline.load_image_labels(npz_file))
+    np.testing.assert_array_equal(
+        merged_labels,
+        extracted_shoreline.load_merged_image_labels(npz_file, class_indices=[0, 1]),
+    )
+    assert merged_labels.dtype == np.uint8
+
+    with pytest.raises(ValueError):
+        extracted_shoreline.load_image_labels_and_merged_labels(str(tmp_path / "missing.npz"))
+
+
+def test_merge_classes():
+    im_labels = np.array([[0, 1, 2], [3, 2, 0]])
+    merged = extracted_shoreline.merge_classes(im_labels, [0, 2])
+    np.testing.assert_array_equal(merged, np.array([[1, 0, 1], [0, 1, 1]]))
+
+
+def test_get_figure_mode():
+    assert extracted_shoreline.get_figure_mode({}) == "inline"
+    assert extracted_shoreline.get_figure_mode({"save_figure": False}) == "off"
+    assert (
+        extracted_shoreline.get_figure_mode({"figure_mode": "deferred"}) == "deferred"
+    )
+    with pytest.raises(ValueError):
+        extracted_shoreline.get_figure_mode({"figure_mode": "sometimes"})
+
+
+def test_render_deferred_detection_figures(tmp_path):
+    im_RGB = np.random.rand(20, 30, 3)
+    cloud_mask = np.zeros((20, 30), dtype=bool)
+    cloud_mask[0, 0] = True
+    figure_data = {
+        "im_RGB": im_RGB,
+        "cloud_mask": cloud_mask,
+        "merged_labels": np.zeros((20, 30), dtype=int),
+        "all_labels": np.arange(20 * 30).reshape(20, 30) % 4,
+        "pixelated_shoreline": np.array([[1.0, 2.0], [3.0, 4.0]]),
+        "im_ref_buffer": None,
+        "shoreline_extraction_area": [np.array([[0, 0], [5, 0], [5, 5], [0, 0]])],
+    }
+    class_mapping = {0: "water", 1: "whitewater", 2: "sediment", 3: "other"}
+    data_path = tmp_path / extracted_shoreline.DETECTION_FIGURE_DATA_DIR
+    for date in ["2020-01-01-10-00-00", "2021-06-01-10-00-00"]:
+        extracted_shoreline.save_detection_figure_data(
+            figure_data, str(data_path), "site", date, "L8", class_mapping
+        )
+
+    loaded_data, figure_info = extracted_shoreline.load_detection_figure_data(
+        str(data_path / "2020-01-01-10-00-00_L8.npz")
+    )
+    assert figure_info == {
+        "sitename": "site",
+        "date": "2020-01-01-10-00-00",
+        "satname": "L8",
+        "class_mapping": class_mapping,
+    }
+    np.testing.assert_allclose(loaded_data["im_RGB"], im_RGB, atol=1 / 255)
+    np.testing.assert_array_equal(loaded_data["all_labels"], figure_data["all_labels"])
+    assert loaded_data["im_ref_buffer"] is None
+    assert len(loaded_data["shoreline_extraction_area"]) == 1
+    np.testing.assert_array_equal(
+        loaded_data["shoreline_extraction_area"][0],
+        figure_data["shoreline_extraction_area"][0],
+    )
+
+    jpg_files = extracted_shoreline.render_detection_figures(
+        str(tmp_path), dates=["2021"], scheduler="threads"
+    )
+    assert jpg_files == [
+        str(tmp_path / "jpg_files" / "detection" / "2021-06-01-10-00-00_L8.jpg")
+    ]
+    assert os.path.exists(jpg_files[0])
+
+
+def test_get_detection_figure_template_is_reused():
+    class_mapping = {0: "water", 1: "other"}
+    template = extracted_shoreline.get_detection_figure_template(
+        (20, 30), "L8", class_mapping
+    )
+    assert (
+        extracted_shoreline.get_detection_figure_template((20, 30), "L8", class_mapping)
+        is template
+    )
+    assert (
+        extracted_shoreline.get_detection_figure_template((40, 30), "L8", class_mapping)
+        is not template
+    )
+
+
+def test_get_extracted_shorelines_npz_path(tmp_path):
+    assert extracted_shoreline.get_extracted_shorelines_npz_path(str(tmp_path)) is None
+    json_path = tmp_path / "extracted_shorelines_dict.json"
+    npz_path = tmp_path / "extracted_shorelines_dict.npz"
+    json_path.write_text("{}")
+    npz_path.write_bytes(b"")
+    os.utime(json_path, (1000, 1000))
+    os.utime(npz_path, (2000, 2000))
+    assert extracted_shoreline.get_extracted_shorelines_npz_path(str(tmp_path)) == str(
+        npz_path
+    )
+    # a json file edited after the npz file was saved is used instead
+    os.utime(json_path, (3000, 3000))
+    assert extracted_shoreline.get_extracted_shorelines_npz_path(str(tmp_path)) is None
+
+
+def test_get_shoreline_settings_hash():
+    settings = {
+        "cloud_thresh": 0.5,
+        "reference_shoreline": np.array([[1.0, 2.0, 0.0]]),
+        "figure_mode": "inline",
+        "inputs": {"sitename": "ID_1", "dates": ["2020-01-01", "2021-01-01"]},
+    }
+    settings_hash = extracted_shoreline.get_shoreline_settings_hash(settings)
+    # the dates and the detection figures don't change the extracted shorelines
+    same_settings = dict(
+        settings,
+        figure_mode="off",
+        inputs={"sitename": "ID_1", "dates": ["2020-01-01", "2022-01-01"]},
+    )
+    assert extracted_shoreline.get_shoreline_settings_hash(same_settings) == settings_hash
+    different_settings = dict(settings, cloud_thresh=0.6)
+    assert (
+        extracted_shoreline.get_shoreline_settings_hash(different_settings)
+        != settings_hash
+    )
+
+
+def test_incremental_extraction_helpers(tmp_path):
+    import datetime
+    from coastseg.file_utilities import to_file
+
+    dates = [
+        datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc),
+        datetime.datetime(2020, 3, 1, tzinfo=datetime.timezone.utc),
+    ]
+    previous = {
+        "dates": dates,
+        "shorelines": [np.array([[0.0, 1.0], [1.0, 1.0]]), np.array([[0.0, 2.0], [1.0, 2.0]])],
+        "filename": ["a.tif", "c.tif"],
+        "satname": ["L8", "L8"],
+    }
+    to_file(previous, str(tmp_path / "extracted_shorelines_dict.json"))
+    to_file(
+        {"settings_hash": "abc", "processed_filenames": ["a.tif", "b.tif", "c.tif"]},
+        str(tmp_path / "shoreline_settings.json"),
+    )
+    # shorelines extracted with other settings are not reused
+    assert extracted_shoreline.get_previous_extraction(str(tmp_path), "xyz") == ({}, [])
+    loaded, processed = extracted_shoreline.get_previous_extraction(str(tmp_path), "abc")
+    assert processed == ["a.tif", "b.tif", "c.tif"]
+    assert loaded["dates"] == dates
+    np.testing.assert_array_equal(loaded["shorelines"][1], previous["shorelines"][1])
+
+    metadata = {
+        "L8": {
+            "filenames": ["a.tif", "b.tif", "c.tif", "d.tif"],
+            "epsg": [1, 2, 3, 4],
+        }
+    }
+    metadata = extracted_shoreline.remove_processed_images_from_metadata(metadata, processed)
+    assert metadata == {"L8": {"filenames": ["d.tif"], "epsg": [4]}}
+
+    new = {
+        "dates": [datetime.datetime(2020, 2, 1, tzinfo=datetime.timezone.utc)],
+        "shorelines": [np.array([[0.0, 3.0], [1.0, 3.0]])],
+        "filename": ["d.tif"],
+        "satname": ["S2"],
+    }
+    merged = extracted_shoreline.merge_extracted_shorelines_dicts(loaded, new)
+    assert merged["filename"] == ["a.tif", "d.tif", "c.tif"]
+    assert merged["satname"] == ["L8", "S2", "L8"]
+
+
+def test_compute_transects_incrementally(tmp_path):
+    import datetime
+    from coastseg import common
+    from coastseg.file_utilities import to_file
+    from shapely.geometry import LineString
+    from unittest.mock import patch
+
+    settings = {
+        "along_dist": 25,
+        "min_points": 1,
+        "max_std": 15,
+        "max_range": 30,
+        "min_chainage": -100,
+        "multiple_inter": "nan",
+        "prc_multiple": 0.1,
+    }
+    transects_gdf = gpd.GeoDataFrame(
+        {"id": ["t1", "t2"]},
+        geometry=[LineString([(0, 0), (0, 100)]), LineString([(50, 0), (50, 100)])],
+        crs="EPSG:32618",
+    )
+    dates = [
+        datetime.datetime(2020, month, 1, tzinfo=datetime.timezone.utc)
+        for month in range(1, 4)
+    ]
+    extracted_shorelines = {
+        "dates": dates,
+        "shorelines": [
+            np.array([[x, 10.0 * (i + 1)] for x in range(-10, 61, 5)], dtype=float)
+            for i in range(3)
+        ],
+    }
+    expected = extracted_shoreline.compute_transects_from_roi(
+        extracted_shorelines, transects_gdf, settings
+    )
+    # save the intersections of the first and last shorelines as if they were computed before
+    previous_dates = [dates[0], dates[2]]
+    to_file(
+        {key: values[[0, 2]] for key, values in expected.items()},
+        str(tmp_path / "transects_cross_distances.json"),
+    )
+    to_file(common.get_transect_settings(settings), str(tmp_path / "transects_settings.json"))
+
+    compute_transects = extracted_shoreline.compute_transects_from_roi
+    with patch.object(
+        extracted_shoreline, "compute_transects_from_roi", wraps=compute_transects
+    ) as mock_compute:
+        cross_distance = extracted_shoreline.compute_transects_incrementally(
+            extracted_shorelines, transects_gdf, settings, previous_dates, str(tmp_path)
+        )
+        # only the intersections of the new shoreline are computed
+        assert len(mock_compute.call_args[0][0]["shorelines"]) == 1
+    assert cross_distance.keys() == expected.keys()
+    for key in expected:
+        np.testing.assert_allclose(cross_distance[key], expected[key])
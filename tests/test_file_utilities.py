@@ -171,3 +171,83 @@ def test_read_invalid_json_file(tmpdir):
     # Attempt to read the invalid JSON file
     with pytest.raises(json.JSONDecodeError):
         read_json_file(str(json_file), raise_error=True)
+
+
+def test_extracted_shorelines_npz_matches_json(tmp_path):
+    extracted_shorelines_dict = {
+        "dates": [
+            datetime.datetime(2020, 1, 1, 10, 0, tzinfo=datetime.timezone.utc),
+            datetime.datetime(2020, 2, 1, 10, 0, tzinfo=datetime.timezone.utc),
+            datetime.datetime(2020, 3, 1, 10, 0, tzinfo=datetime.timezone.utc),
+        ],
+        "shorelines": [
+            np.array([[1.0, 2.0], [3.0, 4.0]]),
+            np.empty((0, 2)),
+            np.array([[5.0, 6.0], [7.0, 8.0], [9.0, 10.0]]),
+        ],
+        "filename": ["a.tif", "b.tif", "c.tif"],
+        "cloud_cover": [0.1, 0.2, 0.3],
+        "geoaccuracy": [5.2, "PASSED", 6.1],
+        "idx": [0, 4, 7],
+        "satname": ["L8", "S2", "L9"],
+    }
+    json_path = str(tmp_path / "extracted_shorelines_dict.json")
+    npz_path = str(tmp_path / "extracted_shorelines_dict.npz")
+    to_file(extracted_shorelines_dict, json_path)
+    file_utilities.save_extracted_shorelines_npz(extracted_shorelines_dict, npz_path)
+
+    from_json = file_utilities.load_data_from_json(json_path)
+    for mmap_mode in [None, "r"]:
+        from_npz = file_utilities.load_extracted_shorelines_npz(
+            npz_path, mmap_mode=mmap_mode
+        )
+        assert list(from_npz.keys()) == list(from_json.keys())
+        for key in from_json:
+            if key == "shorelines":
+                assert len(from_npz[key]) == len(from_json[key])
+                for npz_shoreline, json_shoreline in zip(from_npz[key], from_json[key]):
+                    np.testing.assert_array_equal(npz_shoreline, json_shoreline)
+            else:
+                assert from_npz[key] == from_json[key]
+    # the shoreline points are memory mapped
+    from_npz = file_utilities.load_extracted_shorelines_npz(npz_path, mmap_mode="r")
+    assert isinstance(from_npz["shorelines"][0], np.memmap)
+
+
+@pytest.mark.parametrize("output_format", ["geojson", "geoparquet", "flatgeobuf"])
+def test_write_and_find_geodata_file(tmp_path, output_format):
+    if output_format == "geoparquet":
+        pytest.importorskip("pyarrow")
+    gdf = gpd.GeoDataFrame(
+        {"geometry": [Point(1, 2), Point(3, 4)], "value": ["a", "b"]}, crs="EPSG:4326"
+    )
+    filepath = str(tmp_path / "extracted_shorelines_points.geojson")
+    assert file_utilities.find_geodata_file(filepath) is None
+
+    saved_path = file_utilities.write_geodata_file(gdf, filepath, output_format)
+    assert saved_path.endswith(file_utilities.OUTPUT_FORMATS[output_format][0])
+    assert file_utilities.find_geodata_file(filepath) == saved_path
+    assert file_utilities.get_geodata_file_format(saved_path) == output_format
+
+    # flatgeobuf files are spatially indexed so the rows may be reordered
+    loaded_gdf = file_utilities.read_gpd_file(saved_path)
+    loaded_gdf = loaded_gdf.sort_values("value").reset_index(drop=True)
+    assert list(loaded_gdf["value"]) == ["a", "b"]
+    assert loaded_gdf.crs == gdf.crs
+    assert loaded_gdf.geometry.equals(gdf.geometry)
+
+
+def test_config_to_file_output_format(tmp_path):
+    gdf = gpd.GeoDataFrame({"geometry": [Point(1, 2)], "value": ["test"]})
+    file_utilities.config_to_file(gdf, str(tmp_path), output_format="flatgeobuf")
+    assert os.path.isfile(tmp_path / "config_gdf.fgb")
+    assert file_utilities.validate_config_files_exist(str(tmp_path)) is False
+    file_utilities.config_to_file({"roi_ids": []}, str(tmp_path))
+    assert file_utilities.validate_config_files_exist(str(tmp_path)) is True
+
+
+def test_get_output_format():
+    assert file_utilities.get_output_format({}) == "geojson"
+    assert file_utilities.get_output_format({"output_format": "GeoParquet"}) == "geoparquet"
+    with pytest.raises(ValueError):
+        file_utilities.get_output_format({"output_format": "shapefile"})
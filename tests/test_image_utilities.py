@@ -0,0 +1,99 @@
+import os
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from skimage.io import imread, imsave
+
+from coastseg import image_utilities
+
+
+def set_mtime(path, seconds):
+    os.utime(path, ns=(seconds * 1_000_000_000, seconds * 1_000_000_000))
+
+
+def test_is_output_up_to_date(tmp_path):
+    inputs = [tmp_path / "RGB.jpg", tmp_path / "NIR.jpg"]
+    output = tmp_path / "NDWI.jpg"
+    for path in inputs:
+        path.write_bytes(b"image")
+        set_mtime(path, 100)
+    # the output has not been made
+    assert not image_utilities.is_output_up_to_date(str(output), [str(p) for p in inputs])
+    output.write_bytes(b"image")
+    set_mtime(output, 200)
+    assert image_utilities.is_output_up_to_date(str(output), [str(p) for p in inputs])
+    # an output with the same modification time as its inputs is up to date
+    set_mtime(output, 100)
+    assert image_utilities.is_output_up_to_date(str(output), [str(p) for p in inputs])
+    # one of the inputs was downloaded again
+    set_mtime(inputs[1], 300)
+    assert not image_utilities.is_output_up_to_date(str(output), [str(p) for p in inputs])
+
+
+def test_create_infrared_index_image(tmp_path):
+    rng = np.random.default_rng(0)
+    RGB_file, infrared_file, output_file = (
+        str(tmp_path / name) for name in ("RGB.png", "NIR.png", "NDWI.jpg")
+    )
+    imsave(RGB_file, rng.integers(1, 255, (20, 30, 3), dtype=np.uint8), check_contrast=False)
+    imsave(infrared_file, rng.integers(1, 255, (20, 30), dtype=np.uint8), check_contrast=False)
+
+    assert image_utilities.create_infrared_index_image(RGB_file, infrared_file, output_file) == output_file
+    output = imread(output_file)
+    assert output.shape == (20, 30) and output.dtype == np.uint8
+
+
+def test_create_five_band_file(tmp_path):
+    rng = np.random.default_rng(0)
+    files = []
+    for name, shape in (("RGB.png", (20, 30, 3)), ("MNDWI.png", (20, 30)), ("NDWI.png", (20, 30))):
+        files.append(str(tmp_path / name))
+        imsave(files[-1], rng.integers(0, 255, shape, dtype=np.uint8), check_contrast=False)
+    output_file = str(tmp_path / "five_band.npz")
+
+    image_utilities.create_five_band_file(files, output_file)
+
+    data = np.load(output_file)
+    assert data["arr_0"].shape == (20, 30, 5)
+    assert data["num_bands"] == 5
+    assert list(data["files"]) == ["RGB.png", "MNDWI.png", "NDWI.png"]
+
+
+def test_create_infrared_index_image_writes_complete_files(tmp_path):
+    rng = np.random.default_rng(0)
+    RGB_file, infrared_file, output_file = (
+        str(tmp_path / name) for name in ("RGB.png", "NIR.png", "NDWI.jpg")
+    )
+    imsave(RGB_file, rng.integers(1, 255, (20, 30, 3), dtype=np.uint8), check_contrast=False)
+    imsave(infrared_file, rng.integers(1, 255, (20, 30), dtype=np.uint8), check_contrast=False)
+
+    # the worker is interrupted while the image is written
+    with patch.object(image_utilities.skimage.io, "imsave", side_effect=KeyboardInterrupt):
+        with pytest.raises(KeyboardInterrupt):
+            image_utilities.create_infrared_index_image(RGB_file, infrared_file, output_file)
+    assert sorted(os.listdir(tmp_path)) == ["NIR.png", "RGB.png"]
+
+    with patch.object(
+        image_utilities.skimage.io, "imsave", wraps=image_utilities.skimage.io.imsave
+    ) as mock_imsave:
+        image_utilities.create_infrared_index_image(RGB_file, infrared_file, output_file)
+    assert sorted(os.listdir(tmp_path)) == ["NDWI.jpg", "NIR.png", "RGB.png"]
+    # the jpg is the same as one saved straight to its final path
+    expected_file = str(tmp_path / "expected.jpg")
+    imsave(expected_file, mock_imsave.call_args[0][1], check_contrast=False, quality=100)
+    with open(expected_file, "rb") as expected, open(output_file, "rb") as actual:
+        assert expected.read() == actual.read()
+
+
+def test_create_five_band_file_writes_complete_files(tmp_path):
+    files = []
+    for name in ("RGB.png", "MNDWI.png", "NDWI.png"):
+        files.append(str(tmp_path / name))
+        imsave(files[-1], np.zeros((4, 4), dtype=np.uint8), check_contrast=False)
+    output_file = str(tmp_path / "five_band.npz")
+
+    with patch.object(image_utilities.np, "savez_compressed", side_effect=KeyboardInterrupt):
+        with pytest.raises(KeyboardInterrupt):
+            image_utilities.create_five_band_file(files, output_file)
+    assert not any(name.startswith("five_band") for name in os.listdir(tmp_path))
@@ -1,3 +1,4 @@
+import concurrent.futures
 import os
 import json
 import tempfile
@@ -8,8 +9,11 @@ from shapely.geometry import Polygon
 from coastseg.tide_correction import save_transect_settings, get_seaward_points_gdf
 from coastseg.tide_correction import load_regions_from_geojson
 import pandas as pd
-from coastseg.tide_correction import get_tide_predictions
+from coastseg.tide_correction import get_tide_predictions, model_tides_for_transects
+from coastseg.tide_correction import get_tide_constituents, get_constituents_cache_path
+from coastseg.tide_correction import correct_all_tides_in_parallel
 from unittest.mock import patch
+from types import SimpleNamespace
 import numpy as np
 
 def test_save_transect_settings():
@@ -235,3 +239,197 @@ def test_get_tide_predictions_valid_transect():
         assert (result['x'] == x).all(), "All 'x' values should be equal to input x"
         assert (result['y'] == y).all(), "All 'y' values should be equal to input y"
         assert (result['transect_id'] == transect_id).all(), "All 'transect_id' values should be equal to input transect_id"
+
+
+def mock_tide_constituents(lon, lat, directory, **kwargs):
+    """Returns harmonic constants that are unique to each point for the major FES constituents."""
+    constituents = ["q1", "o1", "p1", "k1", "n2", "m2", "s2", "k2"]
+    lon = np.atleast_1d(lon)
+    amp = np.outer(np.abs(lon) + 1, np.linspace(0.1, 0.8, len(constituents)))
+    ph = np.outer(np.abs(np.atleast_1d(lat)), np.linspace(10, 80, len(constituents)))
+    hc = np.ma.array(amp * np.exp(-1j * ph * np.pi / 180.0), mask=np.zeros(amp.shape, dtype=bool))
+    return hc, constituents, "FES"
+
+
+def test_model_tides_for_transects_matches_model_tides():
+    timeseries_df = pd.DataFrame(
+        {
+            "dates": pd.date_range("2021-01-01", periods=4, freq="7D", tz="UTC"),
+            "transect1": [0.5, np.nan, 0.7, 0.8],
+            "transect2": [1.5, 1.6, np.nan, 1.8],
+        }
+    )
+    x = np.array([-75.16, -75.17, -75.18])
+    y = np.array([38.12, 38.11, 38.10])
+    # transect3 has no time series data so it should be skipped
+    transect_ids = np.array(["transect1", "transect2", "transect3"])
+
+    with patch(
+        "coastseg.tide_correction.get_tide_constituents",
+        side_effect=mock_tide_constituents,
+    ) as mock_constituents:
+        result = model_tides_for_transects(
+            x, y, transect_ids, timeseries_df, "path/to/model/region0"
+        )
+        # the constituents are read once for all of the points
+        assert mock_constituents.call_count == 1
+
+        expected = pd.concat(
+            [
+                get_tide_predictions(x[0], y[0], timeseries_df, "path/to/model/region0", "transect1"),
+                get_tide_predictions(x[1], y[1], timeseries_df, "path/to/model/region0", "transect2"),
+            ],
+            ignore_index=True,
+        )
+
+    assert result.columns.tolist() == ["dates", "x", "y", "tide", "transect_id"]
+    assert len(result) == 6
+    pd.testing.assert_frame_equal(result, expected[result.columns])
+
+
+def test_model_tides_for_transects_no_matching_transects():
+    timeseries_df = pd.DataFrame(
+        {
+            "dates": pd.date_range("2021-01-01", periods=3, tz="UTC"),
+            "transect1": [0.5, 0.6, 0.7],
+        }
+    )
+    with patch("coastseg.tide_correction.get_tide_constituents") as mock_constituents:
+        result = model_tides_for_transects(
+            np.array([1.0]), np.array([2.0]), np.array(["transect3"]), timeseries_df, "path/to/model/region0"
+        )
+        assert not mock_constituents.called
+    assert result.empty
+    assert result.columns.tolist() == ["dates", "x", "y", "tide", "transect_id"]
+
+
+def test_get_tide_constituents_uses_cache(tmp_path):
+    constituents = ["q1", "o1", "p1", "k1", "n2", "m2", "s2", "k2"]
+    tide_model = SimpleNamespace(
+        format="FES",
+        constituents=constituents,
+        model_file=[],
+        type="z",
+        version="FES2014",
+        scale=1.0,
+        compressed=False,
+    )
+
+    def mock_extract_constants(lon, lat, model_files, **kwargs):
+        amp = np.ma.array(np.outer(lon + lat, np.ones(len(constituents))))
+        amp.mask = np.zeros(amp.shape, dtype=bool)
+        ph = np.ma.array(np.outer(lat, np.arange(len(constituents))))
+        return amp, ph
+
+    with patch(
+        "coastseg.tide_correction.load_tide_model", return_value=tide_model
+    ), patch(
+        "pyTMD.io.FES.extract_constants", side_effect=mock_extract_constants
+    ) as mock_extract:
+        lon = np.array([-75.1, -75.2])
+        lat = np.array([38.1, 38.2])
+        hc, names, corrections = get_tide_constituents(lon, lat, tmp_path)
+        assert mock_extract.call_count == 1
+        assert names == constituents
+        assert corrections == "FES"
+        assert os.path.exists(get_constituents_cache_path(tmp_path))
+
+        # only the point that is not in the cache is read from the tide model
+        lon = np.array([-75.3, -75.1, -75.2])
+        lat = np.array([38.3, 38.1, 38.2])
+        cached_hc, _, _ = get_tide_constituents(lon, lat, tmp_path)
+        assert mock_extract.call_count == 2
+        np.testing.assert_array_equal(mock_extract.call_args.args[0], [-75.3])
+        np.testing.assert_allclose(cached_hc[1:], hc)
+
+        # all the points are in the cache so the tide model is not read
+        all_cached_hc, _, _ = get_tide_constituents(lon, lat, tmp_path)
+        assert mock_extract.call_count == 2
+        np.testing.assert_allclose(all_cached_hc, cached_hc)
+        assert not np.ma.getmaskarray(all_cached_hc).any()
+
+        # a different interpolation method uses a different cache
+        get_tide_constituents(lon, lat, tmp_path, method="spline")
+        assert mock_extract.call_count == 3
+
+        # the cache is ignored if use_cache is False
+        get_tide_constituents(lon, lat, tmp_path, use_cache=False)
+        assert mock_extract.call_count == 4
+
+
+def test_correct_all_tides_in_parallel_isolates_failed_rois():
+    def mock_correct_tides(roi_id, *args, **kwargs):
+        if roi_id == "roi2":
+            raise FileNotFoundError("missing time series")
+        return pd.DataFrame()
+
+    # threads are used in place of processes so the mocked correct_tides is used by the workers
+    with patch(
+        "coastseg.tide_correction.correct_tides", side_effect=mock_correct_tides
+    ) as mock_correct, patch(
+        "concurrent.futures.ProcessPoolExecutor", concurrent.futures.ThreadPoolExecutor
+    ):
+        failed_rois = correct_all_tides_in_parallel(
+            ["roi1", "roi2", "roi3"],
+            "session",
+            0.0,
+            0.02,
+            "tide_model",
+            "tide_regions_map.geojson",
+            use_progress_bar=False,
+            max_workers=2,
+        )
+    assert mock_correct.call_count == 3
+    assert failed_rois == {"roi2": "missing time series"}
+
+
+def test_correct_tides_reads_geoparquet_session(tmp_path):
+    from coastseg import file_utilities
+    from coastseg.tide_correction import correct_tides
+
+    session_path = tmp_path / "sessions" / "session" / "ID_1"
+    session_path.mkdir(parents=True)
+    with open(session_path / "config.json", "w") as f:
+        json.dump({"roi_ids": ["1"]}, f)
+    transects = gpd.GeoDataFrame(
+        {
+            "id": ["t1", "t2"],
+            "type": ["transect", "transect"],
+            "geometry": [
+                LineString([(-75.195, 38.137), (-75.161, 38.124)]),
+                LineString([(-75.203, 38.141), (-75.169, 38.128)]),
+            ],
+        },
+        crs="epsg:4326",
+    )
+    # the session was saved in the geoparquet format so there is no config_gdf.geojson
+    file_utilities.config_to_file(transects, str(session_path), "geoparquet")
+    assert not os.path.exists(session_path / "config_gdf.geojson")
+    dates = ["2020-01-01 10:00:00+00:00", "2020-02-01 10:00:00+00:00"]
+    pd.DataFrame(
+        {"dates": dates, "t1": [50.0, 55.0], "t2": [60.0, 65.0]}
+    ).to_csv(session_path / "raw_transect_time_series.csv", index=False)
+
+    def mock_predict_tides(transects_gdf, timeseries_df, *args):
+        assert sorted(transects_gdf["id"]) == ["t1", "t2"]
+        return pd.DataFrame(
+            {
+                "dates": pd.to_datetime(dates * 2, utc=True),
+                "x": [-75.161] * 4,
+                "y": [38.124] * 4,
+                "tide": [0.1, 0.2, 0.3, 0.4],
+                "transect_id": ["t1", "t1", "t2", "t2"],
+            }
+        )
+
+    with patch(
+        "coastseg.core_utilities.get_base_dir", return_value=str(tmp_path)
+    ), patch(
+        "coastseg.tide_correction.predict_tides", side_effect=mock_predict_tides
+    ):
+        corrected_df = correct_tides(
+            "1", "session", 0.0, 0.1, "tide_model", "tide_regions_map.geojson", use_progress_bar=False
+        )
+
+    assert not corrected_df.empty
+    assert os.path.isfile(session_path / "tidally_corrected_transect_time_series.csv")
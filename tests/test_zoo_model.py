@@ -0,0 +1,368 @@
+import glob
+import os
+import shutil
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+import tensorflow as tf
+from doodleverse_utils.prediction_imports import do_seg
+from PIL import Image, JpegImagePlugin
+from skimage.io import imsave
+from tensorflow.keras import mixed_precision
+
+from coastseg import zoo_model
+
+TARGET_SIZE = [16, 16]
+
+
+@pytest.fixture(autouse=True)
+def float32_policy():
+    """segment_files sets the global mixed precision policy so restore it after each test"""
+    yield
+    mixed_precision.set_global_policy("float32")
+
+
+def make_model(n_classes: int, seed: int, n_bands: int = 3) -> tf.keras.Model:
+    """Returns a small untrained segmentation model that outputs the softmax scores of n_classes"""
+    tf.random.set_seed(seed)
+    inputs = tf.keras.Input((*TARGET_SIZE, n_bands))
+    x = tf.keras.layers.Conv2D(4, 3, padding="same", activation="relu")(inputs)
+    outputs = tf.keras.layers.Conv2D(
+        n_classes, 1, activation="softmax", dtype="float32"
+    )(x)
+    return tf.keras.Model(inputs, outputs)
+
+
+def make_images(directory: str, count: int) -> list:
+    """Saves count random jpgs of different sizes with a black corner to directory"""
+    rng = np.random.default_rng(0)
+    os.makedirs(directory)
+    for index in range(count):
+        image = rng.integers(0, 255, (37 + index, 41, 3), dtype=np.uint8)
+        image[:5, :5] = 0
+        imsave(os.path.join(directory, f"image{index}.jpg"), image, check_contrast=False)
+    return sorted(glob.glob(os.path.join(directory, "*.jpg")))
+
+
+@pytest.mark.parametrize(
+    "n_classes, use_tta, use_otsu",
+    [(2, False, False), (2, True, False), (2, False, True), (2, True, True), (4, False, False), (4, True, False)],
+)
+def test_segment_files_matches_do_seg(tmp_path, n_classes, use_tta, use_otsu):
+    """segment_files saves the same outputs as calling do_seg on each image"""
+    models = [make_model(n_classes, seed) for seed in range(2)]
+    metadata = {"model_weights": ["weights.h5"], "config_files": ["config.json"], "model_types": ["resunet"]}
+    expected_directory = str(tmp_path / "do_seg")
+    actual_directory = str(tmp_path / "segment_files")
+    make_images(expected_directory, 5)
+    shutil.copytree(expected_directory, actual_directory)
+
+    for file in sorted(glob.glob(os.path.join(expected_directory, "*.jpg"))):
+        do_seg(
+            file,
+            models,
+            dict(metadata),
+            "resunet",
+            sample_direc=expected_directory,
+            NCLASSES=n_classes,
+            N_DATA_BANDS=3,
+            TARGET_SIZE=TARGET_SIZE,
+            TESTTIMEAUG=use_tta,
+            WRITE_MODELMETADATA=False,
+            OTSU_THRESHOLD=use_otsu,
+            profile="meta",
+        )
+
+    model = zoo_model.Zoo_Model()
+    model.model_types = ["resunet"]
+    model.model_list = models
+    model.metadata_dict = dict(metadata)
+    model.NCLASSES, model.N_DATA_BANDS, model.TARGET_SIZE = n_classes, 3, TARGET_SIZE
+    files = sorted(glob.glob(os.path.join(actual_directory, "*.jpg")))
+    # a batch size that doesn't divide the number of files
+    model.segment_files(
+        [(actual_directory, file) for file in files], use_tta, use_otsu, batch_size=2
+    )
+
+    expected_outputs = sorted(os.listdir(os.path.join(expected_directory, "out")))
+    assert expected_outputs == sorted(os.listdir(os.path.join(actual_directory, "out")))
+    for filename in expected_outputs:
+        expected_file = os.path.join(expected_directory, "out", filename)
+        actual_file = os.path.join(actual_directory, "out", filename)
+        if not filename.endswith(".npz"):
+            with open(expected_file, "rb") as expected, open(actual_file, "rb") as actual:
+                assert expected.read() == actual.read(), filename
+            continue
+        expected_npz = np.load(expected_file, allow_pickle=True)
+        actual_npz = np.load(actual_file, allow_pickle=True)
+        assert sorted(expected_npz.files) == sorted(actual_npz.files)
+        for key in expected_npz.files:
+            if key in ("input_file", "color_segmentation_output"):
+                assert str(expected_npz[key]).replace(
+                    expected_directory, actual_directory
+                ) == str(actual_npz[key])
+            else:
+                assert expected_npz[key].dtype == actual_npz[key].dtype, key
+                assert np.array_equal(expected_npz[key], actual_npz[key]), key
+
+
+def test_predict_batch_falls_back_to_first_3_bands():
+    model = make_model(2, seed=0, n_bands=3)
+    batch = np.random.default_rng(0).random((2, *TARGET_SIZE, 5), dtype=np.float32)
+    scores = zoo_model.predict_batch(model, batch, "resunet")
+    expected = model.predict(batch[..., :3], verbose=0)
+    assert np.array_equal(scores, expected)
+
+
+def test_predict_batch_raises_other_errors():
+    # a model given the number of bands it expects doesn't hide its errors
+    model = make_model(2, seed=0, n_bands=4)
+    with pytest.raises(ValueError):
+        zoo_model.predict_batch(
+            model, np.zeros((1, *TARGET_SIZE, 3), dtype=np.float32), "resunet"
+        )
+
+    class BrokenModel:
+        def predict(self, images, batch_size=None, verbose=0):
+            raise RuntimeError("out of memory")
+
+    with pytest.raises(RuntimeError, match="out of memory"):
+        zoo_model.predict_batch(
+            BrokenModel(), np.zeros((1, *TARGET_SIZE, 5), dtype=np.float32), "resunet"
+        )
+
+
+def test_model_cache_evicts_least_recently_used():
+    cache = zoo_model.ModelCache(max_size=2)
+    keys = [(model_id, "BEST", ()) for model_id in ("a", "b", "c")]
+    cache.put(keys[0], {"model": "a"})
+    cache.put(keys[1], {"model": "b"})
+    # using a makes b the least recently used model
+    assert cache.get(keys[0]) == {"model": "a"}
+    cache.put(keys[2], {"model": "c"})
+    assert keys[1] not in cache
+    assert cache.get(keys[0]) is not None and cache.get(keys[2]) is not None
+    cache.set_max_size(1)
+    # c was used last
+    assert keys[2] in cache and len(cache) == 1
+
+
+def test_model_cache_max_size_0_disables_cache():
+    cache = zoo_model.ModelCache(max_size=2)
+    cache.put(("a", "BEST", ()), {"model": "a"})
+    cache.set_max_size(0)
+    assert len(cache) == 0
+    cache.put(("b", "BEST", ()), {"model": "b"})
+    assert cache.get(("b", "BEST", ())) is None
+
+
+def test_model_cache_key_changes_with_weights_mtime(tmp_path):
+    weights = tmp_path / "model_fullmodel.h5"
+    weights.write_bytes(b"weights")
+    os.utime(weights, ns=(1_000_000_000, 1_000_000_000))
+    key = zoo_model.ModelCache.get_key("model_id", "best", [str(weights)])
+    assert key == zoo_model.ModelCache.get_key("model_id", "BEST", [str(weights)])
+    # the weights were downloaded again
+    os.utime(weights, ns=(2_000_000_000, 2_000_000_000))
+    assert key != zoo_model.ModelCache.get_key("model_id", "BEST", [str(weights)])
+
+
+def test_prepare_model_reuses_cached_model(tmp_path):
+    weights = tmp_path / "model_fullmodel.h5"
+    weights.write_bytes(b"weights")
+    loaded_model = object()
+
+    def get_model(self, weights_list):
+        self.TARGET_SIZE, self.NCLASSES, self.N_DATA_BANDS = [512, 512], 4, 3
+        return loaded_model, [loaded_model], ["config.json"], ["resunet"]
+
+    with patch.object(zoo_model, "MODEL_CACHE", zoo_model.ModelCache()), patch.object(
+        zoo_model.Zoo_Model, "get_model_directory", return_value=str(tmp_path)
+    ), patch.object(
+        zoo_model.Zoo_Model, "get_local_weights_list", return_value=[str(weights)]
+    ), patch.object(
+        zoo_model.Zoo_Model, "get_weights_list", return_value=[str(weights)]
+    ), patch.object(
+        zoo_model.Zoo_Model, "download_model"
+    ) as download_model, patch.object(
+        zoo_model.Zoo_Model, "get_model", autospec=True, side_effect=get_model
+    ) as mock_get_model:
+        zoo_model.Zoo_Model().prepare_model("BEST", "model_id")
+        assert download_model.call_count == 1 and mock_get_model.call_count == 1
+
+        model = zoo_model.Zoo_Model()
+        model.prepare_model("BEST", "model_id")
+        assert download_model.call_count == 1 and mock_get_model.call_count == 1
+        assert model.model_list == [loaded_model]
+        assert model.model_types == ["resunet"]
+        assert (model.TARGET_SIZE, model.NCLASSES, model.N_DATA_BANDS) == ([512, 512], 4, 3)
+
+        # the cache can be skipped
+        zoo_model.Zoo_Model().prepare_model("BEST", "model_id", use_cache=False)
+        assert download_model.call_count == 2 and mock_get_model.call_count == 2
+
+
+def test_run_model_and_extract_shorelines_on_rois(tmp_path):
+    roi_directories = [str(tmp_path / "data" / f"ID_{roi_id}_datetime06-05-23__04_16_45") for roi_id in "abc"]
+    extracted = {}
+
+    def preprocess_data(self, src_directory, model_dict, img_type):
+        if "ID_b" in src_directory:
+            raise FileNotFoundError("no imagery")
+        return {**model_dict, "sample_direc": src_directory}
+
+    def extract_shorelines_for_session(settings, session_path, session_name, *args):
+        extracted[session_name] = session_path
+        if session_name.endswith("c"):
+            raise ValueError("no shorelines found")
+
+    model = zoo_model.Zoo_Model()
+    model.set_settings(img_type="RGB", model_type="segformer_RGB_4class_8190958")
+    with patch.object(zoo_model.core_utilities, "get_base_dir", return_value=str(tmp_path)), patch.object(
+        zoo_model.Zoo_Model, "prepare_model"
+    ) as prepare_model, patch.object(
+        zoo_model.Zoo_Model, "preprocess_data", autospec=True, side_effect=preprocess_data
+    ), patch.object(
+        zoo_model.Zoo_Model,
+        "get_files_for_seg",
+        side_effect=lambda sample_direc, **kwargs: [os.path.join(sample_direc, "image.jpg")],
+    ), patch.object(
+        zoo_model.Zoo_Model, "segment_files"
+    ) as segment_files, patch.object(
+        zoo_model.Zoo_Model, "postprocess_data"
+    ), patch.object(
+        zoo_model, "extract_shorelines_for_session", side_effect=extract_shorelines_for_session
+    ):
+        failed_rois = model.run_model_and_extract_shorelines_on_rois(roi_directories, "session")
+
+    # the model is loaded once and segments the imagery of every ROI at once
+    prepare_model.assert_called_once()
+    segment_files.assert_called_once()
+    assert [file for _, file in segment_files.call_args[0][0]] == [
+        os.path.join(roi_directories[0], "image.jpg"),
+        os.path.join(roi_directories[2], "image.jpg"),
+    ]
+    assert sorted(failed_rois) == ["b", "c"]
+    # the shorelines are extracted to a separate session so the model session is not overwritten
+    model_sessions = tmp_path / "sessions" / "session"
+    assert extracted == {
+        os.path.join("session_extracted", "a"): str(model_sessions / "a"),
+        os.path.join("session_extracted", "c"): str(model_sessions / "c"),
+    }
+
+
+def test_RGB_to_infrared_skips_up_to_date_images(tmp_path):
+    rng = np.random.default_rng(0)
+    dates = ["2020-01-01-10-00-00", "2020-02-01-10-00-00"]
+    for band in ("RGB", "NIR"):
+        os.makedirs(tmp_path / band)
+        for date in dates:
+            shape = (20, 30, 3) if band == "RGB" else (20, 30)
+            imsave(
+                tmp_path / band / f"{date}_{band}_S2.jpg",
+                rng.integers(1, 255, shape, dtype=np.uint8),
+                check_contrast=False,
+            )
+
+    def convert():
+        return zoo_model.RGB_to_infrared(
+            str(tmp_path / "RGB"), str(tmp_path / "NIR"), str(tmp_path), "NDWI", num_workers=2, scheduler="threads"
+        )
+
+    with patch.object(
+        zoo_model.image_utilities,
+        "create_infrared_index_image",
+        wraps=zoo_model.image_utilities.create_infrared_index_image,
+    ) as create_image:
+        output_path = convert()
+        assert create_image.call_count == 2
+        assert sorted(os.listdir(output_path)) == [f"{date}_NDWI_S2.jpg" for date in dates]
+
+        # the NDWI images are newer than their RGB and NIR images
+        convert()
+        assert create_image.call_count == 2
+
+        # the NIR image of the first date was downloaded again
+        ndwi_mtime = os.stat(os.path.join(output_path, f"{dates[0]}_NDWI_S2.jpg")).st_mtime_ns
+        nir_file = tmp_path / "NIR" / f"{dates[0]}_NIR_S2.jpg"
+        os.utime(nir_file, ns=(ndwi_mtime + 1_000_000_000, ndwi_mtime + 1_000_000_000))
+        convert()
+        assert create_image.call_count == 3
+        assert create_image.call_args[0][1] == str(nir_file)
+
+
+def save_image(path, black_columns: int, shape=(64, 64, 3), **kwargs) -> str:
+    """Saves an image whose first black_columns columns are black and the rest are not"""
+    image = np.random.default_rng(0).integers(60, 200, shape, dtype=np.uint8)
+    image[:, :black_columns] = 0
+    Image.fromarray(image).save(path, **kwargs)
+    return str(path)
+
+
+def test_get_black_pixel_fraction_draft_matches_full_decode(tmp_path):
+    file = save_image(tmp_path / "image.jpg", 64, shape=(256, 256, 3), quality=95)
+    draft_fraction = zoo_model.get_black_pixel_fraction(file)
+    full_fraction = zoo_model.get_black_pixel_fraction(file, draft_scale=1)
+    assert draft_fraction == pytest.approx(0.25, abs=0.01)
+    assert full_fraction == pytest.approx(0.25, abs=0.01)
+
+
+def test_get_black_pixel_fraction_decodes_other_images_in_full(tmp_path):
+    png_file = save_image(tmp_path / "image.png", 16)
+    rgb_file = save_image(tmp_path / "rgb.jpg", 16)
+    grey_file = str(tmp_path / "grey.jpg")
+    Image.open(rgb_file).convert("L").save(grey_file)
+
+    with patch.object(
+        JpegImagePlugin.JpegImageFile,
+        "draft",
+        autospec=True,
+        side_effect=JpegImagePlugin.JpegImageFile.draft,
+    ) as draft:
+        assert zoo_model.get_black_pixel_fraction(png_file) == 0.25
+        zoo_model.get_black_pixel_fraction(grey_file)
+        draft.assert_not_called()
+        zoo_model.get_black_pixel_fraction(rgb_file)
+        draft.assert_called_once()
+
+
+def test_filter_no_data_pixels_keeps_images_at_percent_no_data(tmp_path):
+    # 32 and 33 of the 64 columns are black
+    at_limit = save_image(tmp_path / "at_limit.png", 32)
+    over_limit = save_image(tmp_path / "over_limit.png", 33)
+    assert zoo_model.filter_no_data_pixels([at_limit, over_limit], 0.5) == [at_limit]
+    assert zoo_model.filter_no_data_pixels([at_limit, over_limit], 0.6) == [at_limit, over_limit]
+
+
+def test_filter_no_data_pixels_caches_black_fractions(tmp_path):
+    files = [save_image(tmp_path / f"image{index}.jpg", 16) for index in range(3)]
+
+    def filter_files():
+        return zoo_model.filter_no_data_pixels(files, 0.5)
+
+    with patch.object(
+        zoo_model, "get_black_pixel_fraction", wraps=zoo_model.get_black_pixel_fraction
+    ) as get_fraction:
+        assert filter_files() == files
+        assert get_fraction.call_count == 3
+        assert os.path.isfile(tmp_path / zoo_model.NO_DATA_CACHE_FILENAME)
+
+        # the cached fractions are reused
+        assert filter_files() == files
+        assert get_fraction.call_count == 3
+
+        # the first image was modified
+        stat = os.stat(files[0])
+        os.utime(files[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert filter_files() == files
+        assert get_fraction.call_count == 4
+        assert get_fraction.call_args[0][0] == files[0]
+
+        # the second image was replaced by an image of a different size with the same modification time
+        stat = os.stat(files[1])
+        save_image(files[1], 48, shape=(32, 64, 3))
+        os.utime(files[1], ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        assert filter_files() == [files[0], files[2]]
+        assert get_fraction.call_count == 5
+        assert get_fraction.call_args[0][0] == files[1]